@@ -1,12 +1,12 @@
 """
 Unified entry point for workflow documentation generator.
-Supports both Azure DevOps (devops) and generic JSON conversion (convert) subcommands.
+Supports Azure DevOps (devops) and generic JSON conversion (convert) subcommands, and a report server (serve).
 """
 import sys
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: workflow-doc-gen <devops|convert> [args...]")
+        print("Usage: workflow-doc-gen <devops|convert|serve> [args...]")
         sys.exit(1)
     cmd = sys.argv[1]
     sys.argv = [sys.argv[0]] + sys.argv[2:]  # Remove the subcommand from args
@@ -17,6 +17,9 @@ def main():
     elif cmd == "json":
         from hungovercoders_workflow_doc_gen.json_cli import main as json_main
         json_main()
+    elif cmd == "serve":
+        from hungovercoders_workflow_doc_gen.server import main as serve_main
+        serve_main()
     else:
         print(f"Unknown subcommand: {cmd}")
         sys.exit(1)
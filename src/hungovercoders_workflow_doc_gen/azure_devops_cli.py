@@ -3,60 +3,183 @@ CLI for generating OKR documentation from Azure DevOps.
 """
 import argparse
 import logging
-import json
 import os
+import sys
+from typing import TYPE_CHECKING
+from hungovercoders_workflow_doc_gen.columnar import COLUMNAR_FORMATS, require_pyarrow
 from hungovercoders_workflow_doc_gen.formatter import Formatter
-from hungovercoders_workflow_doc_gen.azure_devops_client import AzureDevOpsClient
-from hungovercoders_workflow_doc_gen.cli_utils import validate_against_schema, get_output_path
+from hungovercoders_workflow_doc_gen.cli_utils import (
+    validate_against_schema, get_output_path, load_sync_state, save_sync_state, utc_timestamp,
+    iter_validated_objectives, parse_formats, parse_state_filter, stream_report, write_reports, FORMAT_LABELS,
+    ReportError, SYNC_OVERLAP_SECONDS
+)
+from hungovercoders_workflow_doc_gen.metrics import profile_run, stage
+from hungovercoders_workflow_doc_gen.model import Objective
+from hungovercoders_workflow_doc_gen.okr_index import iter_filtered_objectives
+from hungovercoders_workflow_doc_gen.render_cache import RenderCache
+from hungovercoders_workflow_doc_gen.work_item_cache import WorkItemCache, default_cache_dir
+
+if TYPE_CHECKING:
+    from hungovercoders_workflow_doc_gen.azure_devops_client import AzureDevOpsClient
+    from hungovercoders_workflow_doc_gen.fanout import FanoutConfig
 
 logger = logging.getLogger(__name__)
 
+REPORT_FORMATS = ["markdown", "doc", "pdf", "raw-json"]
+OUTPUT_FORMATS = REPORT_FORMATS + ["ndjson", "parquet", "arrow"]
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Generate OKR documentation from Azure DevOps.")
-    parser.add_argument("--org", required=True, help="Azure DevOps organization name")
-    parser.add_argument("--project", required=True, help="Azure DevOps project name")
-    parser.add_argument("--pat", required=True, help="Azure DevOps Personal Access Token")
+    parser.add_argument("--org", default=None, help="Azure DevOps organization name")
+    parser.add_argument("--project", default=None, help="Azure DevOps project name")
+    parser.add_argument("--pat", default=None, help="Azure DevOps Personal Access Token")
+    parser.add_argument("--config", default=None, help="JSON file listing organizations and projects to export together, instead of --org and --project")
+    parser.add_argument("--jobs", type=int, default=4, help="With --config, projects exported at once (default: 4)")
+    parser.add_argument("--api-root", default="https://dev.azure.com", help="Azure DevOps Services or Server URL (default: https://dev.azure.com)")
     parser.add_argument("--output-dir", default="outputs/", help="Output directory (default: current directory)")
-    parser.add_argument("--format", choices=["markdown", "doc", "pdf", "raw-json"], default="markdown", help="Output format: markdown, doc (Word-compatible HTML), pdf, or raw-json")
+    parser.add_argument("--format", type=lambda value: parse_formats(value, OUTPUT_FORMATS, REPORT_FORMATS), default=["markdown"], help="Output format(s), comma-separated: markdown, doc (Word-compatible HTML), pdf, raw-json, ndjson, parquet, arrow (Parquet and Arrow IPC objective and hypothesis tables), or all (every report format)")
+    parser.add_argument("--filter", dest="states", type=parse_state_filter, default=None, metavar="state=STATE[,STATE...]", help="Only write objectives in the given states, e.g. --filter \"state=Active,In Progress\"")
     parser.add_argument("--schema", default=None, help="Path to JSON schema (default: okr_summary.json in schemas dir)")
     parser.add_argument("--no-validate", action="store_true", help="Skip validation against JSON schema")
+    parser.add_argument("--pdf-workers", type=int, default=1, help="Processes used to render PDF output in shards (default: 1, a single document)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum number of Azure DevOps requests in flight (default: 4)")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per request for throttled or failed calls (default: 5)")
+    parser.add_argument("--cache-dir", default=default_cache_dir(), help="Directory for the work item cache (default: ~/.cache/workflow-doc-gen)")
+    parser.add_argument("--no-cache", action="store_true", help="Always download every work item and compile templates instead of using the cache")
+    parser.add_argument("--incremental", action="store_true", help="Only fetch work items changed since the last successful --incremental run")
+    parser.add_argument("--state-file", default=None, help="Incremental sync state file (default: okr_summary.state.json in the output directory)")
+    parser.add_argument("--depth", type=int, default=2, help="Levels of the Objective hierarchy to export; 3 or more adds children below hypotheses (default: 2)")
+    parser.add_argument("--profile", default=None, metavar="FILE", help="Write a JSON report of stage timings, HTTP requests and cache hit rates to FILE")
+    parser.add_argument("--profile-stats", default=None, metavar="FILE", help="Also run under cProfile and dump pstats to FILE")
     args = parser.parse_args()
+    if any(format in COLUMNAR_FORMATS for format in args.format):
+        try:
+            require_pyarrow()
+        except ImportError as e:
+            parser.error(str(e))
+    if args.config:
+        if args.org or args.project:
+            parser.error("--config cannot be combined with --org or --project")
+        if args.incremental:
+            parser.error("--incremental is not supported with --config")
+        # Imported here so that single-project runs do not load the fan-out machinery.
+        from hungovercoders_workflow_doc_gen.fanout import load_fanout_config
+        try:
+            config = load_fanout_config(args.config)
+        except (OSError, ValueError) as e:
+            parser.error(f"invalid --config: {e}")
+        with profile_run(args.profile, args.profile_stats):
+            export_many(args, config)
+        return
+    if not (args.org and args.project and args.pat):
+        parser.error("--org, --project and --pat are required unless --config is given")
+    if args.incremental and args.depth != 2:
+        parser.error("--incremental only supports --depth 2")
 
-    client = AzureDevOpsClient(args.org, args.project, args.pat)
-    okr_data = client.fetch_and_normalize_okrs_with_relations()
+    with profile_run(args.profile, args.profile_stats):
+        export(args)
 
-    # Determine schema path
+def get_schema_path(args: argparse.Namespace) -> str:
+    """
+    Return --schema, or the bundled okr_summary.json schema.
+    """
     schema_path = args.schema
     if not schema_path:
         here = os.path.dirname(os.path.abspath(__file__))
         schema_path = os.path.join(here, 'schemas/okr_summary.json')
         if not os.path.exists(schema_path):
             schema_path = os.path.join(here, '../schemas/okr_summary.json')
+    return schema_path
+
+def export_many(args: argparse.Namespace, config: "FanoutConfig") -> None:
+    """
+    Export every project listed in --config, with per-project reports and a combined roll-up.
+    """
+    from hungovercoders_workflow_doc_gen.fanout import run_fanout
+
+    try:
+        failed = run_fanout(
+            config, args.output_dir, args.format, None if args.no_validate else get_schema_path(args), pat=args.pat,
+            api_root=args.api_root, jobs=args.jobs, concurrency=args.concurrency, max_retries=args.max_retries,
+            cache=None if args.no_cache else WorkItemCache(args.cache_dir),
+            bytecode_cache_dir=None if args.no_cache else os.path.join(args.cache_dir, "templates"),
+            render_cache_dir=None if args.no_cache else os.path.join(args.cache_dir, "renders"),
+            pdf_workers=args.pdf_workers, states=args.states)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+def export(args: argparse.Namespace) -> None:
+    """
+    Fetch OKR data from Azure DevOps and write every requested format.
+    """
+    # Imported here so that --help and argument errors do not pay for loading requests.
+    from hungovercoders_workflow_doc_gen.azure_devops_client import AzureDevOpsClient
+
+    cache = None if args.no_cache else WorkItemCache(args.cache_dir)
+    client = AzureDevOpsClient(args.org, args.project, args.pat, concurrency=args.concurrency,
+                               api_root=args.api_root, max_retries=args.max_retries, cache=cache)
+
+    schema_path = get_schema_path(args)
+
+    formatter = Formatter(bytecode_cache_dir=None if args.no_cache else os.path.join(args.cache_dir, "templates"))
+    render_cache = None if args.no_cache else RenderCache(os.path.join(args.cache_dir, "renders"))
+    formats = args.format
+
+    if not args.incremental and len(formats) == 1 and formats[0] != "pdf":
+        # Stream: objectives are fetched, validated and written one window at a time.
+        format = formats[0]
+        output_path = get_output_path(args.output_dir, format)
+        objectives = client.iter_normalized_objectives(max_depth=args.depth)
+        if not args.no_validate:
+            objectives = iter_validated_objectives(objectives, schema_path)
+        objectives = iter_filtered_objectives(objectives, args.states)
+        stream_report(formatter, format, objectives, output_path)
+        print_transport_stats(client)
+        print(f"OKR {FORMAT_LABELS[format]} report written to {output_path}")
+        return
+
+    state_file = args.state_file or os.path.join(args.output_dir, "okr_summary.state.json")
+    state = load_sync_state(state_file, args.org, args.project) if args.incremental else None
+    watermark = utc_timestamp(-SYNC_OVERLAP_SECONDS)
+    if state:
+        print(f"Incremental sync of changes since {state['watermark']}")
+        merged = client.fetch_and_normalize_okrs_incremental(state["okr_data"], state["watermark"])
+        okr_data = {"objectives": [Objective.from_dict(obj) for obj in merged["objectives"]]}
+    else:
+        # Held as compact model objects rather than dicts until every format is written.
+        with stage("load"):
+            objectives = client.iter_normalized_objectives(max_depth=args.depth)
+            okr_data = {"objectives": [Objective.from_dict(obj) for obj in objectives]}
+    print_transport_stats(client)
 
     # Validate
     if not args.no_validate:
         validate_against_schema(okr_data, schema_path)
 
-    formatter = Formatter()
-    output_path = get_output_path(args.output_dir, args.format)
-
-    if args.format == "markdown":
-        output_str = formatter.format_markdown(okr_data)
-        with open(output_path, "w") as f:
-            f.write(output_str)
-        print(f"OKR Markdown report written to {output_path}")
-    elif args.format == "doc":
-        output_str = formatter.format_doc(okr_data)
-        with open(output_path, "w") as f:
-            f.write(output_str)
-        print(f"OKR Word-compatible HTML report written to {output_path}")
-    elif args.format == "pdf":
-        formatter.format_pdf(okr_data, output_path)
-        print(f"OKR PDF report written to {output_path}")
-    elif args.format == "raw-json":
-        with open(output_path, "w") as f:
-            json.dump(okr_data, f, indent=2)
-        print(f"OKR JSON report written to {output_path}")
+    # Fetched and validated once; every requested format is rendered from the same data.
+    try:
+        outputs = write_reports(formatter, okr_data, formats, args.output_dir, pdf_workers=args.pdf_workers,
+                                render_cache=render_cache, states=args.states)
+    except ReportError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    for format, output_path in outputs.items():
+        print(f"OKR {FORMAT_LABELS[format]} report written to {output_path}")
+
+    if args.incremental:
+        save_sync_state(state_file, args.org, args.project, watermark, okr_data)
+
+def print_transport_stats(client: "AzureDevOpsClient") -> None:
+    """
+    Report retries and throttling delays, if there were any.
+    """
+    stats = client.transport.stats
+    if stats.retries or stats.pacing_delay_seconds:
+        print(f"Azure DevOps requests: {stats.requests} ({stats.retries} retries, "
+              f"{stats.retry_delay_seconds + stats.pacing_delay_seconds:.1f}s spent waiting on throttling)")
 
 if __name__ == "__main__":
     main()
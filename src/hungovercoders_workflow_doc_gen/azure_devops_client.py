@@ -1,116 +1,496 @@
 """
 Azure DevOps client for fetching and normalizing OKR data.
 """
+import hashlib
 import requests
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from hungovercoders_workflow_doc_gen.http_transport import RetryingTransport
+from hungovercoders_workflow_doc_gen.metrics import stage
+from hungovercoders_workflow_doc_gen.text_cleaning import split_key_results
+from hungovercoders_workflow_doc_gen.work_item_cache import WorkItemCache
+from typing import List, Dict, Any, Iterator, Optional, Set, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of IDs accepted by the workitemsbatch endpoint per request.
+BATCH_SIZE = 200
+
+# Fields requested when checking whether cached work items are still current.
+REVISION_FIELDS = ["System.Id", "System.Rev", "System.ChangedDate"]
+
+# Fields read by the normalizer; hierarchy loads request only these.
+NORMALIZED_FIELDS = [
+    "System.Id", "System.Rev", "System.ChangedDate", "System.WorkItemType", "System.Title", "System.State",
+    "Custom.Objective", "Custom.KeyResults", "Custom.MethodOfMeasure", "Custom.ObjectiveOutcome",
+    "Custom.Hypothesis", "Custom.HypothesisContext", "Custom.MethodOfMeasuringHypothesis", "Custom.HypothesisOutcome",
+]
+
+HIERARCHY_FORWARD = "System.LinkTypes.Hierarchy-Forward"
+
+def create_transport(pat_token: str, pool_size: int = 1, max_retries: int = 5, **options: Any) -> RetryingTransport:
+    """
+    Create a RetryingTransport over a session authenticated with pat_token, whose connection pool
+    keeps up to pool_size connections per host. Extra options are passed to RetryingTransport.
+    """
+    session = requests.Session()
+    session.auth = ('', pat_token)
+    session.headers.update({"Content-Type": "application/json"})
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return RetryingTransport(session, max_retries=max_retries, **options)
+
 class AzureDevOpsClient:
     """
     Client for interacting with Azure DevOps REST API to fetch OKR data.
+
+    Batch requests are issued by up to ``concurrency`` worker threads sharing one
+    session whose connection pool is sized to match. All requests go through a
+    RetryingTransport, whose counters are available as ``client.transport.stats``.
+    Clients of several projects in one organization can share a transport (see create_transport),
+    and with it the session, connection pool and rate limits.
+    An optional WorkItemCache avoids re-downloading work items whose revision is unchanged.
+    Queries, fetches and normalization are timed as ``azure_devops.*`` stages in the process metrics.
     """
-    def __init__(self, organization: str, project: str, pat_token: str) -> None:
+    def __init__(
+        self,
+        organization: str,
+        project: str,
+        pat_token: str,
+        concurrency: int = 1,
+        batch_size: int = BATCH_SIZE,
+        api_root: str = "https://dev.azure.com",
+        max_retries: int = 5,
+        cache: Optional[WorkItemCache] = None,
+        transport: Optional[RetryingTransport] = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if not 1 <= batch_size <= BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {BATCH_SIZE}")
         self.organization = organization
         self.project = project
         self.pat_token = pat_token
-        self.base_url = f"https://dev.azure.com/{organization}/{project}/_apis/"
-        self.session = requests.Session()
-        self.session.auth = ('', pat_token)
-        self.session.headers.update({"Content-Type": "application/json"})
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.base_url = f"{api_root.rstrip('/')}/{organization}/{project}/_apis/"
+        self.transport = transport or create_transport(pat_token, pool_size=concurrency, max_retries=max_retries)
+        self.session = self.transport.session
+        self.cache = cache
+        # Field projections the service rejected, e.g. because the process lacks a Custom.* field.
+        self._rejected_fields: Set[Tuple[str, ...]] = set()
 
-    def fetch_objectives_with_relations(self) -> List[Dict[str, Any]]:
+    def _work_item_link(self, work_item_id: Any) -> str:
         """
-        Fetch each Objective individually with relations expanded.
-        Returns a list of work item dicts with relations.
+        Build the browser link for a work item.
+        """
+        return f"https://dev.azure.com/{self.organization}/{self.project}/_workitems/edit/{work_item_id}"
+
+    def _run_wiql(self, query: str, time_precision: bool = False) -> Dict[str, Any]:
+        """
+        Run a WIQL query and return the decoded response.
         """
-        wiql = {
-            "query": "SELECT [System.Id] FROM WorkItems WHERE [System.WorkItemType] = 'Objective' ORDER BY [System.Id]"
-        }
         url = self.base_url + "wit/wiql?api-version=7.0"
-        resp = self.session.post(url, json=wiql)
+        if time_precision:
+            url += "&timePrecision=true"
+        with stage("azure_devops.wiql"):
+            resp = self.transport.request("POST", url, json={"query": query})
         if resp.status_code != 200:
             logger.error(f"Azure DevOps WIQL query failed: {resp.status_code} {resp.text}")
             raise RuntimeError(f"Azure DevOps WIQL query failed: {resp.status_code} {resp.text}")
         try:
-            ids = [item['id'] for item in resp.json().get('workItems', [])]
+            return resp.json()
         except Exception as e:
             logger.error(f"Failed to decode WIQL response as JSON: {e}\nResponse text: {resp.text}")
             raise
+
+    def query_objective_ids(self) -> List[int]:
+        """
+        Run the WIQL query for all Objectives and return their IDs in result order.
+        """
+        result = self._run_wiql(
+            "SELECT [System.Id] FROM WorkItems WHERE [System.WorkItemType] = 'Objective' ORDER BY [System.Id]"
+        )
+        return [item['id'] for item in result.get('workItems', [])]
+
+    def query_changed_objective_ids(self, since: str) -> List[int]:
+        """
+        Return the IDs of Objectives whose System.ChangedDate is later than ``since`` (ISO 8601, UTC).
+        """
+        result = self._run_wiql(
+            "SELECT [System.Id] FROM WorkItems WHERE [System.WorkItemType] = 'Objective'"
+            f" AND [System.ChangedDate] > '{since}' ORDER BY [System.Id]",
+            time_precision=True,
+        )
+        return [item['id'] for item in result.get('workItems', [])]
+
+    def query_changed_child_links(self, since: str) -> List[Tuple[int, int]]:
+        """
+        Return (objective ID, child ID) pairs for hierarchy children of Objectives changed after ``since``.
+        """
+        result = self._run_wiql(
+            "SELECT [System.Id] FROM WorkItemLinks"
+            " WHERE [Source].[System.WorkItemType] = 'Objective'"
+            f" AND [System.Links.LinkType] = '{HIERARCHY_FORWARD}'"
+            f" AND [Target].[System.ChangedDate] > '{since}' MODE (MustContain)",
+            time_precision=True,
+        )
+        return [
+            (rel["source"]["id"], rel["target"]["id"])
+            for rel in result.get("workItemRelations", [])
+            if rel.get("rel") == HIERARCHY_FORWARD and rel.get("source")
+        ]
+
+    def query_hierarchy(self) -> Tuple[List[int], Dict[int, List[int]]]:
+        """
+        Load the whole Objective tree with one recursive WorkItemLinks query.
+
+        Returns:
+            The Objective IDs in query order, and a map of parent ID to child IDs (at every depth).
+        """
+        result = self._run_wiql(
+            "SELECT [System.Id] FROM WorkItemLinks"
+            " WHERE [Source].[System.WorkItemType] = 'Objective'"
+            f" AND [System.Links.LinkType] = '{HIERARCHY_FORWARD}'"
+            " ORDER BY [System.Id] MODE (Recursive)"
+        )
+        roots: List[int] = []
+        children: Dict[int, List[int]] = {}
+        for rel in result.get("workItemRelations", []):
+            target = rel["target"]["id"]
+            if not rel.get("source"):
+                roots.append(target)
+            elif rel.get("rel") == HIERARCHY_FORWARD:
+                children.setdefault(rel["source"]["id"], []).append(target)
+        return roots, children
+
+    def query_deleted_ids(self) -> Set[int]:
+        """
+        Return the IDs of work items in the project's recycle bin.
+        """
+        url = self.base_url + "wit/recyclebin?api-version=7.0"
+        with stage("azure_devops.recycle_bin"):
+            resp = self.transport.request("GET", url)
+        if resp.status_code != 200:
+            logger.error(f"Failed to list deleted work items: {resp.status_code} {resp.text}")
+            raise RuntimeError(f"Failed to list deleted work items: {resp.status_code} {resp.text}")
+        return {item["id"] for item in resp.json().get("value", [])}
+
+    def _fetch_batch(self, chunk: List[int], expand_relations: bool = False,
+                     fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch one chunk of work items with a single workitemsbatch request.
+
+        If the service rejects ``fields`` with 400 (a field missing from the organization's process),
+        every field is fetched instead, for this and every later request with the same fields.
+        """
+        if fields and tuple(fields) in self._rejected_fields:
+            fields = None
+        url = self.base_url + "wit/workitemsbatch?api-version=7.0"
+        body: Dict[str, Any] = {"ids": chunk, "errorPolicy": "Omit"}
+        if expand_relations:
+            body["$expand"] = "Relations"
+        if fields:
+            body["fields"] = fields
+        resp = self.transport.request("POST", url, json=body)
+        if resp.status_code == 400 and fields:
+            if tuple(fields) not in self._rejected_fields:
+                logger.warning(f"Field list rejected ({resp.text}); fetching all fields of each work item instead")
+                self._rejected_fields.add(tuple(fields))
+            return self._fetch_batch(chunk, expand_relations)
+        if resp.status_code != 200:
+            logger.error(f"Failed to fetch work items {chunk[0]}..{chunk[-1]}: {resp.status_code} {resp.text}")
+            raise RuntimeError(f"Failed to fetch work items {chunk[0]}..{chunk[-1]}: {resp.status_code} {resp.text}")
+        # errorPolicy=Omit returns null entries for items that could not be read
+        return [item for item in resp.json().get("value", []) if item]
+
+    def _fetch_chunks(self, ids: List[int], expand_relations: bool = False,
+                      fields: Optional[List[str]] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Fetch ``ids`` in batch_size chunks, concurrently when concurrency > 1. Returns items keyed by ID.
+        """
+        chunks = [ids[start:start + self.batch_size] for start in range(0, len(ids), self.batch_size)]
+        with stage("azure_devops.fetch"):
+            if self.concurrency > 1 and len(chunks) > 1:
+                with ThreadPoolExecutor(max_workers=min(self.concurrency, len(chunks))) as pool:
+                    results = list(pool.map(lambda chunk: self._fetch_batch(chunk, expand_relations, fields), chunks))
+            else:
+                results = [self._fetch_batch(chunk, expand_relations, fields) for chunk in chunks]
+        return {item["id"]: item for batch in results for item in batch}
+
+    @staticmethod
+    def _revision(item: Dict[str, Any]) -> Optional[int]:
+        """Return a work item's revision number."""
+        return item.get("rev", item.get("fields", {}).get("System.Rev"))
+
+    def fetch_work_items(self, ids: List[int], expand_relations: bool = False,
+                         fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch work items in bulk through the workitemsbatch endpoint, batch_size IDs per request.
+        Chunks are fetched concurrently when the client was created with concurrency > 1.
+
+        With a cache configured, cached items are revalidated with a lightweight revision query
+        and only items whose revision changed (or that are not cached yet) are downloaded.
+
+        Args:
+            ids: Work item IDs to fetch.
+            expand_relations: Whether to include each item's relations.
+            fields: Only return these fields (cannot be combined with expand_relations).
+        Returns:
+            Work item dicts in the same order as ``ids``. Items the service omits (deleted or not
+            readable) are left out; a batch that still fails after retries raises RuntimeError.
+        """
+        if expand_relations and fields:
+            raise ValueError("fields cannot be combined with expand_relations")
+        if self.cache is None:
+            by_id = self._fetch_chunks(ids, expand_relations, fields)
+            return [by_id[i] for i in ids if i in by_id]
+
+        if fields:
+            view = "fields:" + hashlib.sha1(",".join(fields).encode("utf-8")).hexdigest()[:12]
+        else:
+            view = "relations" if expand_relations else "fields"
+        with stage("azure_devops.cache"):
+            cached = self.cache.get_many(self.organization, self.project, view, ids)
+        with stage("azure_devops.revalidate"):
+            current = self._fetch_chunks(list(cached), fields=REVISION_FIELDS) if cached else {}
+        by_id = {
+            wid: entry.payload for wid, entry in cached.items()
+            if wid in current and self._revision(current[wid]) == entry.rev
+        }
+        stale = [i for i in ids if i not in by_id and (i not in cached or i in current)]
+        logger.debug(f"Work item cache: {len(by_id)} fresh, {len(stale)} to fetch")
+        if stale:
+            fetched = self._fetch_chunks(stale, expand_relations, fields)
+            with stage("azure_devops.cache"):
+                self.cache.put_many(self.organization, self.project, view, fetched.values())
+            by_id.update(fetched)
+        return [by_id[i] for i in ids if i in by_id]
+
+    def fetch_objectives_with_relations(self) -> List[Dict[str, Any]]:
+        """
+        Fetch all Objectives with relations expanded, in batches.
+        Returns a list of work item dicts with relations.
+        """
+        ids = self.query_objective_ids()
         if not ids:
             return []
-        # Fetch each Objective individually with relations
+        return self.fetch_work_items(ids, expand_relations=True)
+
+    @staticmethod
+    def _child_ids(item: Dict[str, Any]) -> List[int]:
+        """
+        Extract the IDs of direct hierarchy children from a work item's relations.
+        """
+        child_ids = []
+        for rel in item.get("relations") or []:
+            if rel.get("rel") == HIERARCHY_FORWARD:
+                url = rel.get("url", "")
+                if url.endswith("/workItems/"):
+                    continue
+                child_id = url.split("/workItems/")[-1]
+                if child_id.isdigit():
+                    child_ids.append(int(child_id))
+        return child_ids
+
+    def _normalize_objective(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Map an Objective work item onto the okr_summary objective shape (without hypotheses).
+        """
+        fields = item.get("fields", {})
+        obj_id = fields.get("System.Id", item.get("id"))
+        obj = {
+            "id": obj_id,
+            "title": fields.get("System.Title", "Untitled"),
+            "state": fields.get("System.State", ""),
+            "objective": fields.get("Custom.Objective", ""),
+            "key_results": fields.get("Custom.KeyResults", []),
+            "method_of_measure": fields.get("Custom.MethodOfMeasure", ""),
+            "objective_outcome": fields.get("Custom.ObjectiveOutcome", ""),
+            "link": self._work_item_link(obj_id),
+            "hypotheses": []
+        }
+        # Ensure key_results is a list of strings
+        obj["key_results"] = split_key_results(obj["key_results"])
+        return obj
+
+    def _normalize_hypothesis(self, item: Dict[str, Any], fallback_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Map a child work item onto the okr_summary hypothesis shape.
+        """
+        cfields = item.get("fields", {})
+        hyp_id = cfields.get("System.Id", item.get("id", fallback_id))
+        hypothesis = {
+            "id": hyp_id,
+            "title": cfields.get("System.Title", "Untitled"),
+            "state": cfields.get("System.State", ""),
+            "hypothesis": cfields.get("Custom.Hypothesis", ""),
+            "hypothesis_context": cfields.get("Custom.HypothesisContext", ""),
+            "link": self._work_item_link(hyp_id),
+            "method_of_measuring_hypothesis": cfields.get("Custom.MethodOfMeasuringHypothesis", ""),
+            "hypothesis_outcome": cfields.get("Custom.HypothesisOutcome", "")
+        }
+        # Ensure required fields for hypothesis
+        for field in ["hypothesis", "title", "state"]:
+            if not hypothesis.get(field):
+                hypothesis[field] = ""
+        return hypothesis
+
+    def _normalize_with_children(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Normalize Objective work items, fetching all of their children in bulk.
+        """
+        children_by_objective = [self._child_ids(item) for item in items]
+        all_child_ids = list(dict.fromkeys(cid for ids in children_by_objective for cid in ids))
+        children = {child["id"]: child for child in self.fetch_work_items(all_child_ids)}
+
         objectives = []
-        for oid in ids:
-            workitem_url = self.base_url + f"wit/workitems/{oid}?api-version=7.0&$expand=relations"
-            wresp = self.session.get(workitem_url)
-            if wresp.status_code != 200:
-                logger.error(f"Failed to fetch Objective {oid} with relations: {wresp.status_code} {wresp.text}")
-                continue
-            objectives.append(wresp.json())
+        for item, child_ids in zip(items, children_by_objective):
+            obj = self._normalize_objective(item)
+            for cid in child_ids:
+                if cid not in children:
+                    logger.error(f"Failed to fetch child {cid} of objective {obj['id']}")
+                    continue
+                obj["hypotheses"].append(self._normalize_hypothesis(children[cid], cid))
+            objectives.append(obj)
         return objectives
 
-    def fetch_and_normalize_okrs_with_relations(self) -> dict:
+    def _normalize_descendant(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Fetch and normalize OKR data using per-objective relations.
+        Map a work item below the hypothesis level (e.g. an Issue) onto a generic child shape.
+        """
+        fields = item.get("fields", {})
+        wid = fields.get("System.Id", item.get("id"))
+        return {
+            "id": wid,
+            "title": fields.get("System.Title", "Untitled") or "",
+            "state": fields.get("System.State", "") or "",
+            "work_item_type": fields.get("System.WorkItemType", "") or "",
+            "link": self._work_item_link(wid),
+        }
+
+    def iter_normalized_objectives(self, max_depth: int = 2) -> Iterator[Dict[str, Any]]:
+        """
+        Yield normalized objectives from the Objective hierarchy, one at a time.
+
+        The tree comes from a single recursive WorkItemLinks query; the work items themselves are
+        fetched in bulk with only the fields the normalizer reads, one window of objectives at a time,
+        so raw work item payloads never accumulate. Objectives are level 1 and their children become
+        hypotheses (level 2). With ``max_depth`` > 2, deeper descendants are attached as nested
+        ``children`` lists.
+        """
+        roots, children = self.query_hierarchy()
+        window = self.batch_size * self.concurrency
+        for start in range(0, len(roots), window):
+            window_roots = roots[start:start + window]
+            wanted = list(window_roots)
+            level = window_roots
+            for _ in range(max_depth - 1):
+                level = [cid for pid in level for cid in children.get(pid, [])]
+                wanted.extend(level)
+            wanted = list(dict.fromkeys(wanted))
+            items = {item["id"]: item for item in self.fetch_work_items(wanted, fields=NORMALIZED_FIELDS)}
+            for oid in window_roots:
+                if oid not in items:
+                    logger.error(f"Failed to fetch objective {oid}")
+                    continue
+                with stage("azure_devops.normalize"):
+                    objective = self._build_objective(oid, items, children, max_depth)
+                yield objective
+
+    def _build_objective(self, oid: int, items: Dict[int, Dict[str, Any]],
+                         children: Dict[int, List[int]], max_depth: int) -> Dict[str, Any]:
+        """
+        Normalize one Objective and its descendants from already fetched work items.
+        """
+        def descendants(parent_id: int, depth: int) -> List[Dict[str, Any]]:
+            nodes = []
+            for cid in children.get(parent_id, []):
+                if cid not in items:
+                    logger.error(f"Failed to fetch child {cid} of {parent_id}")
+                    continue
+                node = self._normalize_descendant(items[cid])
+                if depth < max_depth:
+                    node["children"] = descendants(cid, depth + 1)
+                nodes.append(node)
+            return nodes
+
+        obj = self._normalize_objective(items[oid])
+        for cid in children.get(oid, []):
+            if cid not in items:
+                logger.error(f"Failed to fetch child {cid} of objective {oid}")
+                continue
+            hypothesis = self._normalize_hypothesis(items[cid], cid)
+            if max_depth > 2:
+                hypothesis["children"] = descendants(cid, 3)
+            obj["hypotheses"].append(hypothesis)
+        return obj
+
+    def fetch_and_normalize_okrs_with_relations(self, max_depth: int = 2) -> dict:
+        """
+        Fetch and normalize OKR data from the Objective hierarchy (see iter_normalized_objectives).
         Returns a dict with a top-level 'objectives' key, matching the schema.
         """
+        return {"objectives": list(self.iter_normalized_objectives(max_depth))}
+
+    def fetch_and_normalize_okrs_incremental(self, previous: dict, since: str) -> dict:
+        """
+        Bring a previously normalized OKR document up to date with changes made after ``since``.
+
+        Only Objectives and hierarchy children whose System.ChangedDate is past ``since`` are fetched:
+        - new or changed Objectives are re-fetched with all of their children;
+        - a changed child is replaced in place, or its old and new parents are re-fetched when it moved;
+        - Objectives no longer returned by the Objective query and children in the recycle bin are dropped.
+
+        Args:
+            previous: Dict with a top-level 'objectives' key from an earlier run.
+            since: ISO 8601 UTC timestamp the previous document is current as of.
+        Returns:
+            A dict with a top-level 'objectives' key, in Objective query order.
+        """
+        objective_ids = self.query_objective_ids()
+        changed_objectives = set(self.query_changed_objective_ids(since))
+        changed_links = self.query_changed_child_links(since)
+        deleted = self.query_deleted_ids()
+        if self.cache is not None and deleted:
+            self.cache.delete_many(self.organization, self.project, deleted)
+
+        previous_by_id = {obj["id"]: obj for obj in previous.get("objectives", [])}
+        previous_parent = {
+            hyp["id"]: obj["id"] for obj in previous_by_id.values() for hyp in obj.get("hypotheses", [])
+        }
+        refresh = changed_objectives | {oid for oid in objective_ids if oid not in previous_by_id}
+        changed_children: Dict[int, int] = {}
+        for parent_id, child_id in changed_links:
+            old_parent = previous_parent.get(child_id)
+            if old_parent != parent_id:
+                # New or re-parented child: both ends need their child lists rebuilt.
+                refresh.add(parent_id)
+                if old_parent is not None:
+                    refresh.add(old_parent)
+            else:
+                changed_children[child_id] = parent_id
+
+        to_fetch = [oid for oid in objective_ids if oid in refresh]
+        refreshed = {obj["id"]: obj for obj in self._normalize_with_children(
+            self.fetch_work_items(to_fetch, expand_relations=True))}
+        child_ids = [cid for cid, parent_id in changed_children.items() if parent_id not in refreshed]
+        children = {item["id"]: self._normalize_hypothesis(item) for item in self.fetch_work_items(child_ids)}
+        logger.info(f"Incremental sync: {len(refreshed)} objectives and {len(children)} children re-fetched, "
+                    f"{len(deleted)} deleted work items")
+
         objectives = []
-        items = self.fetch_objectives_with_relations()
-        for item in items:
-            fields = item.get("fields", {})
-            obj_id = fields.get("System.Id", item.get("id"))
-            obj = {
-                "id": obj_id,
-                "title": fields.get("System.Title", "Untitled"),
-                "state": fields.get("System.State", ""),
-                "objective": fields.get("Custom.Objective", ""),
-                "key_results": fields.get("Custom.KeyResults", []),
-                "method_of_measure": fields.get("Custom.MethodOfMeasure", ""),
-                "objective_outcome": fields.get("Custom.ObjectiveOutcome", ""),
-                "link": f"https://dev.azure.com/{self.organization}/{self.project}/_workitems/edit/{obj_id}",
-                "hypotheses": []
-            }
-            # Ensure key_results is a list of strings
-            if isinstance(obj["key_results"], str):
-                obj["key_results"] = [kr.strip() for kr in obj["key_results"].split("\n") if kr.strip()]
-            elif not isinstance(obj["key_results"], list):
-                obj["key_results"] = []
-            # Find direct children via relations
-            child_ids = []
-            for rel in item.get("relations", []):
-                if rel.get("rel") == "System.LinkTypes.Hierarchy-Forward":
-                    url = rel.get("url", "")
-                    if url.endswith("/workItems/"):
-                        continue
-                    child_id = url.split("/workItems/")[-1]
-                    if child_id.isdigit():
-                        child_ids.append(int(child_id))
-            # Fetch and attach child work items as hypotheses
-            if child_ids:
-                for cid in child_ids:
-                    workitem_url = self.base_url + f"wit/workitems/{cid}?api-version=7.0"
-                    wresp = self.session.get(workitem_url)
-                    if wresp.status_code != 200:
-                        logger.error(f"Failed to fetch child {cid}: {wresp.status_code} {wresp.text}")
-                        continue
-                    cfields = wresp.json().get("fields", {})
-                    hyp_id = cfields.get("System.Id", cid)
-                    hypothesis = {
-                        "id": hyp_id,
-                        "title": cfields.get("System.Title", "Untitled"),
-                        "state": cfields.get("System.State", ""),
-                        "hypothesis": cfields.get("Custom.Hypothesis", ""),
-                        "hypothesis_context": cfields.get("Custom.HypothesisContext", ""),
-                        "link": f"https://dev.azure.com/{self.organization}/{self.project}/_workitems/edit/{hyp_id}",
-                        "method_of_measuring_hypothesis": cfields.get("Custom.MethodOfMeasuringHypothesis", ""),
-                        "hypothesis_outcome": cfields.get("Custom.HypothesisOutcome", "")
-                    }
-                    # Ensure required fields for hypothesis
-                    for field in ["hypothesis", "title", "state"]:
-                        if not hypothesis.get(field):
-                            hypothesis[field] = ""
-                    obj["hypotheses"].append(hypothesis)
-            objectives.append(obj)
+        for oid in objective_ids:
+            if oid in refreshed:
+                objectives.append(refreshed[oid])
+            elif oid in previous_by_id and oid not in refresh:
+                obj = dict(previous_by_id[oid])
+                obj["hypotheses"] = [
+                    children.get(hyp["id"], hyp) for hyp in obj.get("hypotheses", []) if hyp["id"] not in deleted
+                ]
+                objectives.append(obj)
+            else:
+                logger.error(f"Failed to fetch objective {oid}")
         return {"objectives": objectives}
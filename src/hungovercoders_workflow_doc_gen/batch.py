@@ -0,0 +1,221 @@
+"""
+Conversion of OKR JSON files, one at a time or as a parallel batch with incremental rebuilds.
+"""
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from hungovercoders_workflow_doc_gen.cli_utils import (
+    get_output_path, iter_validated_objectives, atomic_output, stream_report, write_reports,
+)
+from hungovercoders_workflow_doc_gen.formatter import Formatter, TEMPLATE_DIR
+from hungovercoders_workflow_doc_gen.metrics import get_metrics, stage
+from hungovercoders_workflow_doc_gen.model import Objective
+from hungovercoders_workflow_doc_gen.okr_index import iter_filtered_objectives
+from hungovercoders_workflow_doc_gen.render_cache import RenderCache
+from hungovercoders_workflow_doc_gen.streaming import NDJSON_EXTENSIONS, iter_input_objectives
+
+logger = logging.getLogger(__name__)
+
+# Written to the output directory; records the content hash of every input that was converted.
+MANIFEST_NAME = ".okr_manifest.json"
+
+# Extensions of the inputs found in a batch directory: JSON documents and NDJSON files of objectives.
+INPUT_EXTENSIONS = (".json",) + NDJSON_EXTENSIONS
+
+def convert_file(input_path: str, output_dir: str, formats: List[str], schema_path: Optional[str],
+                 name: str = "okr_summary", bytecode_cache_dir: Optional[str] = None,
+                 pdf_workers: int = 1, render_cache_dir: Optional[str] = None,
+                 states: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    Convert one OKR JSON or NDJSON file to each requested format. Validation is skipped when schema_path is None.
+    With ``states``, only objectives in those states are written.
+
+    A single text format is streamed: objectives are read, validated and rendered one at a time.
+    Otherwise the file is loaded and validated once and every format is rendered from the same data,
+    reusing artifacts from the render cache in ``render_cache_dir`` when given.
+    Returns a dict of format to output path. Raises SystemExit(1) if validation fails.
+    """
+    formatter = Formatter(bytecode_cache_dir=bytecode_cache_dir)
+    if len(formats) == 1 and formats[0] != "pdf":
+        format = formats[0]
+        output_path = get_output_path(output_dir, format, name)
+        with open(input_path, encoding='utf-8') as f:
+            objectives = iter_input_objectives(f)
+            if schema_path:
+                objectives = iter_validated_objectives(objectives, schema_path)
+            stream_report(formatter, format, iter_filtered_objectives(objectives, states), output_path)
+        return {format: output_path}
+
+    # Objectives are validated as they are parsed and kept as compact model objects while rendering.
+    with stage("load"), open(input_path, encoding='utf-8') as f:
+        objectives = iter_input_objectives(f)
+        if schema_path:
+            objectives = iter_validated_objectives(objectives, schema_path)
+        data = {"objectives": [Objective.from_dict(obj) for obj in objectives]}
+    render_cache = RenderCache(render_cache_dir) if render_cache_dir else None
+    return write_reports(formatter, data, formats, output_dir, pdf_workers=pdf_workers, name=name,
+                         render_cache=render_cache, states=states)
+
+def _is_within(path: str, directory: str) -> bool:
+    path, directory = os.path.abspath(path), os.path.abspath(directory)
+    return os.path.commonpath([path, directory]) == directory
+
+def find_inputs(pattern: str, exclude_dir: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Expand a directory (every ``*.json``, ``*.ndjson`` and ``*.jsonl`` file below it) or a glob into
+    (input path, output name) pairs. Files below ``exclude_dir``, such as the batch's own output
+    directory, are left out.
+
+    Output names are the input paths relative to the directory, or to the common parent of the glob
+    matches, without the extension and with path separators replaced by ``__``; so ``teams/a/okr.json``
+    and ``teams/b/okr.json`` become ``a__okr`` and ``b__okr``. Inputs that differ only by extension
+    keep it: ``a.json`` and ``a.ndjson`` become ``a.json`` and ``a.ndjson``.
+    """
+    if os.path.isdir(pattern):
+        root = pattern
+        paths = [path for path in glob.glob(os.path.join(pattern, "**", "*"), recursive=True)
+                 if path.endswith(INPUT_EXTENSIONS)]
+    else:
+        paths = glob.glob(pattern, recursive=True)
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths]) if paths else "."
+    paths = sorted(p for p in paths if os.path.isfile(p) and not (exclude_dir and _is_within(p, exclude_dir)))
+    relatives = [os.path.relpath(os.path.abspath(path), os.path.abspath(root)).replace(os.sep, "__")
+                 for path in paths]
+    stems = [os.path.splitext(relative)[0] for relative in relatives]
+    counts = Counter(stems)
+    return [(path, stem if counts[stem] == 1 else relative)
+            for path, relative, stem in zip(paths, relatives, stems)]
+
+def file_digest(path: str) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def build_key(formats: List[str], schema_path: Optional[str], states: Optional[List[str]] = None) -> str:
+    """
+    Hash everything besides the input that shapes the outputs: the formats, the state filter, the schema
+    and the templates. A change to any of them invalidates every manifest entry.
+    """
+    digest = hashlib.sha256(",".join(formats).encode())
+    if states:
+        digest.update(json.dumps(states).encode())
+    paths = [schema_path] if schema_path else []
+    paths += sorted(glob.glob(os.path.join(TEMPLATE_DIR, "*")))
+    for path in paths:
+        digest.update(os.path.basename(path).encode())
+        digest.update(file_digest(path).encode())
+    return digest.hexdigest()
+
+def load_manifest(output_dir: str) -> Dict[str, Dict]:
+    """Load the batch manifest of the output directory, or an empty one."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable batch manifest {path}: {e}")
+        return {}
+
+def save_manifest(output_dir: str, manifest: Dict[str, Dict]) -> None:
+    """Atomically write the batch manifest to the output directory."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    with atomic_output(path) as tmp_path:
+        with open(tmp_path, "w", encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+def _convert_quietly(input_path: str, output_dir: str, formats: List[str], schema_path: Optional[str], name: str,
+                     bytecode_cache_dir: Optional[str], render_cache_dir: Optional[str],
+                     states: Optional[List[str]] = None) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Process pool worker: convert one file without per-file progress messages.
+    Returns the outputs and a snapshot of the metrics collected while converting, for the parent to merge.
+    """
+    metrics = get_metrics()
+    metrics.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            outputs = convert_file(input_path, output_dir, formats, schema_path, name, bytecode_cache_dir,
+                                   render_cache_dir=render_cache_dir, states=states)
+            return outputs, metrics.snapshot()
+        except SystemExit:
+            # Validation errors have been logged; report the failure to the parent.
+            raise RuntimeError(f"{input_path} failed validation")
+        except ValueError as e:
+            # Restated so the parent gets the message, not the decoder's copy of the input.
+            raise RuntimeError(f"{input_path} is not a valid OKR document: {e}")
+
+def run_batch(pattern: str, output_dir: str, formats: List[str], schema_path: Optional[str],
+              workers: Optional[int] = None, bytecode_cache_dir: Optional[str] = None,
+              force: bool = False, render_cache_dir: Optional[str] = None, states: Optional[List[str]] = None) -> int:
+    """
+    Convert every input matched by a directory or glob in a process pool and print a throughput summary.
+
+    Inputs whose content hash matches the manifest of the previous build, and whose outputs still
+    exist, are skipped unless ``force`` is set. Metrics collected by the workers are merged into this
+    process's metrics. Returns the number of inputs that failed.
+    """
+    inputs = find_inputs(pattern, exclude_dir=output_dir)
+    if not inputs:
+        logger.error(f"No JSON inputs found for {pattern}")
+        return 0
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {} if force else load_manifest(output_dir)
+    key = build_key(formats, schema_path, states)
+
+    started = time.perf_counter()
+    pending: List[Tuple[str, str, str]] = []
+    skipped = 0
+    for path, name in inputs:
+        with stage("batch.hash"):
+            digest = file_digest(path)
+        entry = manifest.get(name)
+        if (entry and entry.get("sha256") == digest and entry.get("build") == key
+                and all(os.path.exists(p) for p in entry.get("outputs", {}).values())):
+            skipped += 1
+        else:
+            pending.append((path, name, digest))
+
+    converted = failed = 0
+    input_bytes = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(pending))) as pool:
+            futures = {
+                pool.submit(_convert_quietly, path, output_dir, formats, schema_path, name, bytecode_cache_dir,
+                            render_cache_dir, states):
+                    (path, name, digest)
+                for path, name, digest in pending
+            }
+            for future in as_completed(futures):
+                path, name, digest = futures[future]
+                try:
+                    outputs, snapshot = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to convert {path}: {e}")
+                    manifest.pop(name, None)
+                    failed += 1
+                    continue
+                get_metrics().merge(snapshot)
+                manifest[name] = {"input": path, "sha256": digest, "build": key, "outputs": outputs}
+                converted += 1
+                input_bytes += os.path.getsize(path)
+        save_manifest(output_dir, manifest)
+
+    elapsed = time.perf_counter() - started
+    rate = converted / elapsed if elapsed > 0 else 0.0
+    print(f"Converted {converted} of {len(inputs)} OKR files ({skipped} unchanged, {failed} failed) "
+          f"in {elapsed:.1f}s: {rate:.1f} files/s, {input_bytes / 1e6 / max(elapsed, 1e-9):.1f} MB/s")
+    return failed
@@ -1,35 +1,323 @@
+import argparse
+import contextlib
+import datetime
 import os
 import json
-import jsonschema
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from hungovercoders_workflow_doc_gen.columnar import COLUMNAR_FORMATS, hypotheses_path, write_tables
+from hungovercoders_workflow_doc_gen.formatter import FORMAT_TEMPLATES, template_digest
+from hungovercoders_workflow_doc_gen.metrics import get_metrics, stage
+from hungovercoders_workflow_doc_gen.model import Objective, to_json
+from hungovercoders_workflow_doc_gen.okr_index import OkrIndex
+from hungovercoders_workflow_doc_gen.render_cache import content_digest, render_key
+from hungovercoders_workflow_doc_gen.streaming import write_objectives_json, write_objectives_ndjson
+from hungovercoders_workflow_doc_gen.text_cleaning import clean_objectives
+from hungovercoders_workflow_doc_gen.validation import get_validator, log_validation_errors
 
 logger = logging.getLogger(__name__)
 
+# Incremental sync watermarks are moved back by this much to tolerate clock skew with Azure DevOps.
+SYNC_OVERLAP_SECONDS = 300
+
+FORMAT_LABELS = {"markdown": "Markdown", "doc": "Word-compatible HTML", "pdf": "PDF", "raw-json": "JSON",
+                 "ndjson": "NDJSON", "parquet": "Parquet", "arrow": "Arrow IPC"}
+
+def parse_formats(value, choices, all_formats=None):
+    """
+    Parse a comma-separated --format value such as "markdown,pdf", or "all" for every choice
+    (or every one of all_formats, when given). Returns the formats in the order given, without
+    duplicates. Raises argparse.ArgumentTypeError on unknown formats.
+    """
+    formats = []
+    for name in value.split(","):
+        name = name.strip()
+        if name == "all":
+            candidates = list(all_formats or choices)
+        elif name in choices:
+            candidates = [name]
+        else:
+            raise argparse.ArgumentTypeError(f"invalid format {name!r} (choose from {', '.join(choices)} or all)")
+        formats.extend(c for c in candidates if c not in formats)
+    if not formats:
+        raise argparse.ArgumentTypeError("no output format given")
+    return formats
+
+def parse_state_filter(value):
+    """
+    Parse a --filter value such as "state=Active,In Progress" into the list of objective states to keep.
+    Raises argparse.ArgumentTypeError for any other filter.
+    """
+    key, sep, values = value.partition("=")
+    states = list(dict.fromkeys(state.strip() for state in values.split(",") if state.strip()))
+    if not sep or key.strip() != "state" or not states:
+        raise argparse.ArgumentTypeError(f"invalid filter {value!r}: expected state=STATE[,STATE...]")
+    return states
+
 def validate_against_schema(data, schema_path):
     """
-    Validate data against a JSON schema. Raises SystemExit(1) on failure.
+    Validate data against a JSON schema, logging every error with its JSON path. Raises SystemExit(1) on failure.
+    Objectives held as model.Objective are converted and validated one at a time.
+    """
+    with stage("validate"):
+        validator = get_validator(schema_path)
+        objectives = data.get("objectives") if isinstance(data, dict) else None
+        if isinstance(objectives, list) and objectives and isinstance(objectives[0], Objective):
+            errors = [issue for index, obj in enumerate(objectives)
+                      for issue in validator.iter_objective_errors(obj.to_dict(), index)]
+        else:
+            errors = validator.errors(data)
+    if errors:
+        log_validation_errors(errors)
+        logger.error(f"OKR data validation failed with {len(errors)} error(s).")
+        raise SystemExit(1)
+    print("OKR data validated successfully against schema.")
+
+def iter_validated_objectives(objectives, schema_path):
     """
-    with open(schema_path, encoding='utf-8') as f:
-        schema = json.load(f)
+    Validate objectives one at a time against the schema's objective definition as they stream past.
+
+    At the first invalid objective nothing more is yielded: the remaining objectives are validated so
+    that every error is logged with its JSON path, then SystemExit(1) is raised.
+    """
+    with stage("validate"):
+        validator = get_validator(schema_path)
+    errors = []
+    # Timed inline and recorded once: a stage per objective would cost about as much as validating it.
+    seconds = 0.0
+    count = 0
     try:
-        jsonschema.validate(instance=data, schema=schema)
-        print("OKR data validated successfully against schema.")
-    except jsonschema.ValidationError as e:
-        logger.error(f"OKR data validation failed: {e.message}")
+        for index, obj in enumerate(objectives):
+            started = time.perf_counter()
+            issues = list(validator.iter_objective_errors(obj, index))
+            seconds += time.perf_counter() - started
+            count += 1
+            if issues:
+                log_validation_errors(issues)
+                errors.extend(issues)
+            elif not errors:
+                yield obj
+    finally:
+        get_metrics().add_nested_time("validate", seconds, count)
+    if errors:
+        logger.error(f"OKR data validation failed with {len(errors)} error(s).")
         raise SystemExit(1)
+    print("OKR data validated successfully against schema.")
+
+@contextlib.contextmanager
+def atomic_output(output_path):
+    """
+    Yield a temporary path next to output_path and move it into place only if the block succeeds.
+    """
+    tmp_path = output_path + ".tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class ReportError(RuntimeError):
+    """A report format could not be rendered; the cause has been logged."""
+
+def write_reports(formatter, okr_data, formats, output_dir, pdf_workers=1, name="okr_summary", render_cache=None,
+                  states=None):
+    """
+    Write each requested format for already fetched and validated OKR data, rendering formats in parallel.
+
+    The data is indexed once (see okr_index.py) and every format is rendered with the same index;
+    with ``states``, only the objectives in those states are written.
+
+    The Word-compatible HTML is rendered once and shared by the 'doc' and 'pdf' outputs, unless
+    pdf_workers > 1, in which case the PDF is rendered in shards by that many processes.
+    With a render_cache, formats whose data, template and report time are unchanged are restored
+    from the cache instead (an identical existing output is left untouched), and sharded PDFs
+    reuse every unchanged shard. Columnar formats are always written and are reported by the path
+    of their objectives table. Returns a dict of format to output path, in the order requested.
+    Raises ReportError when a format fails to render, after the other formats are written; nothing is
+    cached or left in place for the failed format.
+    """
+    paths = {format: get_output_path(output_dir, format, name) for format in formats}
+    with stage("index"):
+        objectives = okr_data["objectives"] if isinstance(okr_data, dict) else okr_data
+        index = OkrIndex(objectives)
+        if states:
+            okr_data = {"objectives": index.objectives_with_state(*states)}
+            index = OkrIndex(okr_data["objectives"])
+    keys = {}
+    todo = list(formats)
+    if render_cache is not None:
+        with stage("render_cache.lookup"):
+            digest = content_digest(okr_data)
+            timestamp = formatter.generated_at.isoformat() if formatter.generated_at else None
+            for format in formats:
+                if format in COLUMNAR_FORMATS:
+                    continue
+                template = FORMAT_TEMPLATES.get(format)
+                if template and timestamp is None:
+                    # Without a fixed report time the header shows the time of rendering, which a
+                    # cached report would freeze at its first render.
+                    continue
+                keys[format] = render_key(format, digest, template_digest(template) if template else None, timestamp)
+            todo = [format for format in formats
+                    if format not in keys or not render_cache.restore(keys[format], paths[format])]
 
-def get_output_path(output_dir, format):
+    if "markdown" in todo and index.objectives and isinstance(index.objectives[0], Objective):
+        # Rich-text fields are cleaned once here and stored on the models for the Markdown template;
+        # plain dicts have nowhere to keep the result and are cleaned as they are rendered.
+        with stage("clean"):
+            clean_objectives(index.objectives)
+
+    def write_text(format, text):
+        if not text:
+            # The formatter has logged why the template could not be rendered.
+            raise ReportError(f"Failed to render the {FORMAT_LABELS[format]} report")
+        with stage("write"), atomic_output(paths[format]) as tmp_path:
+            with open(tmp_path, "w", encoding='utf-8') as f:
+                f.write(text)
+
+    def render_json():
+        with stage("render.raw-json"):
+            return json.dumps(okr_data, indent=2, default=to_json)
+
+    def write_ndjson():
+        with stage("render.ndjson"), atomic_output(paths["ndjson"]) as tmp_path:
+            with open(tmp_path, "w", encoding='utf-8') as f:
+                write_objectives_ndjson(index.objectives, f)
+
+    def write_columnar(format):
+        write_columnar_tables(index.objectives, format, paths[format])
+
+    def write_pdf(html_future):
+        with atomic_output(paths["pdf"]) as tmp_path:
+            if pdf_workers > 1:
+                written = formatter.format_pdf_parallel(okr_data, tmp_path, workers=pdf_workers,
+                                                        render_cache=render_cache, index=index)
+            else:
+                written = formatter.format_pdf(okr_data, tmp_path, html=html_future.result(), index=index)
+            if not written:
+                raise ReportError(f"Failed to render the {FORMAT_LABELS['pdf']} report")
+
+    with ThreadPoolExecutor(max_workers=len(formats) + 1) as pool:
+        html_future = None
+        if "doc" in todo or ("pdf" in todo and pdf_workers <= 1):
+            html_future = pool.submit(formatter.format_doc, okr_data, index)
+        futures = {}
+        for format in todo:
+            if format == "markdown":
+                futures[format] = pool.submit(lambda: write_text("markdown", formatter.format_markdown(okr_data, index)))
+            elif format == "doc":
+                futures[format] = pool.submit(lambda: write_text("doc", html_future.result()))
+            elif format == "pdf":
+                futures[format] = pool.submit(write_pdf, html_future)
+            elif format == "raw-json":
+                futures[format] = pool.submit(lambda: write_text("raw-json", render_json()))
+            elif format == "ndjson":
+                futures[format] = pool.submit(write_ndjson)
+            elif format in COLUMNAR_FORMATS:
+                futures[format] = pool.submit(write_columnar, format)
+        errors = []
+        for format, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            # Only outputs written by this call are stored; a failed format leaves nothing to cache.
+            if render_cache is not None and format in keys:
+                with stage("render_cache.store"):
+                    render_cache.store(keys[format], paths[format])
+    if render_cache is not None:
+        with stage("render_cache.store"):
+            render_cache.prune()
+    if errors:
+        raise errors[0]
+    return paths
+
+def write_columnar_tables(objectives, format, output_path):
+    """
+    Atomically write the objectives table to output_path and the hypotheses table next to it.
+    """
+    with atomic_output(output_path) as objectives_tmp, atomic_output(hypotheses_path(output_path)) as hypotheses_tmp:
+        write_tables(objectives, format, objectives_tmp, hypotheses_tmp)
+
+def stream_report(formatter, format, objectives, output_path):
+    """
+    Write a single format straight from an iterable of objectives, which is consumed once; used when
+    only one format other than PDF is requested, so that memory use stays flat.
     """
-    Ensure output_dir exists and return the full output file path for the given format.
+    if format in COLUMNAR_FORMATS:
+        write_columnar_tables(objectives, format, output_path)
+        return
+    with atomic_output(output_path) as tmp_path:
+        if format == "markdown":
+            formatter.stream_markdown(objectives, tmp_path)
+        elif format == "doc":
+            formatter.stream_doc(objectives, tmp_path)
+        elif format == "ndjson":
+            with stage("render.ndjson"), open(tmp_path, "w", encoding='utf-8') as f:
+                write_objectives_ndjson(objectives, f)
+        else:
+            with open(tmp_path, "w", encoding='utf-8') as f:
+                write_objectives_json(objectives, f)
+
+def get_output_path(output_dir, format, name="okr_summary"):
+    """
+    Ensure output_dir exists and return the full output file path for the given format and base name.
+    Columnar formats are a pair of tables; this is the path of the objectives table (see columnar.hypotheses_path).
     """
     ext_map = {
         "markdown": ".md",
         "doc": ".html",
         "pdf": ".pdf",
         "raw-json": ".json",
-        "json": ".json"
+        "json": ".json",
+        "ndjson": ".ndjson",
+        "parquet": ".objectives.parquet",
+        "arrow": ".objectives.arrow",
     }
     ext = ext_map.get(format, ".md")
     if not os.path.isdir(output_dir):
         os.makedirs(output_dir, exist_ok=True)
-    return os.path.join(output_dir, f"okr_summary{ext}")
+    return os.path.join(output_dir, f"{name}{ext}")
+
+def utc_timestamp(offset_seconds=0.0):
+    """
+    Return the current UTC time, shifted by offset_seconds, as an ISO 8601 string with millisecond precision, as used in WIQL.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=offset_seconds)
+    return now.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+def load_sync_state(state_path, organization, project):
+    """
+    Load the incremental sync state written by save_sync_state.
+    Returns None when there is no usable state for this organization and project.
+    """
+    if not os.path.exists(state_path):
+        return None
+    try:
+        with open(state_path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable sync state {state_path}: {e}")
+        return None
+    if state.get("organization") != organization or state.get("project") != project:
+        logger.warning(f"Ignoring sync state {state_path}: it belongs to {state.get('organization')}/{state.get('project')}")
+        return None
+    if not state.get("watermark") or not isinstance(state.get("okr_data"), dict):
+        return None
+    return state
+
+def save_sync_state(state_path, organization, project, watermark, okr_data):
+    """
+    Atomically write the incremental sync state: the high-water mark and the normalized OKR data.
+    """
+    state_dir = os.path.dirname(state_path)
+    if state_dir:
+        os.makedirs(state_dir, exist_ok=True)
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w", encoding='utf-8') as f:
+        json.dump({"organization": organization, "project": project, "watermark": watermark, "okr_data": okr_data}, f,
+                  default=to_json)
+    os.replace(tmp_path, state_path)
@@ -0,0 +1,119 @@
+"""
+Columnar exports of OKR data for analytics: flat objective and hypothesis tables as Parquet or Arrow IPC files.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from hungovercoders_workflow_doc_gen.metrics import stage
+from hungovercoders_workflow_doc_gen.model import get_field
+
+# Formats written as a pair of tables rather than one document; both need pyarrow.
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+# Objectives per record batch (Parquet row group) of the objectives table.
+BATCH_SIZE = 10_000
+
+OBJECTIVE_COLUMNS = ("id", "title", "state", "link", "objective", "key_results", "method_of_measure",
+                     "objective_outcome", "hypothesis_count")
+
+HYPOTHESIS_COLUMNS = ("objective_id", "id", "title", "state", "link", "hypothesis", "hypothesis_context",
+                      "method_of_measuring_hypothesis", "hypothesis_outcome")
+
+def require_pyarrow() -> None:
+    """
+    Raise ImportError with installation instructions when pyarrow is unavailable.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet and Arrow output need pyarrow: pip install hungovercoders_workflow_doc_gen[columnar]")
+
+def hypotheses_path(objectives_path: str) -> str:
+    """
+    Return the hypotheses table path that goes with an objectives table path,
+    e.g. okr_summary.hypotheses.parquet for okr_summary.objectives.parquet.
+    """
+    base, sep, ext = objectives_path.rpartition(".objectives.")
+    if not sep:
+        raise ValueError(f"Not an objectives table path: {objectives_path}")
+    return f"{base}.hypotheses.{ext}"
+
+def _id_text(value: Any) -> Optional[str]:
+    # The schema allows integer or string work item IDs, so ID columns are strings in every batch.
+    return None if value is None else str(value)
+
+def objective_row(objective: Any) -> Dict[str, Any]:
+    """Flatten one objective (dict or model object) into an objectives table row."""
+    row = {name: get_field(objective, name) for name in OBJECTIVE_COLUMNS[:-1]}
+    row["id"] = _id_text(row["id"])
+    row["hypothesis_count"] = len(get_field(objective, "hypotheses") or [])
+    return row
+
+def hypothesis_rows(objective: Any) -> List[Dict[str, Any]]:
+    """Flatten the hypotheses of one objective into hypotheses table rows; deeper children are not included."""
+    objective_id = _id_text(get_field(objective, "id"))
+    rows = []
+    for hypothesis in get_field(objective, "hypotheses") or []:
+        row = {name: get_field(hypothesis, name) for name in HYPOTHESIS_COLUMNS[1:]}
+        row["id"] = _id_text(row["id"])
+        row["objective_id"] = objective_id
+        rows.append(row)
+    return rows
+
+def _schemas() -> Tuple[Any, Any]:
+    import pyarrow as pa
+    text = pa.string()
+    objectives = pa.schema([
+        ("id", text), ("title", text), ("state", text), ("link", text), ("objective", text),
+        ("key_results", pa.list_(text)), ("method_of_measure", text), ("objective_outcome", text),
+        ("hypothesis_count", pa.int32()),
+    ])
+    hypotheses = pa.schema([
+        ("objective_id", text), ("id", text), ("title", text), ("state", text), ("link", text),
+        ("hypothesis", text), ("hypothesis_context", text), ("method_of_measuring_hypothesis", text),
+        ("hypothesis_outcome", text),
+    ])
+    return objectives, hypotheses
+
+def write_tables(objectives: Iterable[Any], format: str, objectives_path: str, hypotheses_path: str,
+                 batch_size: int = BATCH_SIZE) -> Tuple[int, int]:
+    """
+    Write the objectives and hypotheses tables as Parquet ('parquet') or Arrow IPC files ('arrow').
+
+    Objectives are consumed from any iterable and written ``batch_size`` at a time, so a streamed
+    input is never held in memory as a whole. Returns the number of objective and hypothesis rows.
+    """
+    if format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported columnar format: {format}")
+    require_pyarrow()
+    import pyarrow as pa
+    objective_schema, hypothesis_schema = _schemas()
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        writers = (pq.ParquetWriter(objectives_path, objective_schema),
+                   pq.ParquetWriter(hypotheses_path, hypothesis_schema))
+    else:
+        writers = (pa.ipc.new_file(objectives_path, objective_schema),
+                   pa.ipc.new_file(hypotheses_path, hypothesis_schema))
+    counts = [0, 0]
+    objective_batch: List[Dict[str, Any]] = []
+    hypothesis_batch: List[Dict[str, Any]] = []
+
+    def flush() -> None:
+        for writer, schema, rows, i in ((writers[0], objective_schema, objective_batch, 0),
+                                        (writers[1], hypothesis_schema, hypothesis_batch, 1)):
+            if rows:
+                writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+                counts[i] += len(rows)
+                rows.clear()
+
+    with stage(f"render.{format}"):
+        try:
+            for objective in objectives:
+                objective_batch.append(objective_row(objective))
+                hypothesis_batch.extend(hypothesis_rows(objective))
+                if len(objective_batch) >= batch_size:
+                    flush()
+            flush()
+        finally:
+            for writer in writers:
+                writer.close()
+    return counts[0], counts[1]
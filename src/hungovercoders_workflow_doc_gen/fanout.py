@@ -0,0 +1,235 @@
+"""
+Export of many Azure DevOps projects, across organizations, in one run with a combined roll-up report.
+"""
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from hungovercoders_workflow_doc_gen.azure_devops_client import AzureDevOpsClient, create_transport
+from hungovercoders_workflow_doc_gen.cli_utils import (
+    ReportError, atomic_output, utc_timestamp, validate_against_schema, write_reports
+)
+from hungovercoders_workflow_doc_gen.formatter import Formatter
+from hungovercoders_workflow_doc_gen.http_transport import RetryingTransport
+from hungovercoders_workflow_doc_gen.metrics import stage
+from hungovercoders_workflow_doc_gen.model import Objective
+from hungovercoders_workflow_doc_gen.okr_index import OkrIndex
+from hungovercoders_workflow_doc_gen.render_cache import RenderCache
+from hungovercoders_workflow_doc_gen.work_item_cache import WorkItemCache
+
+logger = logging.getLogger(__name__)
+
+# Written to the output directory next to the roll-up reports.
+SUMMARY_NAME = "okr_rollup.summary.json"
+
+@dataclass
+class OrganizationSettings:
+    """Connection settings and limits shared by every project of one organization."""
+    name: str
+    api_root: Optional[str] = None
+    pat_env: Optional[str] = None
+    max_in_flight: int = 8
+    max_requests_per_second: Optional[float] = None
+
+
+@dataclass
+class ProjectTarget:
+    """One project to export."""
+    organization: str
+    project: str
+    depth: int = 2
+
+
+@dataclass
+class FanoutConfig:
+    """The organizations and projects listed in a fan-out config file."""
+    organizations: Dict[str, OrganizationSettings] = field(default_factory=dict)
+    projects: List[ProjectTarget] = field(default_factory=list)
+
+
+@dataclass
+class ProjectResult:
+    """The outcome of exporting one project."""
+    target: ProjectTarget
+    seconds: float = 0.0
+    okr_data: Optional[Dict[str, Any]] = None
+    outputs: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the summary entry of this project."""
+        objectives = self.okr_data["objectives"] if self.okr_data else []
+        return {
+            "organization": self.target.organization,
+            "project": self.target.project,
+            "status": "failed" if self.error else "ok",
+            "error": self.error,
+            "seconds": round(self.seconds, 3),
+            **OkrIndex(objectives).summary(),
+            "outputs": self.outputs,
+        }
+
+
+def load_fanout_config(path: str) -> FanoutConfig:
+    """
+    Load a fan-out config file::
+
+        {
+          "organizations": {"contoso": {"max_in_flight": 8, "max_requests_per_second": 20, "pat_env": "CONTOSO_PAT"}},
+          "projects": [{"organization": "contoso", "project": "Web"}, {"organization": "contoso", "project": "Mobile", "depth": 3}]
+        }
+
+    Organizations missing from "organizations" get the default settings. Raises ValueError if the
+    file is malformed.
+    """
+    with open(path, encoding='utf-8') as f:
+        try:
+            raw = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{path} is not valid JSON: {e}")
+    if not isinstance(raw, dict) or not isinstance(raw.get("projects"), list) or not raw["projects"]:
+        raise ValueError(f"{path} must contain a non-empty 'projects' list")
+    config = FanoutConfig()
+    try:
+        for name, settings in (raw.get("organizations") or {}).items():
+            config.organizations[name] = OrganizationSettings(name=name, **settings)
+        seen = set()
+        for entry in raw["projects"]:
+            target = ProjectTarget(**entry)
+            if (target.organization, target.project) in seen:
+                raise ValueError(f"{target.organization}/{target.project} is listed twice")
+            seen.add((target.organization, target.project))
+            config.organizations.setdefault(target.organization, OrganizationSettings(name=target.organization))
+            config.projects.append(target)
+    except TypeError as e:
+        raise ValueError(f"{path}: {e}")
+    return config
+
+def interleave_by_organization(projects: List[ProjectTarget]) -> List[ProjectTarget]:
+    """
+    Order projects round-robin across organizations, so that the projects of one busy organization
+    do not take every worker while they wait on its request limits.
+    """
+    queues: Dict[str, List[ProjectTarget]] = {}
+    for target in projects:
+        queues.setdefault(target.organization, []).append(target)
+    ordered = []
+    while queues:
+        for organization in list(queues):
+            ordered.append(queues[organization].pop(0))
+            if not queues[organization]:
+                del queues[organization]
+    return ordered
+
+def export_project(client: AzureDevOpsClient, target: ProjectTarget, output_dir: str, formats: List[str],
+                   schema_path: Optional[str], formatter: Formatter, render_cache: Optional[RenderCache] = None,
+                   pdf_workers: int = 1, states: Optional[List[str]] = None) -> ProjectResult:
+    """
+    Export one project to output_dir/<organization>/<project>, keeping only objectives in ``states`` if
+    given. Failures are recorded in the result rather than raised, so that one project cannot stop the others.
+    """
+    result = ProjectResult(target)
+    started = time.perf_counter()
+    try:
+        with stage("load"):
+            objectives = client.iter_normalized_objectives(max_depth=target.depth)
+            okr_data = {"objectives": [Objective.from_dict(obj) for obj in objectives]}
+        if schema_path:
+            validate_against_schema(okr_data, schema_path)
+        project_dir = os.path.join(output_dir, target.organization, target.project)
+        result.outputs = write_reports(formatter, okr_data, formats, project_dir, pdf_workers=pdf_workers,
+                                       render_cache=render_cache, states=states)
+        result.okr_data = okr_data
+    except SystemExit:
+        # Validation errors have been logged with their JSON paths.
+        result.error = "OKR data failed schema validation"
+    except Exception as e:
+        result.error = str(e) or type(e).__name__
+    result.seconds = time.perf_counter() - started
+    if result.error:
+        logger.error(f"Export of {target.organization}/{target.project} failed: {result.error}")
+    return result
+
+def run_fanout(config: FanoutConfig, output_dir: str, formats: List[str], schema_path: Optional[str],
+               pat: Optional[str] = None, api_root: str = "https://dev.azure.com", jobs: int = 4, concurrency: int = 4, max_retries: int = 5,
+               cache: Optional[WorkItemCache] = None, bytecode_cache_dir: Optional[str] = None,
+               render_cache_dir: Optional[str] = None, pdf_workers: int = 1,
+               states: Optional[List[str]] = None) -> int:
+    """
+    Export every project of the config, up to ``jobs`` at a time, then write a roll-up.
+    Organizations without an ``api_root`` of their own use ``api_root``.
+
+    Projects of one organization share a RetryingTransport: one authenticated session and connection
+    pool, throttling signals, and the organization's ``max_in_flight`` and ``max_requests_per_second``
+    limits. Each project's reports are written as soon as it finishes, so a slow or failing project
+    delays only the roll-up. The roll-up reports (okr_rollup.*) combine the objectives of every
+    successful project in config order, and okr_rollup.summary.json records the outcome of each
+    project and the request counters of each organization. Returns the number of failed projects,
+    plus one if the roll-up reports could not be rendered.
+    """
+    transports: Dict[str, RetryingTransport] = {}
+    for name, settings in config.organizations.items():
+        token = os.environ.get(settings.pat_env, "") if settings.pat_env else pat
+        if not token:
+            source = f"set {settings.pat_env}" if settings.pat_env else "pass --pat"
+            raise ValueError(f"No personal access token for organization {name}: {source}")
+        transports[name] = create_transport(
+            token, pool_size=settings.max_in_flight, max_retries=max_retries,
+            max_in_flight=settings.max_in_flight, max_requests_per_second=settings.max_requests_per_second)
+
+    formatter = Formatter(bytecode_cache_dir=bytecode_cache_dir)
+    render_cache = RenderCache(render_cache_dir) if render_cache_dir else None
+    started = time.perf_counter()
+    results: Dict[Tuple[str, str], ProjectResult] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(config.projects)))) as pool:
+        futures = {}
+        for target in interleave_by_organization(config.projects):
+            settings = config.organizations[target.organization]
+            client = AzureDevOpsClient(target.organization, target.project, "", concurrency=concurrency,
+                                       api_root=settings.api_root or api_root, cache=cache,
+                                       transport=transports[target.organization])
+            futures[pool.submit(export_project, client, target, output_dir, formats, schema_path, formatter,
+                                render_cache, pdf_workers, states)] = target
+        for future in as_completed(futures):
+            result = future.result()
+            results[(result.target.organization, result.target.project)] = result
+            label = f"{result.target.organization}/{result.target.project}"
+            if result.error:
+                print(f"{label}: FAILED after {result.seconds:.1f}s: {result.error}")
+            else:
+                print(f"{label}: {len(result.okr_data['objectives'])} objectives in {result.seconds:.1f}s")
+
+    ordered = [results[(target.organization, target.project)] for target in config.projects]
+    succeeded = [result for result in ordered if not result.error]
+    rollup: Dict[str, str] = {}
+    rollup_error = None
+    if succeeded:
+        okr_data = {"objectives": [obj for result in succeeded for obj in result.okr_data["objectives"]]}
+        try:
+            with stage("rollup"):
+                rollup = write_reports(formatter, okr_data, formats, output_dir, pdf_workers=pdf_workers,
+                                       name="okr_rollup", render_cache=render_cache, states=states)
+        except ReportError as e:
+            rollup_error = str(e)
+            logger.error(f"Roll-up failed: {rollup_error}")
+    summary = {
+        "generated_at": utc_timestamp(),
+        "projects": [result.to_dict() for result in ordered],
+        "organizations": {name: transport.stats.as_dict() for name, transport in transports.items()},
+        "rollup": rollup,
+        "rollup_error": rollup_error,
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    summary_path = os.path.join(output_dir, SUMMARY_NAME)
+    with atomic_output(summary_path) as tmp_path:
+        with open(tmp_path, "w", encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+    failed = len(ordered) - len(succeeded)
+    print(f"Exported {len(succeeded)} of {len(ordered)} projects ({failed} failed) "
+          f"in {time.perf_counter() - started:.1f}s; roll-up summary written to {summary_path}")
+    return failed + (1 if rollup_error else 0)
@@ -1,35 +1,136 @@
 """
 MarkdownOKRFormatter: Outputs OKR data as Markdown.
 """
+import datetime
+import functools
+import hashlib
+import io
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable, Optional, TYPE_CHECKING
 import os
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
-from weasyprint import HTML
+from hungovercoders_workflow_doc_gen.metrics import stage
+from hungovercoders_workflow_doc_gen.okr_index import OkrIndex
+from hungovercoders_workflow_doc_gen.render_cache import RenderCache, combine_digests, content_digest, render_key
+from hungovercoders_workflow_doc_gen.text_cleaning import text_field
+
+# Jinja2 and WeasyPrint are imported on first use: WeasyPrint is only needed for PDF output, and
+# neither is needed for commands that fail or exit before rendering.
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
 
 logger = logging.getLogger(__name__)
 
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# Objectives per PDF shard when rendering in parallel; each shard starts on a new page.
+PDF_CHUNK_SIZE = 25
+
+# Template for each template-based format, used to key rendered artifacts in the render cache.
+FORMAT_TEMPLATES = {"markdown": "okr_markdown_template.j2", "doc": "okr_doc_template.j2", "pdf": "okr_doc_template.j2"}
+
+def now(context, tz=None, fmt=None):
+    """
+    Jinja2 global returning the report time, formatted with fmt if given.
+
+    This is the ``generated_at`` datetime of the template context when one is given, which makes
+    renders reproducible, and otherwise the current local time.
+    """
+    dt = context.get("generated_at") or datetime.datetime.now()
+    if fmt:
+        return dt.strftime(fmt)
+    return dt.isoformat()
+
+@functools.lru_cache(maxsize=None)
+def get_environment(bytecode_cache_dir: Optional[str] = None, compiled_templates_dir: Optional[str] = None) -> "Environment":
+    """
+    Return the shared Jinja2 environment for a cache configuration, creating it on first use.
+
+    Compiled templates are kept by the environment for the life of the process, so every Formatter
+    using the same configuration shares them. ``bytecode_cache_dir`` additionally persists compiled
+    template bytecode across processes; ``compiled_templates_dir`` loads templates precompiled with
+    compile_templates() before falling back to the template sources.
+    """
+    from jinja2 import (
+        ChoiceLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, ModuleLoader, pass_context
+    )
+    loader = FileSystemLoader(TEMPLATE_DIR)
+    if compiled_templates_dir:
+        loader = ChoiceLoader([ModuleLoader(compiled_templates_dir), loader])
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        try:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+        except OSError as e:
+            logger.warning(f"Template bytecode cache disabled, cannot use {bytecode_cache_dir}: {e}")
+    env = Environment(
+        loader=loader,
+        extensions=["jinja2.ext.do", "jinja2.ext.loopcontrols"],
+        bytecode_cache=bytecode_cache,
+        # Packaged templates do not change while the process runs; skip the per-render mtime check.
+        auto_reload=False,
+    )
+    env.globals['now'] = pass_context(now)
+    # Rich-text fields, pre-cleaned by text_cleaning.clean_objectives() or cleaned and cached on use.
+    env.filters['text'] = text_field
+    return env
+
+def source_date_epoch() -> Optional[datetime.datetime]:
+    """
+    Return the time given by the SOURCE_DATE_EPOCH environment variable (reproducible builds), if set.
+    """
+    value = os.environ.get("SOURCE_DATE_EPOCH")
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromtimestamp(int(value), tz=datetime.timezone.utc)
+    except ValueError:
+        logger.warning(f"Ignoring invalid SOURCE_DATE_EPOCH {value!r}")
+        return None
+
+@functools.lru_cache(maxsize=None)
+def template_digest(name: str) -> str:
+    """Return the SHA-256 digest of a packaged template's source."""
+    with open(os.path.join(TEMPLATE_DIR, name), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def compile_templates(target: str) -> None:
+    """
+    Compile the packaged templates ahead of time into Python modules in ``target``.
+    Pass ``target`` as ``compiled_templates_dir`` to Formatter to load them without parsing.
+    """
+    os.makedirs(target, exist_ok=True)
+    get_environment().compile_templates(target, zip=None, ignore_errors=False)
+
 class Formatter:
     """
     Formats Objectives, Key Results, Hypotheses, and Issues into Markdown, Word-compatible HTML, and JSON.
+
+    Formatters share compiled templates through get_environment(), so creating many Formatter
+    objects, or rendering several formats from one, compiles each template only once per process.
+    Template loading and rendering are timed as ``templates.load``, ``render.*`` and ``pdf.*`` stages.
     """
-    def __init__(self) -> None:
-        # Set up Jinja2 environment for templates
-        template_dir = os.path.dirname(os.path.abspath(__file__))
-        self.env = Environment(
-            loader=FileSystemLoader(template_dir + '/templates'),
-            extensions=["jinja2.ext.do", "jinja2.ext.loopcontrols"]
-        )
-        # Add 'now' function to Jinja2 environment
-        from jinja2 import pass_context
-        import datetime
-        @pass_context
-        def now(context, tz=None, fmt=None):
-            dt = datetime.datetime.now()
-            if fmt:
-                return dt.strftime(fmt)
-            return dt.isoformat()
-        self.env.globals['now'] = now
+    def __init__(self, bytecode_cache_dir: Optional[str] = None, compiled_templates_dir: Optional[str] = None,
+                 generated_at: Optional[datetime.datetime] = None) -> None:
+        self.bytecode_cache_dir = bytecode_cache_dir
+        self.compiled_templates_dir = compiled_templates_dir
+        # A fixed report time makes output deterministic, so rendered artifacts can be cached.
+        self.generated_at = generated_at or source_date_epoch()
+
+    @property
+    def env(self) -> "Environment":
+        """
+        The shared Jinja2 environment for this formatter's cache configuration, created on first use.
+        """
+        return get_environment(self.bytecode_cache_dir, self.compiled_templates_dir)
+
+    def get_template(self, name: str) -> "Template":
+        """
+        Return a compiled template from the shared environment.
+        """
+        with stage("templates.load"):
+            return self.env.get_template(name)
 
     def _extract_objectives(self, okr_data: Any) -> List[Dict[str, Any]]:
         """
@@ -42,19 +143,94 @@ class Formatter:
             return okr_data
         return []
 
-    def format_markdown(self, okr_data: Any) -> str:
+    def _stream_objectives(self, okr_data: Any) -> Iterable[Dict[str, Any]]:
+        """
+        Like _extract_objectives, but passes iterators and generators of objectives through unchanged.
+        """
+        if isinstance(okr_data, (dict, list)):
+            return self._extract_objectives(okr_data)
+        if isinstance(okr_data, Iterable) and not isinstance(okr_data, (str, bytes)):
+            return okr_data
+        return []
+
+    def _stream_template(self, template_name: str, okr_data: Any, output_path: str, format: str) -> None:
+        """
+        Render a template straight to a file, pulling objectives from the input as output is written.
+        """
+        with stage(f"render.{format}"):
+            template = self.get_template(template_name)
+            # Counted as objectives stream past, so the summary at the end of the document is complete.
+            index = OkrIndex(keep_items=False)
+            stream = template.stream(objectives=index.track(self._stream_objectives(okr_data)), index=index,
+                                     generated_at=self.generated_at)
+            stream.enable_buffering(size=64)
+            stream.dump(output_path, encoding="utf-8")
+
+    def stream_markdown(self, okr_data: Any, output_path: str) -> None:
+        """
+        Write the Markdown document for OKR data directly to a file without building it in memory.
+
+        Args:
+            okr_data: Dict with 'objectives' key, list of objective dicts, or any iterable (e.g. a generator) of objectives.
+            output_path: Path to write the Markdown file.
+        Raises:
+            jinja2.TemplateNotFound: If the Markdown template is missing.
+        """
+        self._stream_template('okr_markdown_template.j2', okr_data, output_path, "markdown")
+
+    def stream_doc(self, okr_data: Any, output_path: str) -> None:
+        """
+        Write the Word-compatible HTML document for OKR data directly to a file without building it in memory.
+
+        Args:
+            okr_data: Dict with 'objectives' key, list of objective dicts, or any iterable (e.g. a generator) of objectives.
+            output_path: Path to write the HTML file.
+        Raises:
+            jinja2.TemplateNotFound: If the Word template is missing.
+        """
+        self._stream_template('okr_doc_template.j2', okr_data, output_path, "doc")
+
+    def render(self, format: str, okr_data: Any, index: Optional[OkrIndex] = None) -> str:
+        """
+        Render OKR data in one of the template-based formats ('markdown' or 'doc').
+
+        Raises:
+            ValueError: If the format is not template-based.
+        """
+        if format == "markdown":
+            return self.format_markdown(okr_data, index)
+        if format == "doc":
+            return self.format_doc(okr_data, index)
+        raise ValueError(f"Unsupported template format: {format}")
+
+    def render_many(self, formats: Iterable[str], okr_data: Any) -> Dict[str, str]:
+        """
+        Render OKR data in several template-based formats, reusing the compiled templates.
+
+        Returns:
+            Dict of format name to rendered document.
+        """
+        objectives = self._extract_objectives(okr_data)
+        index = OkrIndex(objectives)
+        return {format: self.render(format, objectives, index) for format in formats}
+
+    def format_markdown(self, okr_data: Any, index: Optional[OkrIndex] = None) -> str:
         """
         Generate a Markdown document from OKR data (dict or list) using a Jinja2 template.
 
         Args:
             okr_data: Dict with 'objectives' key or list of objective dicts.
+            index: OkrIndex of the same objectives, if already built; templates receive it as ``index``.
         Returns:
             Markdown string representing the OKR structure.
         """
+        from jinja2 import TemplateNotFound
         objectives = self._extract_objectives(okr_data)
         try:
-            template = self.env.get_template('okr_markdown_template.j2')
-            return template.render(objectives=objectives)
+            with stage("render.markdown"):
+                template = self.get_template('okr_markdown_template.j2')
+                return template.render(objectives=objectives, index=index or OkrIndex(objectives),
+                                       generated_at=self.generated_at)
         except TemplateNotFound:
             logger.error("Markdown template 'okr_markdown_template.j2' not found.")
             return ""
@@ -62,19 +238,23 @@ class Formatter:
             logger.error(f"Failed to format markdown: {e}")
             return ""
 
-    def format_doc(self, okr_data: Any) -> str:
+    def format_doc(self, okr_data: Any, index: Optional[OkrIndex] = None) -> str:
         """
         Generate a Word-compatible HTML document from OKR data (dict or list) using a Jinja2 template.
 
         Args:
             okr_data: Dict with 'objectives' key or list of objective dicts.
+            index: OkrIndex of the same objectives, if already built; templates receive it as ``index``.
         Returns:
             HTML string representing the OKR structure, compatible with Word.
         """
+        from jinja2 import TemplateNotFound
         objectives = self._extract_objectives(okr_data)
         try:
-            template = self.env.get_template('okr_doc_template.j2')
-            return template.render(objectives=objectives)
+            with stage("render.doc"):
+                template = self.get_template('okr_doc_template.j2')
+                return template.render(objectives=objectives, index=index or OkrIndex(objectives),
+                                       generated_at=self.generated_at)
         except TemplateNotFound:
             logger.error("Word template 'okr_doc_template.j2' not found.")
             return ""
@@ -82,20 +262,134 @@ class Formatter:
             logger.error(f"Failed to format word-compatible HTML: {e}")
             return ""
 
-    def format_pdf(self, okr_data: Any, output_path: str) -> None:
+    def format_pdf(self, okr_data: Any, output_path: str, html: Optional[str] = None,
+                   index: Optional[OkrIndex] = None) -> bool:
         """
         Generate a PDF document from OKR data (dict or list) using the Word-compatible HTML Jinja2 template and WeasyPrint.
 
         Args:
             okr_data: Dict with 'objectives' key or list of objective dicts.
             output_path: Path to write the PDF file.
+            html: HTML already rendered by format_doc for the same data; the template is not rendered again.
+            index: OkrIndex of the same objectives, if already built.
+        Returns:
+            True if the PDF was written; errors are logged and give False.
+        """
+        from jinja2 import TemplateNotFound
+        try:
+            with stage("render.pdf"):
+                with stage("pdf.import"):
+                    from weasyprint import HTML
+                if html is None:
+                    with stage("render.doc"):
+                        objectives = self._extract_objectives(okr_data)
+                        template = self.get_template('okr_doc_template.j2')
+                        html = template.render(objectives=objectives, index=index or OkrIndex(objectives),
+                                               generated_at=self.generated_at)
+                with stage("pdf.layout"):
+                    HTML(string=html).write_pdf(output_path)
+            return True
+        except TemplateNotFound:
+            logger.error("Word template 'okr_doc_template.j2' not found for PDF export.")
+        except Exception as e:
+            logger.error(f"Failed to generate PDF: {e}")
+        return False
+
+    def render_pdf_chunk_html(self, objectives: List[Dict[str, Any]], include_header: bool = True,
+                              index: Optional[OkrIndex] = None, include_summary: bool = True) -> str:
+        """
+        Render the Word-compatible HTML for one PDF shard. Only the first shard carries the report header
+        and only the last one the summary, from ``index`` (by default, an index of the shard's objectives).
+        """
+        template = self.get_template('okr_doc_template.j2')
+        return template.render(objectives=objectives, include_header=include_header, generated_at=self.generated_at,
+                               index=(index or OkrIndex(objectives)) if include_summary else None)
+
+    def format_pdf_parallel(self, okr_data: Any, output_path: str, workers: Optional[int] = None,
+                            chunk_size: int = PDF_CHUNK_SIZE, render_cache: Optional["RenderCache"] = None,
+                            index: Optional[OkrIndex] = None) -> bool:
+        """
+        Generate a PDF like format_pdf, laying out shards of objectives with WeasyPrint in separate processes.
+
+        Objectives are split into shards of ``chunk_size`` that each start on a new page. Every shard is
+        rendered to PDF in a ProcessPoolExecutor and the shards are concatenated in order with pypdf,
+        so pages are numbered continuously. Without pypdf the shards are laid out in this process and
+        their pages joined with WeasyPrint's Document.copy instead.
+
+        With a render_cache, each shard is cached under a key of its objectives, so a change to one
+        objective only re-renders the shard containing it. The first shard, which shows the report
+        time, is only cached when ``generated_at`` is fixed.
+
+        Args:
+            okr_data: Dict with 'objectives' key or list of objective dicts.
+            output_path: Path to write the PDF file.
+            workers: Number of worker processes (default: one per CPU).
+            chunk_size: Objectives per shard.
+            render_cache: Optional cache of rendered shards (requires pypdf).
+            index: OkrIndex of the same objectives, if already built; its counts go to the last shard.
+        Returns:
+            True if the PDF was written; errors are logged and give False.
         """
+        from jinja2 import TemplateNotFound
         objectives = self._extract_objectives(okr_data)
+        chunks = [objectives[start:start + chunk_size] for start in range(0, len(objectives), chunk_size)] or [[]]
+        summary = (index or OkrIndex(objectives)).counts()
+        last = len(chunks) - 1
         try:
-            template = self.env.get_template('okr_doc_template.j2')
-            html_str = template.render(objectives=objectives)
-            HTML(string=html_str).write_pdf(output_path)
+            with stage("render.pdf"):
+                try:
+                    from pypdf import PdfWriter
+                except ImportError:
+                    from weasyprint import HTML
+                    logger.warning("pypdf is not installed; rendering PDF shards in a single process.")
+                    documents = [HTML(string=self.render_pdf_chunk_html(chunk, i == 0, summary, i == last)).render()
+                                 for i, chunk in enumerate(chunks)]
+                    pages = [page for document in documents for page in document.pages]
+                    documents[0].copy(pages).write_pdf(output_path)
+                    return True
+                shards: List[Optional[bytes]] = [None] * len(chunks)
+                keys: List[Optional[str]] = [None] * len(chunks)
+                if render_cache is not None:
+                    timestamp = self.generated_at.isoformat() if self.generated_at else None
+                    for i, chunk in enumerate(chunks):
+                        if i == 0 and timestamp is None:
+                            # The first shard carries the report time, which is only cacheable when fixed.
+                            continue
+                        keys[i] = render_key("pdf-shard", combine_digests(content_digest(obj) for obj in chunk),
+                                             template_digest('okr_doc_template.j2'), str(i == 0), timestamp,
+                                             content_digest(summary.summary()) if i == last else None)
+                        shards[i] = render_cache.get_bytes(keys[i], ".pdf")
+                missing = [i for i, shard in enumerate(shards) if shard is None]
+                jobs = [(chunks[i], i == 0, summary if i == last else None, self.bytecode_cache_dir,
+                         self.compiled_templates_dir, self.generated_at)
+                        for i in missing]
+                if jobs:
+                    # Shards are laid out in worker processes; only their overall wall time is measured here.
+                    with stage("pdf.shards"), ProcessPoolExecutor(
+                            max_workers=min(workers or os.cpu_count() or 1, len(jobs))) as pool:
+                        for i, pdf_bytes in zip(missing, pool.map(_render_pdf_chunk, jobs)):
+                            shards[i] = pdf_bytes
+                            if keys[i] is not None:
+                                render_cache.put_bytes(keys[i], pdf_bytes, ".pdf")
+                with stage("pdf.merge"):
+                    writer = PdfWriter()
+                    for pdf_bytes in shards:
+                        writer.append(io.BytesIO(pdf_bytes))
+                    with open(output_path, "wb") as f:
+                        writer.write(f)
+            return True
         except TemplateNotFound:
             logger.error("Word template 'okr_doc_template.j2' not found for PDF export.")
         except Exception as e:
-            logger.error(f"Failed to generate PDF: {e}")
\ No newline at end of file
+            logger.error(f"Failed to generate PDF: {e}")
+        return False
+
+def _render_pdf_chunk(job: tuple) -> bytes:
+    """
+    Process pool worker: render one shard of objectives to PDF bytes.
+    """
+    from weasyprint import HTML
+    objectives, include_header, summary, bytecode_cache_dir, compiled_templates_dir, generated_at = job
+    formatter = Formatter(bytecode_cache_dir, compiled_templates_dir, generated_at)
+    html = formatter.render_pdf_chunk_html(objectives, include_header, summary, include_summary=summary is not None)
+    return HTML(string=html).write_pdf()
@@ -0,0 +1,209 @@
+"""
+Retrying HTTP transport that honours Azure DevOps throttling signals.
+"""
+import email.utils
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from hungovercoders_workflow_doc_gen.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Status codes that indicate a transient failure worth retrying.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+@dataclass
+class TransportStats:
+    """
+    Per-run counters for a RetryingTransport.
+    """
+    requests: int = 0
+    retries: int = 0
+    throttled_responses: int = 0
+    retry_delay_seconds: float = 0.0
+    pacing_delay_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters as a plain dict."""
+        return asdict(self)
+
+
+class RetryingTransport:
+    """
+    Sends requests through a requests.Session, retrying transient failures.
+
+    - 429 and 5xx responses and connection errors are retried with exponential backoff and full jitter.
+    - ``Retry-After`` (seconds or HTTP date) overrides the computed backoff and also holds back
+      every other caller until it has passed.
+    - ``X-RateLimit-Remaining``/``X-RateLimit-Reset`` and ``X-RateLimit-Delay`` slow all callers
+      down before the service starts rejecting requests.
+    - ``max_in_flight`` caps the number of requests sent at once and ``max_requests_per_second``
+      spaces out request starts, for clients that share the transport (and its session's connection
+      pool) to stay within one organization's limits.
+
+    The transport is safe to share between threads; pacing and limits apply to every caller.
+    Every attempt is also recorded in the process metrics (see metrics.py) with its latency and size.
+    """
+    def __init__(
+        self,
+        session: requests.Session,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 60.0,
+        timeout: float = 30.0,
+        low_remaining_ratio: float = 0.1,
+        max_in_flight: Optional[int] = None,
+        max_requests_per_second: Optional[float] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.session = session
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.low_remaining_ratio = low_remaining_ratio
+        self.stats = TransportStats()
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._not_before = 0.0
+        self._in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        self._interval = 1.0 / max_requests_per_second if max_requests_per_second else 0.0
+        self._next_start = 0.0
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request, retrying transient failures.
+
+        Returns the final response, which may still be an error once retries are exhausted.
+        Raises the last connection error if every attempt failed to connect.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            self._wait_for_pacing()
+            with self._lock:
+                self.stats.requests += 1
+            started = time.perf_counter()
+            try:
+                if self._in_flight is None:
+                    resp = self.session.request(method, url, **kwargs)
+                else:
+                    with self._in_flight:
+                        resp = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._observe(method, url, None, time.perf_counter() - started)
+                if attempt >= self.max_retries:
+                    logger.error(f"{method} {url} failed after {attempt + 1} attempts: {e}")
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"{method} {url} failed ({e}); retrying in {delay:.2f}s")
+            else:
+                self._observe(method, url, resp, time.perf_counter() - started)
+                self._observe_rate_limit(resp)
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return resp
+                if resp.status_code == 429:
+                    with self._lock:
+                        self.stats.throttled_responses += 1
+                    get_metrics().increment("http.throttled_responses")
+                retry_after = self._retry_after(resp)
+                if retry_after is not None:
+                    # The limit is shared, so every caller holds off until the service is ready again.
+                    with self._lock:
+                        self._not_before = max(self._not_before, self._clock() + retry_after)
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                logger.warning(f"{method} {url} returned {resp.status_code}; retrying in {delay:.2f}s")
+            with self._lock:
+                self.stats.retries += 1
+                self.stats.retry_delay_seconds += delay
+            metrics = get_metrics()
+            metrics.increment("http.retries")
+            metrics.increment("http.retry_delay_seconds", delay)
+            self._sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _observe(method: str, url: str, resp: Optional[requests.Response], seconds: float) -> None:
+        """Record one attempt in the process metrics, keyed by method and API path (e.g. "POST wit/wiql")."""
+        endpoint = f"{method} {urlsplit(url).path.split('/_apis/')[-1]}"
+        body = getattr(getattr(resp, "request", None), "body", None)
+        content = getattr(resp, "content", None)
+        get_metrics().observe_request(
+            endpoint,
+            resp.status_code if resp is not None else 0,
+            seconds,
+            request_bytes=len(body) if isinstance(body, (bytes, str)) else 0,
+            response_bytes=len(content) if isinstance(content, bytes) else 0,
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after(self, resp: requests.Response) -> Optional[float]:
+        """Parse a Retry-After header given either in seconds or as an HTTP date."""
+        value = resp.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return min(self.backoff_max, max(0.0, float(value)))
+        except ValueError:
+            pass
+        try:
+            when = email.utils.parsedate_to_datetime(value).timestamp()
+        except (TypeError, ValueError):
+            return None
+        return min(self.backoff_max, max(0.0, when - self._clock()))
+
+    def _observe_rate_limit(self, resp: requests.Response) -> None:
+        """
+        Push back the earliest time of the next request based on X-RateLimit-* headers.
+        """
+        headers = resp.headers
+        pause = 0.0
+        try:
+            # The service is already delaying our requests: back off by the same amount.
+            pause = float(headers.get("X-RateLimit-Delay") or 0.0)
+        except ValueError:
+            pass
+        try:
+            remaining = float(headers["X-RateLimit-Remaining"])
+            limit = float(headers["X-RateLimit-Limit"])
+            reset = float(headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            remaining = limit = reset = None
+        if remaining is not None and limit and remaining / limit < self.low_remaining_ratio:
+            # Spread what is left of the budget over the rest of the window.
+            window = max(0.0, reset - self._clock())
+            pause = max(pause, window / max(remaining, 1.0))
+        if pause > 0:
+            pause = min(pause, self.backoff_max)
+            with self._lock:
+                self._not_before = max(self._not_before, self._clock() + pause)
+
+    def _wait_for_pacing(self) -> None:
+        """
+        Sleep until the pacing window set by rate-limit headers has passed and, with
+        max_requests_per_second, until this caller's reserved start slot.
+        """
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._not_before)
+            if self._interval:
+                start = max(start, self._next_start)
+                self._next_start = start + self._interval
+            delay = start - now
+            if delay > 0:
+                self.stats.pacing_delay_seconds += delay
+        if delay > 0:
+            get_metrics().increment("http.pacing_delay_seconds", delay)
+            self._sleep(delay)
@@ -1,29 +1,53 @@
 """
-Generic CLI for validating and converting OKR JSON data to Markdown or Word-compatible HTML.
+Generic CLI for validating and converting OKR JSON data to Markdown, Word-compatible HTML, PDF, JSON,
+NDJSON, Parquet or Arrow IPC.
 """
 import argparse
-import json
 import os
 import logging
 import sys
-from hungovercoders_workflow_doc_gen.formatter import Formatter
-from hungovercoders_workflow_doc_gen.cli_utils import validate_against_schema, get_output_path
+from hungovercoders_workflow_doc_gen.batch import convert_file, find_inputs, run_batch
+from hungovercoders_workflow_doc_gen.cli_utils import parse_formats, parse_state_filter, FORMAT_LABELS, ReportError
+from hungovercoders_workflow_doc_gen.columnar import COLUMNAR_FORMATS, require_pyarrow
+from hungovercoders_workflow_doc_gen.metrics import profile_run
+from hungovercoders_workflow_doc_gen.work_item_cache import default_cache_dir
 
 logger = logging.getLogger(__name__)
 
+REPORT_FORMATS = ["markdown", "doc", "pdf", "raw-json"]
+OUTPUT_FORMATS = REPORT_FORMATS + ["ndjson", "parquet", "arrow"]
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Validate OKR JSON and output Markdown or Word-compatible HTML.")
-    parser.add_argument("--input", required=True, help="Input JSON file (must match okr_summary schema)")
+    parser.add_argument("--input", required=True, help="Input JSON file (must match okr_summary schema) or NDJSON file of objectives, or a directory or glob of files to convert as a batch")
     parser.add_argument("--output-dir", default="outputs/", help="Output directory (default: current directory)")
-    parser.add_argument("--format", choices=["markdown", "doc", "pdf"], default="markdown", help="Output format: markdown, word, or pdf")
+    parser.add_argument("--format", type=lambda value: parse_formats(value, OUTPUT_FORMATS, REPORT_FORMATS), default=["markdown"], help="Output format(s), comma-separated: markdown, doc (Word-compatible HTML), pdf, raw-json, ndjson, parquet, arrow (Parquet and Arrow IPC objective and hypothesis tables), or all (every report format)")
+    parser.add_argument("--filter", dest="states", type=parse_state_filter, default=None, metavar="state=STATE[,STATE...]", help="Only write objectives in the given states, e.g. --filter \"state=Active,In Progress\"")
     parser.add_argument("--schema", default=None, help="Path to JSON schema (default: okr_summary.json in schemas dir)")
     parser.add_argument("--no-validate", action="store_true", help="Skip validation against JSON schema")
+    parser.add_argument("--pdf-workers", type=int, default=1, help="Processes used to render PDF output in shards (default: 1, a single document)")
+    parser.add_argument("--workers", type=int, default=None, help="Processes converting files in batch mode (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="In batch mode, convert every input even if it is unchanged since the last build")
+    parser.add_argument("--cache-dir", default=default_cache_dir(), help="Directory for cached compiled templates and rendered reports (default: ~/.cache/workflow-doc-gen)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the on-disk cache")
+    parser.add_argument("--profile", default=None, metavar="FILE", help="Write a JSON report of stage timings and cache hit rates to FILE")
+    parser.add_argument("--profile-stats", default=None, metavar="FILE", help="Also run under cProfile and dump pstats to FILE")
     args = parser.parse_args()
+    if not os.path.isfile(args.input) and not find_inputs(args.input, exclude_dir=args.output_dir):
+        parser.error(f"--input {args.input} is not a file, and no .json, .ndjson or .jsonl inputs match it as a directory or glob")
+    if any(format in COLUMNAR_FORMATS for format in args.format):
+        try:
+            require_pyarrow()
+        except ImportError as e:
+            parser.error(str(e))
 
-    # Load input data
-    with open(args.input, encoding='utf-8') as f:
-        data = json.load(f)
+    with profile_run(args.profile, args.profile_stats):
+        convert(args)
 
+def convert(args: argparse.Namespace) -> None:
+    """
+    Convert the input file, or every file of a batch, to the requested formats.
+    """
     # Determine schema path
     schema_path = args.schema
     if not schema_path:
@@ -32,26 +56,33 @@ def main() -> None:
         if not os.path.exists(schema_path):
             schema_path = os.path.join(here, '../schemas/okr_summary.json')
 
-    # Validate
-    if not args.no_validate:
-        validate_against_schema(data, schema_path)
-
-    objectives = data["objectives"]
-    formatter = Formatter()
-    output_path = get_output_path(args.output_dir, args.format)
-    if args.format == "markdown":
-        markdown = formatter.format_markdown(objectives)
-        with open(output_path, "w") as f:
-            f.write(markdown)
-        print(f"OKR Markdown report written to {output_path}")
-    elif args.format == "doc":
-        html = formatter.format_doc(objectives)
-        with open(output_path, "w") as f:
-            f.write(html)
-        print(f"OKR Word-compatible HTML report written to {output_path}")
-    elif args.format == "pdf":
-        formatter.format_pdf(objectives, output_path)
-        print(f"OKR PDF report written to {output_path}")
+    if args.no_validate:
+        schema_path = None
+    bytecode_cache_dir = None if args.no_cache else os.path.join(args.cache_dir, "templates")
+    render_cache_dir = None if args.no_cache else os.path.join(args.cache_dir, "renders")
+
+    if not os.path.isfile(args.input):
+        # Batch mode: a directory or glob of inputs, each written under a name derived from its path.
+        failed = run_batch(args.input, args.output_dir, args.format, schema_path, workers=args.workers,
+                           bytecode_cache_dir=bytecode_cache_dir, force=args.force, render_cache_dir=render_cache_dir,
+                           states=args.states)
+        if failed:
+            sys.exit(1)
+        return
+
+    try:
+        outputs = convert_file(args.input, args.output_dir, args.format, schema_path,
+                               bytecode_cache_dir=bytecode_cache_dir, pdf_workers=args.pdf_workers,
+                               render_cache_dir=render_cache_dir, states=args.states)
+    except ReportError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    except ValueError as e:
+        # Malformed JSON or NDJSON, or a document without an objectives array.
+        logger.error(f"Failed to read {args.input}: {e}")
+        sys.exit(1)
+    for format, output_path in outputs.items():
+        print(f"OKR {FORMAT_LABELS[format]} report written to {output_path}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,281 @@
+"""
+Lightweight instrumentation of the export pipeline: stage timers, HTTP statistics and cache hit rates.
+"""
+import bisect
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in milliseconds, of the HTTP latency histogram buckets; slower requests fall in a final bucket.
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Options whose values are credentials; they are written as REDACTED in the report's command line.
+SECRET_OPTIONS = ("--pat",)
+REDACTED = "***"
+
+class _Stage:
+    """Context manager timing one entry into a stage; see Metrics.stage."""
+    __slots__ = ("metrics", "name", "started", "nested")
+
+    def __init__(self, metrics: "Metrics", name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self) -> "_Stage":
+        self.nested = 0.0
+        self.metrics._stack().append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        elapsed = time.perf_counter() - self.started
+        stack = self.metrics._stack()
+        stack.pop()
+        if stack:
+            stack[-1].nested += elapsed
+        self.metrics.add_stage_time(self.name, elapsed, elapsed - self.nested)
+
+
+class Metrics:
+    """
+    Thread-safe collector of pipeline metrics for one run.
+
+    - Stages are timed with ``with metrics.stage("validate"):``. Each stage records its number of
+      calls, its total (inclusive) time and its self time, which excludes the time spent in stages
+      entered inside it on the same thread. Self times therefore add up even when stages interleave,
+      as they do when a streamed render pulls objectives that are fetched and validated on demand.
+      Times from worker threads are summed, so stage totals can exceed the wall time.
+    - HTTP requests are counted per endpoint with bytes sent and received and a latency histogram.
+    - Cache lookups are counted as hits and misses per cache.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard everything collected so far and restart the wall clock."""
+        with self._lock:
+            self.started = time.perf_counter()
+            self.stages: Dict[str, List[float]] = {}
+            self.http: Dict[str, Dict[str, Any]] = {}
+            self.caches: Dict[str, List[int]] = {}
+            self.counters: Dict[str, float] = {}
+
+    def _stack(self) -> List[_Stage]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def stage(self, name: str) -> _Stage:
+        """Return a context manager that times a pipeline stage."""
+        return _Stage(self, name)
+
+    def add_stage_time(self, name: str, seconds: float, self_seconds: Optional[float] = None, calls: int = 1) -> None:
+        """Record time spent in a stage outside of a ``with stage()`` block."""
+        with self._lock:
+            entry = self.stages.get(name)
+            if entry is None:
+                entry = self.stages[name] = [0, 0.0, 0.0]
+            entry[0] += calls
+            entry[1] += seconds
+            entry[2] += seconds if self_seconds is None else self_seconds
+
+    def add_nested_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        """
+        Record time measured inline by a hot loop (where entering a stage per iteration would cost too
+        much) as a stage nested in the stage currently active on this thread.
+        """
+        stack = self._stack()
+        if stack:
+            stack[-1].nested += seconds
+        self.add_stage_time(name, seconds, seconds, calls)
+
+    def observe_request(self, endpoint: str, status: int, seconds: float,
+                        request_bytes: int = 0, response_bytes: int = 0) -> None:
+        """Record one HTTP request (every attempt, including retries) to an endpoint such as "POST wit/wiql"."""
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)
+        with self._lock:
+            entry = self.http.get(endpoint)
+            if entry is None:
+                entry = self.http[endpoint] = {
+                    "requests": 0, "errors": 0, "statuses": {}, "request_bytes": 0, "response_bytes": 0,
+                    "seconds": 0.0, "max_seconds": 0.0, "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                }
+            entry["requests"] += 1
+            if not status or status >= 400:
+                entry["errors"] += 1
+            key = str(status or "error")
+            entry["statuses"][key] = entry["statuses"].get(key, 0) + 1
+            entry["request_bytes"] += request_bytes
+            entry["response_bytes"] += response_bytes
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["histogram"][bucket] += 1
+
+    def record_cache(self, name: str, hits: int = 0, misses: int = 0) -> None:
+        """Record lookups in a named cache."""
+        with self._lock:
+            entry = self.caches.get(name)
+            if entry is None:
+                entry = self.caches[name] = [0, 0]
+            entry[0] += hits
+            entry[1] += misses
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        """Add to a named counter, e.g. "http.retries"."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the raw collected data, e.g. to send from a worker process to merge()."""
+        with self._lock:
+            return json.loads(json.dumps({
+                "stages": self.stages, "http": self.http, "caches": self.caches, "counters": self.counters,
+            }))
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """Add the data of a snapshot taken in another process."""
+        for name, (calls, seconds, self_seconds) in snapshot.get("stages", {}).items():
+            self.add_stage_time(name, seconds, self_seconds, calls)
+        for name, (hits, misses) in snapshot.get("caches", {}).items():
+            self.record_cache(name, hits, misses)
+        for name, amount in snapshot.get("counters", {}).items():
+            self.increment(name, amount)
+        with self._lock:
+            for endpoint, other in snapshot.get("http", {}).items():
+                entry = self.http.get(endpoint)
+                if entry is None:
+                    self.http[endpoint] = other
+                    continue
+                for key in ("requests", "errors", "request_bytes", "response_bytes", "seconds"):
+                    entry[key] += other[key]
+                entry["max_seconds"] = max(entry["max_seconds"], other["max_seconds"])
+                entry["histogram"] = [a + b for a, b in zip(entry["histogram"], other["histogram"])]
+                for status, count in other["statuses"].items():
+                    entry["statuses"][status] = entry["statuses"].get(status, 0) + count
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Return the metrics report: wall time, stages (slowest first), HTTP totals and per-endpoint
+        statistics with latency histograms, cache hit rates and counters.
+        """
+        with self._lock:
+            wall = time.perf_counter() - self.started
+            stages = {
+                name: {"calls": int(calls), "seconds": round(seconds, 6), "self_seconds": round(self_seconds, 6)}
+                for name, (calls, seconds, self_seconds) in sorted(self.stages.items(), key=lambda kv: -kv[1][2])
+            }
+            endpoints = {}
+            for endpoint, entry in sorted(self.http.items()):
+                endpoints[endpoint] = {
+                    "requests": entry["requests"],
+                    "errors": entry["errors"],
+                    "statuses": dict(entry["statuses"]),
+                    "request_bytes": entry["request_bytes"],
+                    "response_bytes": entry["response_bytes"],
+                    "mean_ms": round(entry["seconds"] * 1000 / entry["requests"], 3),
+                    "max_ms": round(entry["max_seconds"] * 1000, 3),
+                    "latency_histogram_ms": _histogram(entry["histogram"]),
+                }
+            totals = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            for entry in self.http.values():
+                totals = [a + b for a, b in zip(totals, entry["histogram"])]
+            http = {
+                "requests": sum(e["requests"] for e in self.http.values()),
+                "errors": sum(e["errors"] for e in self.http.values()),
+                "request_bytes": sum(e["request_bytes"] for e in self.http.values()),
+                "response_bytes": sum(e["response_bytes"] for e in self.http.values()),
+                "seconds": round(sum(e["seconds"] for e in self.http.values()), 6),
+                "latency_histogram_ms": _histogram(totals),
+                "endpoints": endpoints,
+            }
+            caches = {
+                name: {"hits": hits, "misses": misses,
+                       "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None}
+                for name, (hits, misses) in sorted(self.caches.items())
+            }
+            return {
+                "wall_seconds": round(wall, 6),
+                "stages": stages,
+                "http": http,
+                "caches": caches,
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+def _histogram(counts: List[int]) -> Dict[str, int]:
+    """Label histogram buckets by their upper bound, e.g. {"<=10": 3, ..., ">10000": 0}."""
+    labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+    return dict(zip(labels, counts))
+
+
+_METRICS = Metrics()
+
+def get_metrics() -> Metrics:
+    """Return the metrics collector of this process."""
+    return _METRICS
+
+def stage(name: str) -> _Stage:
+    """Time a stage in the process-wide collector: ``with stage("render.markdown"): ...``."""
+    return _METRICS.stage(name)
+
+@contextlib.contextmanager
+def profile_run(report_path: Optional[str], pstats_path: Optional[str] = None) -> Iterator[Metrics]:
+    """
+    Collect metrics for the enclosed block and write them as a JSON report to report_path.
+
+    With pstats_path, the block also runs under cProfile and the statistics are dumped there
+    (load them with ``python -m pstats``). The report is written even when the block fails or
+    exits, so slow failing runs can be diagnosed too. Does nothing beyond collecting metrics when
+    both paths are None.
+    """
+    metrics = get_metrics()
+    metrics.reset()
+    profiler = None
+    if pstats_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _makedirs_for(pstats_path)
+            profiler.dump_stats(pstats_path)
+            print(f"cProfile statistics written to {pstats_path}")
+        if report_path:
+            report = {"command": redact_argv(sys.argv), **metrics.report()}
+            _makedirs_for(report_path)
+            with open(report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Metrics report written to {report_path}")
+
+def redact_argv(argv: List[str]) -> List[str]:
+    """Return command line arguments with the values of SECRET_OPTIONS replaced, for reports."""
+    redacted = []
+    hide_next = False
+    for arg in argv:
+        option = arg.split("=", 1)[0]
+        if hide_next:
+            redacted.append(REDACTED)
+            hide_next = False
+        elif option in SECRET_OPTIONS and "=" in arg:
+            redacted.append(f"{option}={REDACTED}")
+        else:
+            redacted.append(arg)
+            hide_next = arg in SECRET_OPTIONS
+    return redacted
+
+def _makedirs_for(path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
@@ -0,0 +1,210 @@
+"""
+Compact typed model of normalized OKR data: objectives, hypotheses and their child work items.
+"""
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+def _intern(value: Any) -> Any:
+    """
+    Intern short strings that repeat across work items, such as states, work item types and
+    boilerplate answers; JSON decoding otherwise creates a separate copy for every occurrence.
+    """
+    return sys.intern(value) if isinstance(value, str) and len(value) <= 64 else value
+
+def _split_link(link: Any, item_id: Any) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Split a work item link into a shared prefix when it ends with ``/{id}``.
+    Returns (interned prefix, None), or (None, link) for links that do not follow that pattern.
+    """
+    if isinstance(link, str) and item_id is not None:
+        suffix = "/" + str(item_id)
+        if link.endswith(suffix):
+            return sys.intern(link[:len(link) - len(suffix) + 1]), None
+    return None, link
+
+def _join_link(prefix: Optional[str], link: Optional[str], item_id: Any) -> Optional[str]:
+    if prefix is not None:
+        return f"{prefix}{item_id}"
+    return link
+
+def _extra(data: Dict[str, Any], known: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    """Keys outside the model, kept so that conversion back to JSON is lossless."""
+    extra = {key: value for key, value in data.items() if key not in known}
+    return extra or None
+
+def _as_dict(pairs: List[Tuple[str, Any]], extra: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a schema dict, leaving out keys whose value is None (absent in the source)."""
+    result = {key: value for key, value in pairs if value is not None}
+    if extra:
+        result.update(extra)
+    return result
+
+
+@dataclass(slots=True)
+class ChildWorkItem:
+    """A work item below the hypothesis level (e.g. an Issue)."""
+    id: Any = None
+    title: Optional[str] = None
+    state: Optional[str] = None
+    work_item_type: Optional[str] = None
+    link_prefix: Optional[str] = None
+    link_override: Optional[str] = None
+    children: Optional[List["ChildWorkItem"]] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    FIELDS = ("id", "title", "state", "work_item_type", "link", "children")
+
+    @property
+    def link(self) -> Optional[str]:
+        """Work item URL, built on access from the shared prefix."""
+        return _join_link(self.link_prefix, self.link_override, self.id)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChildWorkItem":
+        prefix, link = _split_link(data.get("link"), data.get("id"))
+        children = data.get("children")
+        return cls(
+            id=data.get("id"),
+            title=data.get("title"),
+            state=_intern(data.get("state")),
+            work_item_type=_intern(data.get("work_item_type")),
+            link_prefix=prefix,
+            link_override=link,
+            children=[cls.from_dict(child) for child in children] if isinstance(children, list) else children,
+            extra=_extra(data, cls.FIELDS),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _as_dict([
+            ("id", self.id), ("title", self.title), ("state", self.state),
+            ("work_item_type", self.work_item_type), ("link", self.link),
+            ("children", [child.to_dict() for child in self.children] if self.children is not None else None),
+        ], self.extra)
+
+
+@dataclass(slots=True)
+class Hypothesis:
+    """A hypothesis work item under an objective."""
+    id: Any = None
+    title: Optional[str] = None
+    state: Optional[str] = None
+    hypothesis: Optional[str] = None
+    hypothesis_context: Optional[str] = None
+    link_prefix: Optional[str] = None
+    link_override: Optional[str] = None
+    method_of_measuring_hypothesis: Optional[str] = None
+    hypothesis_outcome: Optional[str] = None
+    children: Optional[List[ChildWorkItem]] = None
+    extra: Optional[Dict[str, Any]] = None
+    # Cleaned rich-text fields for the Markdown report, set by text_cleaning.clean_objectives().
+    text: Optional[Dict[str, Any]] = field(default=None, compare=False, repr=False)
+
+    FIELDS = ("id", "title", "state", "hypothesis", "hypothesis_context", "link",
+              "method_of_measuring_hypothesis", "hypothesis_outcome", "children")
+
+    @property
+    def link(self) -> Optional[str]:
+        """Work item URL, built on access from the shared prefix."""
+        return _join_link(self.link_prefix, self.link_override, self.id)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Hypothesis":
+        prefix, link = _split_link(data.get("link"), data.get("id"))
+        children = data.get("children")
+        return cls(
+            id=data.get("id"),
+            title=data.get("title"),
+            state=_intern(data.get("state")),
+            hypothesis=data.get("hypothesis"),
+            hypothesis_context=_intern(data.get("hypothesis_context")),
+            link_prefix=prefix,
+            link_override=link,
+            method_of_measuring_hypothesis=_intern(data.get("method_of_measuring_hypothesis")),
+            hypothesis_outcome=_intern(data.get("hypothesis_outcome")),
+            children=[ChildWorkItem.from_dict(child) for child in children] if isinstance(children, list) else children,
+            extra=_extra(data, cls.FIELDS),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _as_dict([
+            ("id", self.id), ("title", self.title), ("state", self.state), ("hypothesis", self.hypothesis),
+            ("hypothesis_context", self.hypothesis_context), ("link", self.link),
+            ("method_of_measuring_hypothesis", self.method_of_measuring_hypothesis),
+            ("hypothesis_outcome", self.hypothesis_outcome),
+            ("children", [child.to_dict() for child in self.children] if self.children is not None else None),
+        ], self.extra)
+
+
+@dataclass(slots=True)
+class Objective:
+    """
+    An objective with its key results and hypotheses.
+
+    Compared with the equivalent dict, an Objective stores its fields in slots, computes work item
+    links from a prefix shared by every item of the project, and interns repeated strings.
+    """
+    id: Any = None
+    title: Optional[str] = None
+    state: Optional[str] = None
+    objective: Optional[str] = None
+    key_results: Optional[List[str]] = None
+    method_of_measure: Optional[str] = None
+    objective_outcome: Optional[str] = None
+    link_prefix: Optional[str] = None
+    link_override: Optional[str] = None
+    hypotheses: Optional[List[Hypothesis]] = None
+    extra: Optional[Dict[str, Any]] = None
+    # Cleaned rich-text fields for the Markdown report, set by text_cleaning.clean_objectives().
+    text: Optional[Dict[str, Any]] = field(default=None, compare=False, repr=False)
+
+    FIELDS = ("id", "title", "state", "objective", "key_results", "method_of_measure", "objective_outcome",
+              "link", "hypotheses")
+
+    @property
+    def link(self) -> Optional[str]:
+        """Work item URL, built on access from the shared prefix."""
+        return _join_link(self.link_prefix, self.link_override, self.id)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Objective":
+        """Build an Objective from an objective of the okr_summary schema."""
+        prefix, link = _split_link(data.get("link"), data.get("id"))
+        hypotheses = data.get("hypotheses")
+        return cls(
+            id=data.get("id"),
+            title=data.get("title"),
+            state=_intern(data.get("state")),
+            objective=data.get("objective"),
+            key_results=data.get("key_results"),
+            method_of_measure=_intern(data.get("method_of_measure")),
+            objective_outcome=_intern(data.get("objective_outcome")),
+            link_prefix=prefix,
+            link_override=link,
+            hypotheses=[Hypothesis.from_dict(h) for h in hypotheses] if isinstance(hypotheses, list) else hypotheses,
+            extra=_extra(data, cls.FIELDS),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the objective in the okr_summary schema shape; absent fields stay absent."""
+        return _as_dict([
+            ("id", self.id), ("title", self.title), ("state", self.state), ("objective", self.objective),
+            ("key_results", self.key_results), ("method_of_measure", self.method_of_measure),
+            ("objective_outcome", self.objective_outcome), ("link", self.link),
+            ("hypotheses", [h.to_dict() for h in self.hypotheses] if self.hypotheses is not None else None),
+        ], self.extra)
+
+
+def to_json(value: Any) -> Any:
+    """
+    ``default`` hook for json.dump/json.dumps that serializes model objects in the schema shape.
+    """
+    if isinstance(value, (Objective, Hypothesis, ChildWorkItem)):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def get_field(item: Any, name: str) -> Any:
+    """Read a field from a normalized dict or a model object; None when absent."""
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
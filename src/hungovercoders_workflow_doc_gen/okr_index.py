@@ -0,0 +1,123 @@
+"""
+Index of normalized OKR data: counts by state, an ID map and the parent/child hierarchy, built in one pass.
+"""
+import heapq
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from hungovercoders_workflow_doc_gen.model import get_field
+
+# Label used for items without a state in counts and filters.
+NO_STATE = ""
+
+
+class OkrIndex:
+    """
+    Summary index of a list of objectives (dicts or model objects), built once so that templates and
+    filters look things up instead of re-scanning every objective.
+
+    - ``objective_state_counts`` / ``hypothesis_state_counts``: number of items per state.
+    - ``hypothesis_counts``: number of hypotheses per objective ID.
+    - ``by_id``: every objective, hypothesis and deeper child by work item ID.
+    - ``parent_of`` / ``children_of``: the hierarchy as work item IDs.
+    - ``objectives_with_state(*states)``: the objectives in those states, in document order.
+
+    Objectives can also be added one at a time with add() or track(). With ``keep_items=False`` only
+    the counts are kept, so a streamed render can show a summary without holding every objective.
+    """
+    def __init__(self, objectives: Iterable[Any] = (), keep_items: bool = True) -> None:
+        self.keep_items = keep_items
+        self.objective_count = 0
+        self.hypothesis_count = 0
+        self.objective_state_counts: Dict[str, int] = {}
+        self.hypothesis_state_counts: Dict[str, int] = {}
+        self.hypothesis_counts: Dict[Any, int] = {}
+        self.objectives: List[Any] = []
+        self.by_id: Dict[Any, Any] = {}
+        self.parent_of: Dict[Any, Any] = {}
+        self.children_of: Dict[Any, List[Any]] = {}
+        # Positions in self.objectives per objective state, for filters that keep document order.
+        self._positions: Dict[str, List[int]] = {}
+        for objective in objectives:
+            self.add(objective)
+
+    def add(self, objective: Any) -> None:
+        """Index one objective and everything below it."""
+        state = get_field(objective, "state") or NO_STATE
+        hypotheses = get_field(objective, "hypotheses") or []
+        objective_id = get_field(objective, "id")
+        self.objective_count += 1
+        self.objective_state_counts[state] = self.objective_state_counts.get(state, 0) + 1
+        self.hypothesis_count += len(hypotheses)
+        if objective_id is not None:
+            self.hypothesis_counts[objective_id] = len(hypotheses)
+        for hypothesis in hypotheses:
+            hypothesis_state = get_field(hypothesis, "state") or NO_STATE
+            self.hypothesis_state_counts[hypothesis_state] = self.hypothesis_state_counts.get(hypothesis_state, 0) + 1
+        if not self.keep_items:
+            return
+        self._positions.setdefault(state, []).append(len(self.objectives))
+        self.objectives.append(objective)
+        self._add_node(objective, None, hypotheses)
+
+    def _add_node(self, item: Any, parent_id: Any, children: List[Any]) -> None:
+        item_id = get_field(item, "id")
+        if item_id is not None:
+            self.by_id[item_id] = item
+            if parent_id is not None:
+                self.parent_of[item_id] = parent_id
+                self.children_of.setdefault(parent_id, []).append(item_id)
+        for child in children:
+            self._add_node(child, item_id, get_field(child, "children") or [])
+
+    def track(self, objectives: Iterable[Any]) -> Iterator[Any]:
+        """Yield objectives unchanged, indexing each one as it passes."""
+        for objective in objectives:
+            self.add(objective)
+            yield objective
+
+    @property
+    def states(self) -> List[str]:
+        """Every objective and hypothesis state, sorted."""
+        return sorted(set(self.objective_state_counts) | set(self.hypothesis_state_counts))
+
+    def objectives_with_state(self, *states: str) -> List[Any]:
+        """Return the objectives in any of the given states, in document order."""
+        if not self.keep_items:
+            raise ValueError("This index only keeps counts")
+        positions = heapq.merge(*(self._positions.get(state, []) for state in dict.fromkeys(states)))
+        return [self.objectives[position] for position in positions]
+
+    def children(self, item_id: Any) -> List[Any]:
+        """Return the direct children of a work item."""
+        return [self.by_id[child_id] for child_id in self.children_of.get(item_id, [])]
+
+    def parent(self, item_id: Any) -> Optional[Any]:
+        """Return the parent of a work item, or None for objectives and unknown IDs."""
+        parent_id = self.parent_of.get(item_id)
+        return None if parent_id is None else self.by_id.get(parent_id)
+
+    def counts(self) -> "OkrIndex":
+        """Return a copy holding only the counts, e.g. to send to a worker process."""
+        index = OkrIndex(keep_items=False)
+        index.objective_count = self.objective_count
+        index.hypothesis_count = self.hypothesis_count
+        index.objective_state_counts = dict(self.objective_state_counts)
+        index.hypothesis_state_counts = dict(self.hypothesis_state_counts)
+        index.hypothesis_counts = dict(self.hypothesis_counts)
+        return index
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the counts as a plain dict."""
+        return {
+            "objectives": self.objective_count,
+            "hypotheses": self.hypothesis_count,
+            "objective_states": dict(sorted(self.objective_state_counts.items())),
+            "hypothesis_states": dict(sorted(self.hypothesis_state_counts.items())),
+        }
+
+
+def iter_filtered_objectives(objectives: Iterable[Any], states: Optional[List[str]]) -> Iterable[Any]:
+    """Pass through the objectives in any of ``states`` (all of them when states is None), one at a time."""
+    if not states:
+        return objectives
+    wanted = set(states)
+    return (objective for objective in objectives if (get_field(objective, "state") or NO_STATE) in wanted)
@@ -0,0 +1,145 @@
+"""
+Content-addressed cache of rendered reports and PDF shards.
+"""
+import filecmp
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Any, Iterable, List, Optional
+from hungovercoders_workflow_doc_gen.metrics import get_metrics
+from hungovercoders_workflow_doc_gen.model import to_json
+
+logger = logging.getLogger(__name__)
+
+# Bump when rendering changes in a way the template sources do not capture.
+RENDER_CACHE_VERSION = "2"
+
+def content_digest(value: Any) -> str:
+    """
+    Return a stable SHA-256 digest of JSON-like data, such as a normalized objective or a whole report.
+    Model objects hash the same as their schema dicts.
+    """
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=to_json)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def combine_digests(digests: Iterable[str]) -> str:
+    """Return a digest of an ordered sequence of digests, e.g. of every objective in a report."""
+    combined = hashlib.sha256()
+    for digest in digests:
+        combined.update(digest.encode("ascii"))
+    return combined.hexdigest()
+
+def render_key(*parts: Optional[str]) -> str:
+    """Return the cache key for a rendering, from e.g. format, data digest, template digest and timestamp."""
+    return combine_digests(hashlib.sha256(str(part or "").encode("utf-8")).hexdigest()
+                           for part in (RENDER_CACHE_VERSION,) + parts)
+
+
+class RenderCache:
+    """
+    Stores rendered artifacts on disk under their render key.
+
+    A key covers everything that determines the output, so an entry never needs invalidating: when
+    the data, template, format or ``generated_at`` timestamp changes, the key changes. Entries that
+    have not been used recently are removed by prune() once the cache exceeds ``max_bytes``.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key: str, suffix: str = "") -> str:
+        """Return the artifact path for a key."""
+        return os.path.join(self.cache_dir, key[:2], key + suffix)
+
+    def _touch(self, path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def restore(self, key: str, output_path: str, suffix: str = "") -> bool:
+        """
+        Copy the artifact for key to output_path. An output that already matches is left untouched.
+        Returns False on a cache miss.
+        """
+        artifact = self.path_for(key, suffix)
+        if not os.path.exists(artifact):
+            self.misses += 1
+            get_metrics().record_cache("renders", misses=1)
+            return False
+        self.hits += 1
+        get_metrics().record_cache("renders", hits=1)
+        self._touch(artifact)
+        if os.path.exists(output_path) and filecmp.cmp(artifact, output_path, shallow=False):
+            return True
+        tmp_path = output_path + ".tmp"
+        shutil.copyfile(artifact, tmp_path)
+        os.replace(tmp_path, output_path)
+        return True
+
+    def store(self, key: str, source_path: str, suffix: str = "") -> None:
+        """Copy a freshly rendered file into the cache under key."""
+        artifact = self.path_for(key, suffix)
+        try:
+            os.makedirs(os.path.dirname(artifact), exist_ok=True)
+            shutil.copyfile(source_path, artifact + ".tmp")
+            os.replace(artifact + ".tmp", artifact)
+        except OSError as e:
+            logger.warning(f"Could not store rendered artifact in {self.cache_dir}: {e}")
+
+    def get_bytes(self, key: str, suffix: str = "") -> Optional[bytes]:
+        """Return the cached bytes for key, or None on a miss."""
+        artifact = self.path_for(key, suffix)
+        try:
+            with open(artifact, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            get_metrics().record_cache("renders", misses=1)
+            return None
+        self.hits += 1
+        get_metrics().record_cache("renders", hits=1)
+        self._touch(artifact)
+        return data
+
+    def put_bytes(self, key: str, data: bytes, suffix: str = "") -> None:
+        """Store rendered bytes under key."""
+        artifact = self.path_for(key, suffix)
+        try:
+            os.makedirs(os.path.dirname(artifact), exist_ok=True)
+            with open(artifact + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(artifact + ".tmp", artifact)
+        except OSError as e:
+            logger.warning(f"Could not store rendered artifact in {self.cache_dir}: {e}")
+
+    def prune(self) -> None:
+        """Remove the least recently used artifacts until the cache fits in max_bytes."""
+        entries: List[tuple] = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        logger.debug(f"Pruned {removed} rendered artifacts from {self.cache_dir}")
@@ -0,0 +1,352 @@
+"""
+Long-running server that keeps a warm OKR model and serves rendered reports over HTTP.
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import tempfile
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from hungovercoders_workflow_doc_gen.cli_utils import (
+    parse_formats, utc_timestamp, validate_against_schema, SYNC_OVERLAP_SECONDS
+)
+from hungovercoders_workflow_doc_gen.formatter import FORMAT_TEMPLATES, Formatter, template_digest
+from hungovercoders_workflow_doc_gen.metrics import get_metrics, stage
+from hungovercoders_workflow_doc_gen.model import Objective, to_json
+from hungovercoders_workflow_doc_gen.render_cache import content_digest, render_key
+from hungovercoders_workflow_doc_gen.streaming import iter_input_objectives
+from hungovercoders_workflow_doc_gen.text_cleaning import clean_objectives
+from hungovercoders_workflow_doc_gen.work_item_cache import WorkItemCache, default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ["markdown", "doc", "pdf", "raw-json"]
+
+# Served paths are the file names the CLIs write, e.g. /okr_summary.md.
+REPORT_PATHS = {"/okr_summary.md": "markdown", "/okr_summary.html": "doc", "/okr_summary.pdf": "pdf",
+                "/okr_summary.json": "raw-json"}
+
+CONTENT_TYPES = {"markdown": "text/markdown; charset=utf-8", "doc": "text/html; charset=utf-8",
+                 "pdf": "application/pdf", "raw-json": "application/json"}
+
+class Snapshot(NamedTuple):
+    """One version of the OKR data: compact model objects, their digest and the report time."""
+    okr_data: Dict[str, Any]
+    version: str
+    generated_at: datetime.datetime
+
+
+class Artifact(NamedTuple):
+    """A rendered report and its strong ETag."""
+    body: bytes
+    etag: str
+    content_type: str
+
+
+class JsonFileSource:
+    """Loads OKR data from a JSON or NDJSON file, only re-reading it when its modification time changes."""
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._mtime: Optional[int] = None
+
+    def __call__(self) -> Optional[Dict[str, Any]]:
+        """Return the file's OKR data, or None when the file is unchanged since the last load."""
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return None
+        with open(self.path, encoding='utf-8') as f:
+            data = {"objectives": [Objective.from_dict(obj) for obj in iter_input_objectives(f)]}
+        self._mtime = mtime
+        return data
+
+
+class AzureDevOpsSource:
+    """
+    Loads OKR data from Azure DevOps: a full export first, then incremental syncs of the changes
+    since the previous load (at --depth 2; deeper hierarchies are reloaded in full, which the work
+    item cache keeps cheap).
+    """
+    def __init__(self, client: Any, max_depth: int = 2) -> None:
+        self.client = client
+        self.max_depth = max_depth
+        self._previous: Optional[Dict[str, Any]] = None
+        self._watermark: Optional[str] = None
+
+    def __call__(self) -> Dict[str, Any]:
+        watermark = utc_timestamp(-SYNC_OVERLAP_SECONDS)
+        if self._previous is not None and self.max_depth == 2:
+            previous = {"objectives": [obj.to_dict() for obj in self._previous["objectives"]]}
+            data = self.client.fetch_and_normalize_okrs_incremental(previous, self._watermark)
+        else:
+            data = {"objectives": list(self.client.iter_normalized_objectives(max_depth=self.max_depth))}
+        data = {"objectives": [Objective.from_dict(obj) for obj in data["objectives"]]}
+        self._previous, self._watermark = data, watermark
+        return data
+
+
+class ReportService:
+    """
+    Keeps the current Snapshot of the OKR data and the reports rendered from it.
+
+    refresh() reloads the data from ``load``; a snapshot whose content is unchanged is kept, along with
+    its rendered reports and their ETags. Reports are rendered on first request (concurrent requests
+    for the same report wait for one render) and the ``prerender`` formats are rendered straight
+    after each change, so requests are answered from memory. A failed refresh is logged and
+    the last good snapshot stays in service.
+    """
+    def __init__(self, load: Callable[[], Optional[Dict[str, Any]]], schema_path: Optional[str] = None,
+                 prerender: Optional[List[str]] = None, bytecode_cache_dir: Optional[str] = None) -> None:
+        self.load = load
+        self.schema_path = schema_path
+        self.prerender = list(prerender or [])
+        self.bytecode_cache_dir = bytecode_cache_dir
+        self.snapshot: Optional[Snapshot] = None
+        self.refreshed_at: Optional[str] = None
+        self.last_error: Optional[str] = None
+        self._artifacts: Dict[Tuple[str, str], Artifact] = {}
+        self._lock = threading.Lock()
+        self._render_locks: Dict[str, threading.Lock] = {format: threading.Lock() for format in OUTPUT_FORMATS}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> bool:
+        """Reload the data. Returns True when a new snapshot was installed."""
+        try:
+            with stage("serve.refresh"):
+                okr_data = self.load()
+                if okr_data is not None and self.schema_path:
+                    validate_against_schema(okr_data, self.schema_path)
+        except SystemExit:
+            # Validation errors have been logged with their JSON paths.
+            self.last_error = "OKR data failed schema validation"
+            logger.error(f"Refresh failed: {self.last_error}; still serving the previous data")
+            return False
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Refresh failed: {e}; still serving the previous data")
+            return False
+        self.refreshed_at = utc_timestamp()
+        self.last_error = None
+        if okr_data is None:
+            return False
+        version = content_digest(okr_data)
+        if self.snapshot is not None and self.snapshot.version == version:
+            return False
+        # Cleaned once per new snapshot, so every Markdown render of it reuses the text.
+        with stage("serve.clean"):
+            clean_objectives(okr_data["objectives"])
+        snapshot = Snapshot(okr_data, version, datetime.datetime.now(datetime.timezone.utc))
+        with self._lock:
+            self.snapshot = snapshot
+            self._artifacts = {key: artifact for key, artifact in self._artifacts.items() if key[0] == version}
+        logger.info(f"Serving OKR data version {version[:12]} ({len(okr_data['objectives'])} objectives)")
+        for format in self.prerender:
+            try:
+                self.artifact(format)
+            except Exception as e:
+                logger.error(f"Failed to prerender {format}: {e}")
+        return True
+
+    def artifact(self, format: str) -> Artifact:
+        """Return the rendered report for the current snapshot, rendering it on first use."""
+        snapshot = self.snapshot
+        if snapshot is None:
+            raise LookupError("No OKR data loaded yet")
+        return self._artifact(snapshot, format)
+
+    def _artifact(self, snapshot: Snapshot, format: str) -> Artifact:
+        """Return the rendered report for a given snapshot; only the current snapshot's are kept."""
+        key = (snapshot.version, format)
+        artifact = self._artifacts.get(key)
+        if artifact is None:
+            with self._render_locks[format]:
+                artifact = self._artifacts.get(key)
+                if artifact is None:
+                    get_metrics().record_cache("served", misses=1)
+                    with stage(f"serve.render.{format}"):
+                        artifact = self._render(snapshot, format)
+                    with self._lock:
+                        if self.snapshot is snapshot:
+                            self._artifacts[key] = artifact
+                    return artifact
+        get_metrics().record_cache("served", hits=1)
+        return artifact
+
+    def _render(self, snapshot: Snapshot, format: str) -> Artifact:
+        formatter = Formatter(bytecode_cache_dir=self.bytecode_cache_dir, generated_at=snapshot.generated_at)
+        if format == "markdown":
+            body = formatter.format_markdown(snapshot.okr_data).encode("utf-8")
+        elif format == "doc":
+            body = formatter.format_doc(snapshot.okr_data).encode("utf-8")
+        elif format == "raw-json":
+            body = json.dumps(snapshot.okr_data, indent=2, default=to_json).encode("utf-8")
+        elif format == "pdf":
+            # The HTML of this snapshot, even if a refresh has installed a newer one meanwhile.
+            html = self._artifact(snapshot, "doc").body.decode("utf-8")
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                output_path = os.path.join(tmp_dir, "okr_summary.pdf")
+                if not formatter.format_pdf(snapshot.okr_data, output_path, html=html):
+                    raise RuntimeError("PDF rendering failed")
+                with open(output_path, "rb") as f:
+                    body = f.read()
+        else:
+            raise ValueError(f"Unsupported format: {format}")
+        if not body:
+            # format_markdown and format_doc log their errors and return an empty document.
+            raise RuntimeError(f"{format} rendering failed")
+        template = FORMAT_TEMPLATES.get(format)
+        etag = render_key(format, snapshot.version, template_digest(template) if template else None,
+                          snapshot.generated_at.isoformat())
+        return Artifact(body, f'"{etag}"', CONTENT_TYPES[format])
+
+    def status(self) -> Dict[str, Any]:
+        """Return the health report served at /healthz."""
+        snapshot = self.snapshot
+        return {
+            "status": "ok" if snapshot is not None and self.last_error is None else "degraded" if snapshot else "starting",
+            "version": snapshot.version if snapshot else None,
+            "objectives": len(snapshot.okr_data["objectives"]) if snapshot else 0,
+            "generated_at": snapshot.generated_at.isoformat() if snapshot else None,
+            "refreshed_at": self.refreshed_at,
+            "last_error": self.last_error,
+        }
+
+    def start(self, interval: float) -> None:
+        """Refresh every ``interval`` seconds on a background thread."""
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                self.refresh()
+        self._thread = threading.Thread(target=loop, name="okr-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background refresh."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def make_handler(service: ReportService) -> type:
+    """Return a request handler class serving the reports, /healthz and /metrics of a ReportService."""
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "workflow-doc-gen"
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def _send_json(self, status: int, payload: Any) -> None:
+            self._send(status, json.dumps(payload, indent=2).encode("utf-8"), "application/json",
+                       {"Cache-Control": "no-store"})
+
+        def do_GET(self) -> None:
+            path = self.path.split("?", 1)[0]
+            if path == "/healthz":
+                status = service.status()
+                self._send_json(HTTPStatus.OK if status["version"] else HTTPStatus.SERVICE_UNAVAILABLE, status)
+                return
+            if path == "/metrics":
+                self._send_json(HTTPStatus.OK, get_metrics().report())
+                return
+            format = REPORT_PATHS.get(path)
+            if format is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Not found: {path}", "reports": sorted(REPORT_PATHS)})
+                return
+            try:
+                artifact = service.artifact(format)
+            except LookupError as e:
+                self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)})
+                return
+            except Exception as e:
+                logger.error(f"Failed to render {format}: {e}")
+                self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"Failed to render {format}"})
+                return
+            headers = {"ETag": artifact.etag, "Cache-Control": "no-cache"}
+            if_none_match = self.headers.get("If-None-Match")
+            if if_none_match and (if_none_match.strip() == "*" or artifact.etag in
+                                  [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                return
+            self._send(HTTPStatus.OK, artifact.body, artifact.content_type, headers)
+
+        do_HEAD = do_GET
+
+        def log_message(self, format: str, *args: Any) -> None:
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return Handler
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve OKR reports over HTTP from a warm, periodically refreshed model.")
+    parser.add_argument("--input", default=None, help="OKR JSON or NDJSON file to serve; reloaded when it changes")
+    parser.add_argument("--org", default=None, help="Azure DevOps organization name")
+    parser.add_argument("--project", default=None, help="Azure DevOps project name")
+    parser.add_argument("--pat", default=None, help="Azure DevOps Personal Access Token")
+    parser.add_argument("--api-root", default="https://dev.azure.com", help="Azure DevOps Services or Server URL (default: https://dev.azure.com)")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--interval", type=float, default=300, help="Seconds between background refreshes (default: 300)")
+    parser.add_argument("--format", type=lambda value: parse_formats(value, OUTPUT_FORMATS), default=["markdown", "doc", "raw-json"], help="Formats to render as soon as the data changes, comma-separated (default: markdown,doc,raw-json); other formats are rendered on first request")
+    parser.add_argument("--schema", default=None, help="Path to JSON schema (default: okr_summary.json in schemas dir)")
+    parser.add_argument("--no-validate", action="store_true", help="Skip validation against JSON schema")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum number of Azure DevOps requests in flight (default: 4)")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per request for throttled or failed calls (default: 5)")
+    parser.add_argument("--depth", type=int, default=2, help="Levels of the Objective hierarchy to load (default: 2)")
+    parser.add_argument("--cache-dir", default=default_cache_dir(), help="Directory for the work item and template caches (default: ~/.cache/workflow-doc-gen)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the on-disk cache")
+    args = parser.parse_args()
+    if bool(args.input) == bool(args.org or args.project or args.pat):
+        parser.error("give either --input, or --org, --project and --pat")
+    if not args.input and not (args.org and args.project and args.pat):
+        parser.error("--org, --project and --pat are all required for Azure DevOps")
+
+    # Determine schema path
+    schema_path = args.schema
+    if not schema_path:
+        here = os.path.dirname(os.path.abspath(__file__))
+        schema_path = os.path.join(here, 'schemas/okr_summary.json')
+        if not os.path.exists(schema_path):
+            schema_path = os.path.join(here, '../schemas/okr_summary.json')
+
+    if args.input:
+        load = JsonFileSource(args.input)
+    else:
+        from hungovercoders_workflow_doc_gen.azure_devops_client import AzureDevOpsClient
+        cache = None if args.no_cache else WorkItemCache(args.cache_dir)
+        client = AzureDevOpsClient(args.org, args.project, args.pat, concurrency=args.concurrency,
+                                   api_root=args.api_root, max_retries=args.max_retries, cache=cache)
+        load = AzureDevOpsSource(client, max_depth=args.depth)
+
+    service = ReportService(load, schema_path=None if args.no_validate else schema_path, prerender=args.format,
+                            bytecode_cache_dir=None if args.no_cache else os.path.join(args.cache_dir, "templates"))
+    service.refresh()
+    if service.snapshot is None:
+        logger.error("Initial load failed; the server will keep retrying in the background")
+    service.start(args.interval)
+    httpd = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    httpd.daemon_threads = True
+    print(f"Serving OKR reports on http://{args.host}:{httpd.server_address[1]}/ "
+          f"({', '.join(sorted(REPORT_PATHS))}), refreshing every {args.interval:g}s")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        httpd.server_close()
+
+if __name__ == "__main__":
+    main()
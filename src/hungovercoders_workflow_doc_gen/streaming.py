@@ -0,0 +1,212 @@
+"""
+Streaming helpers for reading and writing large OKR documents one objective at a time.
+"""
+import json
+import logging
+import re
+import textwrap
+from typing import Any, Dict, IO, Iterable, Iterator
+from hungovercoders_workflow_doc_gen.model import Objective, to_json
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Extensions of files read as NDJSON without looking at their content.
+NDJSON_EXTENSIONS = (".ndjson", ".jsonl")
+
+class _JsonStreamReader:
+    """
+    Incremental JSON tokenizer over a text file, decoding one value at a time.
+    Consumed input is discarded so memory use is bounded by the largest single value.
+    """
+    def __init__(self, f: IO[str], chunk_size: int = 64 * 1024) -> None:
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        # Lines and characters dropped with consumed input, to report errors at their position in the file.
+        self.dropped_chars = 0
+        self.dropped_lines = 0
+        self.dropped_column = 0
+
+    def _fill(self) -> bool:
+        """Read another chunk, dropping consumed input. Returns False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        dropped = self.buf[:self.pos]
+        newline = dropped.rfind("\n")
+        self.dropped_column = len(dropped) - newline - 1 if newline != -1 else self.dropped_column + len(dropped)
+        self.dropped_lines += dropped.count("\n")
+        self.dropped_chars += len(dropped)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at end of file)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        """Consume ``char`` or raise ValueError."""
+        found = self.peek()
+        if found != char:
+            found = repr(found) if found else "end of file"
+            raise ValueError(f"Expected {char!r} in JSON stream at char {self.dropped_chars + self.pos}, found {found}")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode and consume the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if not self._fill():
+                    raise self._error(e)
+                continue
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _error(self, e: json.JSONDecodeError) -> ValueError:
+        """Restate a decoding error of the buffer with its line, column and character in the whole file."""
+        column = e.colno + self.dropped_column if e.lineno == 1 else e.colno
+        return ValueError(f"{e.msg}: line {e.lineno + self.dropped_lines} column {column} "
+                          f"(char {e.pos + self.dropped_chars})")
+
+
+def iter_objectives(f: IO[str], key: str = "objectives", chunk_size: int = 64 * 1024) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the items of the top-level ``key`` array of a JSON document without loading the whole document.
+
+    A document whose top level is an array is streamed item by item as well.
+
+    Args:
+        f: Text file object positioned at the start of the document.
+        key: Name of the top-level array to stream.
+    Raises:
+        ValueError: If the document is not an object containing ``key`` (or an array).
+    """
+    reader = _JsonStreamReader(f, chunk_size)
+    first = reader.peek()
+    if first == "[":
+        yield from _iter_array(reader)
+        return
+    reader.expect("{")
+    while reader.peek() != "}":
+        name = reader.decode()
+        reader.expect(":")
+        if name == key:
+            yield from _iter_array(reader)
+            return
+        reader.decode()  # skip other top-level values
+        if reader.peek() == ",":
+            reader.expect(",")
+    raise ValueError(f"JSON document has no top-level '{key}' array")
+
+
+def iter_ndjson_objectives(f: IO[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the objectives of an NDJSON document: one JSON objective per line, blank lines ignored.
+
+    Raises:
+        ValueError: If a line is not a JSON object; the message gives the line number.
+    """
+    for number, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON on line {number}: {e}")
+        if not isinstance(obj, dict):
+            raise ValueError(f"Line {number} is not a JSON object")
+        yield obj
+
+
+def is_ndjson(f: IO[str]) -> bool:
+    """
+    Tell whether a seekable input holds NDJSON rather than a JSON document.
+
+    Files named ``*.ndjson`` or ``*.jsonl`` are NDJSON. Otherwise only the start of the input is read:
+    it is NDJSON when it opens with an object whose first key is an objective field (such as ``id``)
+    rather than a document key such as ``objectives``. The file position is restored.
+    """
+    name = getattr(f, "name", None)
+    if isinstance(name, str) and name.lower().endswith(NDJSON_EXTENSIONS):
+        return True
+    position = f.tell()
+    try:
+        reader = _JsonStreamReader(f, chunk_size=4096)
+        if reader.peek() != "{":
+            return False
+        reader.expect("{")
+        if reader.peek() != '"':
+            return False
+        return reader.decode() in Objective.FIELDS
+    except ValueError:
+        # Not valid JSON either way; the document parser reports where.
+        return False
+    finally:
+        f.seek(position)
+
+
+def iter_input_objectives(f: IO[str]) -> Iterator[Dict[str, Any]]:
+    """Yield the objectives of an okr_summary JSON document or of an NDJSON file of objectives."""
+    if is_ndjson(f):
+        return iter_ndjson_objectives(f)
+    return iter_objectives(f)
+
+
+def _iter_array(reader: _JsonStreamReader) -> Iterator[Any]:
+    """Yield the values of the array starting at the reader's position."""
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.expect("]")
+        return
+    while True:
+        yield reader.decode()
+        if reader.peek() == ",":
+            reader.expect(",")
+        else:
+            reader.expect("]")
+            return
+
+
+def write_objectives_json(objectives: Iterable[Dict[str, Any]], f: IO[str]) -> int:
+    """
+    Write ``{"objectives": [...]}`` one objective at a time, matching ``json.dump(..., indent=2)``.
+    Returns the number of objectives written.
+    """
+    count = 0
+    f.write('{\n  "objectives": [')
+    for obj in objectives:
+        f.write(",\n" if count else "\n")
+        f.write(textwrap.indent(json.dumps(obj, indent=2), "    "))
+        count += 1
+    f.write("\n  ]\n}" if count else "]\n}")
+    return count
+
+
+def write_objectives_ndjson(objectives: Iterable[Any], f: IO[str]) -> int:
+    """
+    Write one compact JSON objective per line (dicts or model objects). Returns the number written.
+    """
+    count = 0
+    for obj in objectives:
+        f.write(json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=to_json))
+        f.write("\n")
+        count += 1
+    return count
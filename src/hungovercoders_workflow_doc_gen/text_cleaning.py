@@ -0,0 +1,149 @@
+"""
+Cleaning of Azure DevOps rich-text fields (HTML) into the single-line plain text used by the Markdown report.
+
+Work items repeat the same field values many times (boilerplate answers, shared outcomes), so each
+distinct value is converted once per process and looked up by its content afterwards.
+"""
+from html import unescape
+from typing import Any, Dict, Iterable, List, Tuple
+from hungovercoders_workflow_doc_gen.metrics import get_metrics
+from hungovercoders_workflow_doc_gen.model import Hypothesis, Objective, get_field
+
+# Rich-text fields cleaned per level of the hierarchy; key_results is a list of rich-text values.
+OBJECTIVE_TEXT_FIELDS = ("objective", "key_results", "method_of_measure", "objective_outcome")
+HYPOTHESIS_TEXT_FIELDS = ("hypothesis", "hypothesis_context", "method_of_measuring_hypothesis", "hypothesis_outcome")
+
+# Characters of field values kept in the cache; it is emptied when full rather than tracking recency.
+# Kept small so that a streamed render, which cleans as it goes, still runs in flat memory.
+CACHE_MAX_CHARS = 256_000
+
+_cache: Dict[str, str] = {}
+_cache_chars = 0
+
+
+def _strip_tags(value: str) -> str:
+    """Remove HTML comments and tags the way Jinja's striptags filter does, including unclosed ones."""
+    parts = []
+    pos = 0
+    while (start := value.find("<", pos)) != -1:
+        if value.startswith("<!--", start):
+            end = value.find("-->", start + 4)
+            if end == -1:
+                break
+            end += 3
+        else:
+            end = value.find(">", start)
+            if end == -1:
+                break
+            end += 1
+        parts.append(value[pos:start])
+        pos = end
+    if pos:
+        parts.append(value[pos:])
+        value = "".join(parts)
+    return value
+
+
+def _convert(value: str) -> str:
+    if "<" in value:
+        value = _strip_tags(value)
+    value = " ".join(value.split())
+    if "&" in value:
+        # Entities are decoded after whitespace is collapsed, so one such as &#10; can still add a newline.
+        value = unescape(value).replace("\n", " ")
+    return value
+
+
+def html_to_text(value: Any) -> str:
+    """
+    Return a rich-text field as one line of plain text: tags removed, entities decoded and
+    whitespace (including newlines) collapsed. Gives the same result as
+    ``value | striptags | replace('\\n', ' ')`` in a template; empty values give ''.
+    """
+    if not value:
+        return ""
+    if not isinstance(value, str):
+        value = str(value)
+    global _cache_chars
+    text = _cache.get(value)
+    if text is None:
+        text = _convert(value)
+        if _cache_chars + len(value) > CACHE_MAX_CHARS:
+            clear_cache()
+        _cache[value] = text
+        _cache_chars += len(value)
+    return text
+
+
+def split_key_results(value: Any) -> List[str]:
+    """Return key results as a list: one per non-blank line when given as a single string."""
+    if isinstance(value, str):
+        return [kr.strip() for kr in value.split("\n") if kr.strip()]
+    if isinstance(value, list):
+        return value
+    return []
+
+
+def _raw_key_results(item: Any) -> Any:
+    # Older exports carry the list as key_results_list; the templates have always preferred it.
+    if isinstance(item, dict) and "key_results_list" in item:
+        return item["key_results_list"]
+    return get_field(item, "key_results")
+
+
+def _clean_fields(item: Any, names: Tuple[str, ...], counts: List[int]) -> Dict[str, Any]:
+    text: Dict[str, Any] = {}
+    for name in names:
+        values = split_key_results(_raw_key_results(item)) if name == "key_results" else [get_field(item, name)]
+        cleaned = []
+        for value in values:
+            if value and isinstance(value, str):
+                counts[0 if value in _cache else 1] += 1
+            cleaned.append(html_to_text(value))
+        text[name] = cleaned if name == "key_results" else cleaned[0]
+    return text
+
+
+def clean_objectives(objectives: Iterable[Any]) -> int:
+    """
+    Clean the rich-text fields of every objective and hypothesis in one pass.
+
+    Model objects keep the result in their ``text`` attribute, which text_field() and the
+    templates read instead of cleaning again; for plain dicts the values are only cached.
+    Returns the number of objectives cleaned.
+    """
+    counts = [0, 0]
+    cleaned = 0
+    for objective in objectives:
+        text = _clean_fields(objective, OBJECTIVE_TEXT_FIELDS, counts)
+        if isinstance(objective, Objective):
+            objective.text = text
+        for hypothesis in get_field(objective, "hypotheses") or []:
+            text = _clean_fields(hypothesis, HYPOTHESIS_TEXT_FIELDS, counts)
+            if isinstance(hypothesis, Hypothesis):
+                hypothesis.text = text
+        cleaned += 1
+    get_metrics().record_cache("text", hits=counts[0], misses=counts[1])
+    return cleaned
+
+
+def text_field(item: Any, name: str) -> Any:
+    """
+    Template filter returning the cleaned value of a rich-text field (a list for key_results).
+
+    Uses the values stored by clean_objectives() when present and cleans on the fly otherwise,
+    e.g. for objectives streamed as dicts.
+    """
+    text = getattr(item, "text", None) if not isinstance(item, dict) else None
+    if text is not None and name in text:
+        return text[name]
+    if name == "key_results":
+        return [html_to_text(kr) for kr in split_key_results(_raw_key_results(item))]
+    return html_to_text(get_field(item, name))
+
+
+def clear_cache() -> None:
+    """Forget every cleaned value."""
+    global _cache_chars
+    _cache.clear()
+    _cache_chars = 0
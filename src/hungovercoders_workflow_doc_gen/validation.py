@@ -0,0 +1,230 @@
+"""
+Compiled, cached JSON schema validation for OKR documents.
+"""
+import functools
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+class ValidationIssue(NamedTuple):
+    """A single schema violation and the JSON path of the offending value."""
+    json_path: str
+    message: str
+
+
+class _UnsupportedSchema(Exception):
+    """The schema uses a keyword the built-in compiler does not handle."""
+
+
+# Keywords that never affect validity (``format`` is only asserted with a format checker, as in jsonschema).
+_ANNOTATIONS = frozenset({"$schema", "$id", "$comment", "title", "description", "default", "examples", "format", "definitions"})
+
+# Python expressions testing a JSON type; ``{v}`` is replaced with the variable being checked.
+_TYPE_EXPRESSIONS = {
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "string": "isinstance({v}, str)",
+    "integer": "((isinstance({v}, int) and not isinstance({v}, bool)) or (isinstance({v}, float) and {v}.is_integer()))",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "boolean": "isinstance({v}, bool)",
+    "null": "{v} is None",
+}
+
+_MISSING = object()
+
+class _ValidatorGenerator:
+    """
+    Generates the source of a Python predicate for a schema, in the style of fastjsonschema.
+
+    Only the keywords used by the OKR schemas are supported (type, enum, required, properties,
+    items and local ``$ref``); anything else raises _UnsupportedSchema.
+    """
+    def __init__(self, root: Dict[str, Any]) -> None:
+        self.root = root
+        self.functions: Dict[str, List[str]] = {}
+        self.constants: Dict[str, Any] = {"_MISSING": _MISSING}
+        self.counter = 0
+
+    def _name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def function(self, node: Any, name: str) -> str:
+        """Generate ``def name(value)`` for node and return its name."""
+        self.functions[name] = []  # reserve the name first so recursive references terminate
+        body: List[str] = []
+        self._emit(node, "value", body, 1)
+        self.functions[name] = [f"def {name}(value):"] + body + ["    return True"]
+        return name
+
+    def _ref(self, ref: str) -> str:
+        if not ref.startswith("#/definitions/"):
+            raise _UnsupportedSchema(f"$ref {ref}")
+        definition = ref[len("#/definitions/"):]
+        name = "_ref_" + "".join(c if c.isalnum() else "_" for c in definition)
+        if name not in self.functions:
+            self.function(self.root.get("definitions", {})[definition], name)
+        return name
+
+    def _emit(self, node: Any, var: str, out: List[str], depth: int) -> None:
+        pad = "    " * depth
+        if node is True or node == {}:
+            return
+        if node is False:
+            out.append(f"{pad}return False")
+            return
+        if not isinstance(node, dict):
+            raise _UnsupportedSchema(f"schema node {node!r}")
+        if "$ref" in node:
+            # Draft 7: keywords next to $ref are ignored.
+            out.append(f"{pad}if not {self._ref(node['$ref'])}({var}): return False")
+            return
+        unsupported = set(node) - _ANNOTATIONS - {"type", "enum", "required", "properties", "items"}
+        if unsupported:
+            raise _UnsupportedSchema(", ".join(sorted(unsupported)))
+        if "type" in node:
+            types = node["type"] if isinstance(node["type"], list) else [node["type"]]
+            if not set(types) <= set(_TYPE_EXPRESSIONS):
+                raise _UnsupportedSchema(f"type {node['type']}")
+            condition = " or ".join(_TYPE_EXPRESSIONS[t].format(v=var) for t in types)
+            out.append(f"{pad}if not ({condition}): return False")
+        if "enum" in node:
+            if not all(isinstance(value, str) for value in node["enum"]):
+                raise _UnsupportedSchema("non-string enum")
+            constant = self._name("_enum")
+            self.constants[constant] = frozenset(node["enum"])
+            out.append(f"{pad}if not (isinstance({var}, str) and {var} in {constant}): return False")
+        if "required" in node or "properties" in node:
+            out.append(f"{pad}if isinstance({var}, dict):")
+            out.append(f"{pad}    pass")
+            for name in node.get("required", []):
+                out.append(f"{pad}    if {name!r} not in {var}: return False")
+            for name, sub in node.get("properties", {}).items():
+                child = self._name("v")
+                out.append(f"{pad}    {child} = {var}.get({name!r}, _MISSING)")
+                out.append(f"{pad}    if {child} is not _MISSING:")
+                out.append(f"{pad}        pass")
+                self._emit(sub, child, out, depth + 2)
+        if "items" in node:
+            if isinstance(node["items"], list):
+                raise _UnsupportedSchema("tuple items")
+            child = self._name("v")
+            out.append(f"{pad}if isinstance({var}, list):")
+            out.append(f"{pad}    for {child} in {var}:")
+            out.append(f"{pad}        pass")
+            self._emit(node["items"], child, out, depth + 2)
+
+    def compile(self) -> Callable[[Any], bool]:
+        """Generate, compile and return the predicate for the root schema."""
+        self.function(self.root, "validate")
+        source = "\n".join(line for lines in self.functions.values() for line in lines)
+        namespace = dict(self.constants)
+        exec(compile(source, "<okr schema validator>", "exec"), namespace)
+        return namespace["validate"]
+
+def _compile_fast_path(schema: Dict[str, Any], use_fastjsonschema: bool) -> tuple:
+    """
+    Return (backend name, predicate) for the quickest available validity check of ``schema``.
+    """
+    if use_fastjsonschema:
+        try:
+            import fastjsonschema
+        except ImportError:
+            pass
+        else:
+            compiled = fastjsonschema.compile(schema)
+
+            def check(value: Any) -> bool:
+                try:
+                    compiled(value)
+                except fastjsonschema.JsonSchemaException:
+                    return False
+                return True
+            return "fastjsonschema", check
+    try:
+        return "compiled", _ValidatorGenerator(schema).compile()
+    except _UnsupportedSchema as e:
+        logger.debug(f"Schema not supported by the built-in compiler ({e}); using jsonschema only")
+        return "jsonschema", None
+
+
+class SchemaValidator:
+    """
+    Validates OKR documents, and individual objectives, against a JSON schema that is compiled once.
+
+    Valid data is accepted by a fast path: a validator generated by ``fastjsonschema`` when it is
+    installed, otherwise a predicate compiled from the schema by this module. Only data the fast
+    path rejects goes through jsonschema, which reports every error with its JSON path, so
+    jsonschema is not even imported while the data is valid.
+    """
+    def __init__(self, schema: Dict[str, Any], use_fastjsonschema: bool = True) -> None:
+        self.schema = schema
+        items = schema.get("properties", {}).get("objectives", {}).get("items", {})
+        self.item_schema = dict(items) if isinstance(items, dict) else {}
+        if "definitions" in schema:
+            self.item_schema["definitions"] = schema["definitions"]
+        if "$schema" in schema:
+            self.item_schema["$schema"] = schema["$schema"]
+        self.backend, self._is_valid = _compile_fast_path(schema, use_fastjsonschema)
+        _, self._item_is_valid = _compile_fast_path(self.item_schema, use_fastjsonschema)
+        self._validators: Dict[str, Any] = {}
+        if self._is_valid is None:
+            # Not compiled: let jsonschema check the schema itself up front.
+            self._jsonschema_validator("document")
+
+    def _jsonschema_validator(self, which: str) -> Any:
+        """Return the jsonschema validator for the "document" or a single "objective", creating it on first use."""
+        if which not in self._validators:
+            import jsonschema
+            schema = self.schema if which == "document" else self.item_schema
+            validator_cls = jsonschema.validators.validator_for(self.schema)
+            validator_cls.check_schema(schema)
+            self._validators[which] = validator_cls(schema)
+        return self._validators[which]
+
+    def is_valid(self, data: Any) -> bool:
+        """Return whether the whole document is valid."""
+        if self._is_valid is not None and self._is_valid(data):
+            return True
+        return not any(True for _ in self.iter_errors(data))
+
+    def iter_errors(self, data: Any) -> Iterator[ValidationIssue]:
+        """Yield every schema violation in the whole document."""
+        if self._is_valid is not None and self._is_valid(data):
+            return
+        for error in self._jsonschema_validator("document").iter_errors(data):
+            yield ValidationIssue(error.json_path, error.message)
+
+    def iter_objective_errors(self, objective: Any, index: int) -> Iterator[ValidationIssue]:
+        """Yield every schema violation in a single objective, with paths relative to the document."""
+        if self._item_is_valid is not None and self._item_is_valid(objective):
+            return
+        prefix = f"$.objectives[{index}]"
+        for error in self._jsonschema_validator("objective").iter_errors(objective):
+            yield ValidationIssue(prefix + error.json_path[1:], error.message)
+
+    def errors(self, data: Any) -> List[ValidationIssue]:
+        """Return every schema violation in the whole document."""
+        return list(self.iter_errors(data))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_validator(schema_path: str, mtime: float, use_fastjsonschema: bool) -> SchemaValidator:
+    with open(schema_path, encoding='utf-8') as f:
+        schema = json.load(f)
+    return SchemaValidator(schema, use_fastjsonschema)
+
+def get_validator(schema_path: str, use_fastjsonschema: bool = True) -> SchemaValidator:
+    """
+    Return the compiled validator for a schema file, compiling it on first use or when the file changes.
+    """
+    schema_path = os.path.realpath(schema_path)
+    return _load_validator(schema_path, os.path.getmtime(schema_path), use_fastjsonschema)
+
+def log_validation_errors(issues: List[ValidationIssue]) -> None:
+    """Log one line per schema violation."""
+    for issue in issues:
+        logger.error(f"OKR data validation failed at {issue.json_path}: {issue.message}")
@@ -0,0 +1,141 @@
+"""
+Persistent on-disk cache of Azure DevOps work items, invalidated by revision.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from hungovercoders_workflow_doc_gen.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+class CachedWorkItem(NamedTuple):
+    """A cached work item payload and the revision it was fetched at."""
+    rev: Optional[int]
+    changed_date: Optional[str]
+    payload: Dict[str, Any]
+
+
+def default_cache_dir() -> str:
+    """
+    Return the default cache directory (``$XDG_CACHE_HOME/workflow-doc-gen`` or ``~/.cache/workflow-doc-gen``).
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "workflow-doc-gen")
+
+
+class WorkItemCache:
+    """
+    SQLite-backed work item cache keyed by organization, project, view and work item ID.
+
+    ``view`` distinguishes differently shaped payloads of the same item (e.g. with or without relations).
+    Entries record ``System.Rev`` and ``System.ChangedDate`` so callers can tell which items are stale.
+    Least recently used entries are evicted once ``max_entries`` or ``max_bytes`` is exceeded.
+    """
+    def __init__(self, cache_dir: str, max_entries: int = 100_000, max_bytes: int = 256 * 1024 * 1024) -> None:
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "work_items.sqlite3")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS work_items ("
+            " organization TEXT NOT NULL, project TEXT NOT NULL, view TEXT NOT NULL, id INTEGER NOT NULL,"
+            " rev INTEGER, changed_date TEXT, payload TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (organization, project, view, id))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS work_items_last_used ON work_items (last_used)")
+        self._conn.commit()
+
+    def get_many(self, organization: str, project: str, view: str, ids: Iterable[int]) -> Dict[int, CachedWorkItem]:
+        """
+        Look up cached items. Returns a dict of the IDs found; found entries are marked as recently used.
+        """
+        ids = list(ids)
+        found: Dict[int, CachedWorkItem] = {}
+        now = time.time()
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT id, rev, changed_date, payload FROM work_items"
+                    f" WHERE organization = ? AND project = ? AND view = ? AND id IN ({placeholders})",
+                    [organization, project, view, *chunk],
+                ).fetchall()
+                for wid, rev, changed_date, payload in rows:
+                    found[wid] = CachedWorkItem(rev, changed_date, json.loads(payload))
+                self._conn.execute(
+                    f"UPDATE work_items SET last_used = ?"
+                    f" WHERE organization = ? AND project = ? AND view = ? AND id IN ({placeholders})",
+                    [now, organization, project, view, *chunk],
+                )
+            self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(ids) - len(found)
+        get_metrics().record_cache("work_items", len(found), len(ids) - len(found))
+        return found
+
+    def put_many(self, organization: str, project: str, view: str, items: Iterable[Dict[str, Any]]) -> None:
+        """
+        Store fetched work item payloads, then evict least recently used entries if over budget.
+        """
+        now = time.time()
+        rows = []
+        for item in items:
+            fields = item.get("fields", {})
+            payload = json.dumps(item, separators=(",", ":"))
+            rows.append((organization, project, view, item["id"], item.get("rev", fields.get("System.Rev")),
+                         fields.get("System.ChangedDate"), payload, len(payload), now))
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO work_items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._evict()
+            self._conn.commit()
+
+    def delete_many(self, organization: str, project: str, ids: Iterable[int]) -> None:
+        """
+        Drop every cached view of the given work items.
+        """
+        ids = list(ids)
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                self._conn.execute(
+                    f"DELETE FROM work_items WHERE organization = ? AND project = ? AND id IN ({placeholders})",
+                    [organization, project, *chunk],
+                )
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Remove least recently used rows until both the entry and byte budgets are met."""
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM work_items").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        to_delete: List[tuple] = []
+        for key_and_size in self._conn.execute(
+            "SELECT organization, project, view, id, size FROM work_items ORDER BY last_used ASC"
+        ):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            to_delete.append(key_and_size[:4])
+            count -= 1
+            total -= key_and_size[4]
+        self._conn.executemany(
+            "DELETE FROM work_items WHERE organization = ? AND project = ? AND view = ? AND id = ?", to_delete
+        )
+        logger.debug(f"Evicted {len(to_delete)} work items from cache {self.path}")
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
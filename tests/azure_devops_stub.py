@@ -0,0 +1,263 @@
+"""
+Local stub of the Azure DevOps WIQL and work item endpoints used by the client tests.
+"""
+import datetime
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INITIAL_CHANGED_DATE = "2025-01-01T00:00:00.000Z"
+HIERARCHY_FORWARD = "System.LinkTypes.Hierarchy-Forward"
+
+
+def _parse_date(value):
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def make_work_items(objective_count, children_per_objective=2, api_root="http://stub", depth=2,
+                    children_per_item=2):
+    """
+    Build Objective work items (with hierarchy relations) and their child Hypothesis work items.
+    With ``depth`` of 3 or more, every hypothesis gets ``children_per_item`` Issue work items,
+    nested ``depth - 2`` levels deep.
+    """
+    items = {}
+    next_child = objective_count + 1
+    for oid in range(1, objective_count + 1):
+        child_ids = list(range(next_child, next_child + children_per_objective))
+        next_child += children_per_objective
+        items[oid] = {
+            "id": oid,
+            "rev": 1,
+            "fields": {
+                "System.Id": oid,
+                "System.Rev": 1,
+                "System.ChangedDate": INITIAL_CHANGED_DATE,
+                "System.WorkItemType": "Objective",
+                "System.Title": f"Objective {oid}",
+                "System.State": "active",
+                "Custom.Objective": f"Objective {oid} statement",
+                "Custom.KeyResults": "KR one\nKR two",
+            },
+            "relations": [
+                {"rel": HIERARCHY_FORWARD, "url": f"{api_root}/_apis/wit/workItems/{cid}"}
+                for cid in child_ids
+            ],
+        }
+        for cid in child_ids:
+            items[cid] = {
+                "id": cid,
+                "rev": 1,
+                "fields": {
+                    "System.Id": cid,
+                    "System.Rev": 1,
+                    "System.ChangedDate": INITIAL_CHANGED_DATE,
+                    "System.WorkItemType": "Hypothesis",
+                    "System.Title": f"Hypothesis {cid}",
+                    "System.State": "testing",
+                    "System.Parent": oid,
+                    "Custom.Hypothesis": f"If we do {cid}, things improve.",
+                },
+            }
+    next_id = next_child
+    level = [cid for cid, item in items.items() if item["fields"]["System.WorkItemType"] == "Hypothesis"]
+    for _ in range(depth - 2):
+        next_level = []
+        for parent_id in level:
+            for cid in range(next_id, next_id + children_per_item):
+                items[cid] = {
+                    "id": cid,
+                    "rev": 1,
+                    "fields": {
+                        "System.Id": cid,
+                        "System.Rev": 1,
+                        "System.ChangedDate": INITIAL_CHANGED_DATE,
+                        "System.WorkItemType": "Issue",
+                        "System.Title": f"Issue {cid}",
+                        "System.State": "To Do",
+                        "System.Parent": parent_id,
+                    },
+                }
+                items[parent_id].setdefault("relations", []).append(
+                    {"rel": HIERARCHY_FORWARD, "url": f"{api_root}/_apis/wit/workItems/{cid}"})
+                next_level.append(cid)
+            next_id += children_per_item
+        level = next_level
+    return items
+
+
+class AzureDevOpsStub:
+    """
+    Threaded HTTP server answering WIQL, workitemsbatch and single work item requests.
+
+    Use as a context manager; ``api_root`` is the value to pass to AzureDevOpsClient.
+    Each request sleeps for ``latency`` seconds. The first ``throttle_first`` requests, and then
+    every ``throttle_every``-th request, are rejected with 429 and a ``Retry-After`` of
+    ``retry_after`` seconds. With ``known_fields``, workitemsbatch requests for any other field are
+    rejected with 400, like a process that lacks the field. Request and in-flight counts are recorded.
+    """
+    def __init__(self, work_items, latency=0.0, throttle_first=0, retry_after=0, throttle_every=0, known_fields=None):
+        self.work_items = work_items
+        self.known_fields = known_fields
+        self.latency = latency
+        self.throttle_first = throttle_first
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.recycle_bin = []
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def api_root(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def bump_revision(self, work_item_id, **fields):
+        """Simulate an edit: update fields, increment the revision and stamp System.ChangedDate."""
+        item = self.work_items[work_item_id]
+        item["rev"] = item.get("rev", 1) + 1
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat().replace("+00:00", "Z")
+        item["fields"].update(fields, **{"System.Rev": item["rev"], "System.ChangedDate": now})
+
+    def children(self, work_item_id):
+        """Return the IDs of an item's hierarchy children."""
+        return [int(rel["url"].rsplit("/", 1)[-1]) for rel in self.work_items[work_item_id].get("relations", [])
+                if rel["rel"] == HIERARCHY_FORWARD]
+
+    def move(self, child_id, new_parent_id):
+        """Re-parent a child; like Azure DevOps, both parents and the child get a new revision."""
+        old_parent_id = self.work_items[child_id]["fields"]["System.Parent"]
+        old_parent = self.work_items[old_parent_id]
+        link = next(rel for rel in old_parent["relations"] if rel["url"].endswith(f"/{child_id}"))
+        old_parent["relations"].remove(link)
+        self.work_items[new_parent_id].setdefault("relations", []).append(link)
+        self.bump_revision(old_parent_id)
+        self.bump_revision(new_parent_id)
+        self.bump_revision(child_id, **{"System.Parent": new_parent_id})
+
+    def delete(self, work_item_id):
+        """Move a work item to the recycle bin without touching its parent."""
+        item = self.work_items.pop(work_item_id)
+        self.recycle_bin.append({"id": work_item_id, "fields": item["fields"]})
+        for other in self.work_items.values():
+            other["relations"] = [rel for rel in other.get("relations", [])
+                                  if not rel["url"].endswith(f"/{work_item_id}")]
+
+    def objective_ids(self):
+        return sorted(i for i, item in self.work_items.items()
+                      if item["fields"].get("System.WorkItemType") == "Objective")
+
+    def wiql(self, query):
+        """Evaluate the handful of WIQL shapes the client sends."""
+        since = re.search(r"ChangedDate\] > '([^']+)'", query)
+        since = _parse_date(since.group(1)) if since else None
+
+        def changed(wid):
+            return since is None or _parse_date(self.work_items[wid]["fields"]["System.ChangedDate"]) > since
+
+        if "MODE (Recursive)" in query:
+            relations = []
+
+            def walk(parent_id):
+                for cid in self.children(parent_id):
+                    if cid in self.work_items:
+                        relations.append({"rel": HIERARCHY_FORWARD, "source": {"id": parent_id}, "target": {"id": cid}})
+                        walk(cid)
+
+            for oid in self.objective_ids():
+                relations.append({"rel": None, "source": None, "target": {"id": oid}})
+                walk(oid)
+            return {"queryType": "tree", "workItemRelations": relations}
+        if "FROM WorkItemLinks" in query:
+            relations = [
+                {"rel": HIERARCHY_FORWARD, "source": {"id": oid}, "target": {"id": cid}}
+                for oid in self.objective_ids() for cid in self.children(oid)
+                if cid in self.work_items and changed(cid)
+            ]
+            return {"queryType": "oneHop", "workItemRelations": relations}
+        return {"queryType": "flat", "workItems": [{"id": oid} for oid in self.objective_ids() if changed(oid)]}
+
+    def handle(self, method, path, body):
+        """
+        Return (status, payload, headers) for a request. Subclasses and tests may override.
+        """
+        if method == "POST" and "/wit/wiql" in path:
+            return 200, self.wiql(body["query"]), {}
+        if method == "POST" and "/wit/workitemsbatch" in path:
+            unknown = [f for f in body.get("fields") or [] if self.known_fields is not None and f not in self.known_fields]
+            if unknown:
+                return 400, {"message": f"TF51535: Cannot find field {unknown[0]}."}, {}
+            value = []
+            for i in body.get("ids", []):
+                item = self.work_items.get(i)
+                if item is not None and body.get("fields"):
+                    item = {"id": i, "rev": item.get("rev"),
+                            "fields": {f: item["fields"][f] for f in body["fields"] if f in item["fields"]}}
+                elif item is not None and body.get("$expand") != "Relations":
+                    item = {k: v for k, v in item.items() if k != "relations"}
+                value.append(item)
+            return 200, {"count": len(value), "value": value}, {}
+        if method == "GET" and "/wit/recyclebin" in path:
+            return 200, {"count": len(self.recycle_bin), "value": self.recycle_bin}, {}
+        match = re.search(r"/wit/workitems/(\d+)", path)
+        if method == "GET" and match and int(match.group(1)) in self.work_items:
+            return 200, self.work_items[int(match.group(1))], {}
+        return 404, {"message": f"No stub for {method} {path}"}, {}
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else {}
+                with stub._lock:
+                    stub.requests.append((method, self.path))
+                    count = len(stub.requests)
+                    throttled = count <= stub.throttle_first or (
+                        stub.throttle_every > 0 and count % stub.throttle_every == 0)
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                try:
+                    if stub.latency:
+                        time.sleep(stub.latency)
+                    if throttled:
+                        status, payload, headers = 429, {"message": "Too many requests"}, {"Retry-After": stub.retry_after}
+                    else:
+                        status, payload, headers = stub.handle(method, self.path, body)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, str(value))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
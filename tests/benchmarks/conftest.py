@@ -0,0 +1,96 @@
+"""
+Baseline recording and regression checks for the benchmarks.
+
+Benchmarks time their workload with the ``bench`` fixture. Each round of a workload is preceded by
+a fixed calibration workload, and baselines.json stores the best time of both
+(``pytest --run-benchmarks --benchmark-save``). When comparing (``--benchmark-compare``), a
+baseline is scaled by the ratio of the current and stored calibration times, so baselines recorded
+on a faster or slower (or busier) machine remain usable, and a benchmark fails when it is slower
+than its scaled baseline by more than ``--benchmark-threshold``.
+"""
+import json
+import os
+import time
+
+import pytest
+
+BASELINES = os.path.join(os.path.dirname(__file__), "baselines.json")
+
+CALIBRATION_DATA = [{"id": i, "title": f"Objective {i}", "state": "active", "key_results": ["a", "b"]}
+                    for i in range(5_000)]
+
+
+def calibrate():
+    """Time a fixed, pure-Python workload similar in kind to the benchmarks (JSON, strings, sorting)."""
+    started = time.perf_counter()
+    json.loads(json.dumps(CALIBRATION_DATA))
+    sorted("".join(reversed(item["title"])) for item in CALIBRATION_DATA)
+    return time.perf_counter() - started
+
+
+def load_baselines(path=BASELINES):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+class BenchmarkRecorder:
+    """Times workloads, compares them with the stored baselines and collects results to save."""
+    def __init__(self, baselines, compare, threshold):
+        self.baselines = baselines
+        self.compare = compare
+        self.threshold = threshold
+        self.results = {}
+
+    def expected(self, name, calibration):
+        """Return the baseline for name scaled to the current calibration time (if it has one), or None."""
+        baseline = self.baselines.get(name)
+        if baseline is None:
+            return None
+        if baseline.get("calibration_seconds"):
+            return baseline["seconds"] * calibration / baseline["calibration_seconds"]
+        return baseline["seconds"]
+
+    def __call__(self, name, fn, rounds=5, scale=True):
+        """
+        Run fn ``rounds`` times, record the best time under name and check it against the baseline.
+        Pass scale=False for workloads dominated by (simulated) network latency rather than CPU.
+        """
+        best = calibration = float("inf")
+        for _ in range(rounds):
+            calibration = min(calibration, calibrate())
+            started = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - started)
+        self.results[name] = {"seconds": round(best, 6), "calibration_seconds": round(calibration, 6) if scale else None}
+        expected = self.expected(name, calibration)
+        if expected is None:
+            print(f"\n{name}: {best:.3f}s (no baseline)")
+            return best
+        change = best / expected - 1
+        print(f"\n{name}: {best:.3f}s, baseline {expected:.3f}s ({change:+.0%})")
+        if self.compare and change > self.threshold:
+            pytest.fail(f"{name} regressed: {best:.3f}s against a baseline of {expected:.3f}s "
+                        f"({change:+.0%}, threshold {self.threshold:.0%})")
+        return best
+
+    def save(self, path=BASELINES):
+        """Merge this run's results into the baselines file."""
+        baselines = dict(self.baselines)
+        baselines.update(self.results)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+            f.write("\n")
+
+
+@pytest.fixture(scope="session")
+def bench(request):
+    """Session-wide BenchmarkRecorder; with --benchmark-save, results are stored when the session ends."""
+    config = request.config
+    recorder = BenchmarkRecorder(load_baselines(), config.getoption("--benchmark-compare"),
+                                 config.getoption("--benchmark-threshold"))
+    yield recorder
+    if config.getoption("--benchmark-save") and recorder.results:
+        recorder.save()
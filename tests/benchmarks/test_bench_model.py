@@ -0,0 +1,33 @@
+"""
+Benchmark of the memory retained by objectives held as model objects rather than dicts.
+"""
+import gc
+import json
+import tracemalloc
+
+import pytest
+from okr_generator import make_okr_data
+
+from hungovercoders_workflow_doc_gen.model import Objective
+
+
+def retained_bytes(build):
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+
+@pytest.mark.benchmark
+def test_models_retain_less_memory_than_dicts():
+    """Objectives decoded from JSON, as the CLIs load them, kept as dicts and as models."""
+    count = 20_000
+    text = json.dumps(make_okr_data(count))
+    as_dicts = retained_bytes(lambda: json.loads(text)["objectives"])
+    as_models = retained_bytes(lambda: [Objective.from_dict(obj) for obj in json.loads(text)["objectives"]])
+    print(f"\n{count} objectives: dicts {as_dicts / count:.0f} B/objective, "
+          f"models {as_models / count:.0f} B/objective ({as_dicts / as_models:.2f}x)")
+    assert as_dicts > 1.5 * as_models
@@ -0,0 +1,41 @@
+"""
+Scaling benchmark for sharded, process-pool PDF rendering.
+"""
+import os
+import time
+
+import pytest
+from okr_generator import make_okr_data
+
+from hungovercoders_workflow_doc_gen.formatter import Formatter
+
+try:
+    from pypdf import PdfReader
+    from weasyprint import HTML  # noqa: F401 - fails when the Pango libraries are missing
+except (ImportError, OSError) as e:
+    pytest.skip(f"PDF benchmark needs WeasyPrint and pypdf: {e}", allow_module_level=True)
+
+
+@pytest.mark.benchmark
+def test_parallel_pdf_scales_with_workers(tmp_path):
+    """Rendering 500 objectives gets faster as worker processes are added, and no page is lost."""
+    okr_data = make_okr_data(500)
+    formatter = Formatter()
+    started = time.perf_counter()
+    formatter.format_pdf(okr_data, str(tmp_path / "single.pdf"))
+    baseline = time.perf_counter() - started
+    print(f"\nsingle document: {baseline:.1f}s")
+
+    cpus = os.cpu_count() or 1
+    timings = {}
+    for workers in sorted({1, 2, 4, cpus}):
+        if workers > cpus:
+            continue
+        output_path = str(tmp_path / f"parallel_{workers}.pdf")
+        started = time.perf_counter()
+        formatter.format_pdf_parallel(okr_data, output_path, workers=workers)
+        timings[workers] = time.perf_counter() - started
+        print(f"{workers:>3} workers: {timings[workers]:.1f}s ({baseline / timings[workers]:.2f}x)")
+        assert len(PdfReader(output_path).pages) >= len(PdfReader(str(tmp_path / "single.pdf")).pages)
+    if cpus >= 4:
+        assert timings[4] < timings[1] * 0.6
@@ -0,0 +1,97 @@
+"""
+Benchmarks of every pipeline stage, compared against baselines.json.
+
+    pytest --run-benchmarks tests/benchmarks/test_bench_pipeline.py --benchmark-compare
+    pytest --run-benchmarks tests/benchmarks/test_bench_pipeline.py --benchmark-save
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+from azure_devops_stub import AzureDevOpsStub, make_work_items
+from okr_generator import make_okr_data, write_okr_json
+
+from hungovercoders_workflow_doc_gen.azure_devops_client import AzureDevOpsClient
+from hungovercoders_workflow_doc_gen.cli_utils import validate_against_schema
+from hungovercoders_workflow_doc_gen.formatter import Formatter
+
+SCHEMA = os.path.join(os.path.dirname(__file__), '../../src/hungovercoders_workflow_doc_gen/schemas/okr_summary.json')
+
+pytestmark = pytest.mark.benchmark
+
+
+def fetch(stub, **kwargs):
+    client = AzureDevOpsClient("example", "Project", "pat", api_root=stub.api_root, **kwargs)
+    return client.fetch_and_normalize_okrs_with_relations()
+
+
+def test_client_fetch(bench):
+    """1,000 objectives and 3,000 hypotheses behind 10ms of latency per request."""
+    with AzureDevOpsStub(make_work_items(1_000, children_per_objective=3), latency=0.01) as stub:
+        bench("client.fetch", lambda: fetch(stub, concurrency=4), scale=False)
+
+
+def test_client_fetch_deep_hierarchy(bench):
+    """--depth 4: two levels of Issues below every hypothesis."""
+    items = make_work_items(200, children_per_objective=3, depth=4, children_per_item=2)
+    with AzureDevOpsStub(items, latency=0.01) as stub:
+        client = AzureDevOpsClient("example", "Project", "pat", api_root=stub.api_root, concurrency=4)
+        bench("client.fetch_depth4", lambda: client.fetch_and_normalize_okrs_with_relations(max_depth=4), scale=False)
+
+
+def test_client_fetch_throttled(bench):
+    """Every fifth request is throttled with Retry-After: 0."""
+    with AzureDevOpsStub(make_work_items(1_000, children_per_objective=3), latency=0.01, throttle_every=5) as stub:
+        bench("client.fetch_throttled", lambda: fetch(stub, concurrency=4, batch_size=100), scale=False)
+
+
+def test_validate_against_schema(bench):
+    okr_data = make_okr_data(100_000)
+    bench("validate.100k", lambda: validate_against_schema(okr_data, SCHEMA))
+
+
+@pytest.mark.parametrize("format", ["markdown", "doc"])
+def test_format_text(bench, format):
+    okr_data = make_okr_data(5_000, depth=3)
+    formatter = Formatter()
+    render = formatter.format_markdown if format == "markdown" else formatter.format_doc
+    bench(f"format_{format}.5k", lambda: render(okr_data))
+
+
+@pytest.mark.parametrize("format", ["markdown", "doc"])
+def test_stream_text(bench, format, tmp_path):
+    okr_data = make_okr_data(5_000, depth=3)
+    formatter = Formatter()
+    stream = formatter.stream_markdown if format == "markdown" else formatter.stream_doc
+    bench(f"stream_{format}.5k", lambda: stream(iter(okr_data["objectives"]), str(tmp_path / "out")))
+
+
+def test_format_pdf(bench, tmp_path):
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError) as e:
+        pytest.skip(f"WeasyPrint unavailable: {e}")
+    okr_data = make_okr_data(50)
+    formatter = Formatter()
+    bench("format_pdf.50", lambda: formatter.format_pdf(okr_data, str(tmp_path / "out.pdf")), rounds=2)
+
+
+def run_cli(*args):
+    subprocess.run([sys.executable, "-m", "hungovercoders_workflow_doc_gen", *args], check=True,
+                   stdout=subprocess.DEVNULL)
+
+
+@pytest.mark.parametrize("formats", ["markdown", "markdown,doc,raw-json"])
+def test_json_cli(bench, formats, tmp_path):
+    input_path = write_okr_json(str(tmp_path / "okr.json"), 10_000)
+    bench(f"cli.json.{formats}.10k", lambda: run_cli(
+        "json", "--input", input_path, "--output-dir", str(tmp_path / "out"), "--format", formats, "--no-cache"),
+        rounds=2)
+
+
+def test_azure_devops_cli(bench, tmp_path):
+    with AzureDevOpsStub(make_work_items(1_000, children_per_objective=3), latency=0.01) as stub:
+        bench("cli.azure_devops.markdown", lambda: run_cli(
+            "azure_devops", "--org", "example", "--project", "Project", "--pat", "pat", "--api-root", stub.api_root,
+            "--output-dir", str(tmp_path / "out"), "--format", "markdown", "--no-cache"), rounds=2)
@@ -0,0 +1,52 @@
+"""
+Memory benchmark for the streaming JSON -> Markdown pipeline of the json CLI.
+"""
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from okr_generator import write_okr_json
+
+
+# Runs the CLI, then records the process's own peak RSS. ru_maxrss from wait4() cannot be used: a
+# forked child starts with the parent's high-water mark, which here is the whole pytest process.
+CHILD = """
+import sys
+from hungovercoders_workflow_doc_gen.__main__ import main
+peak_path = sys.argv.pop(1)
+try:
+    main()
+finally:
+    with open("/proc/self/status") as status, open(peak_path, "w") as f:
+        f.write(next(line for line in status if line.startswith("VmHWM:")).split()[1])
+"""
+
+
+def run_json_cli(input_path, output_dir):
+    """Run ``workflow-doc-gen json`` in a child process and return (its peak RSS in MB, seconds)."""
+    peak_path = output_dir + ".peak"
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", CHILD, peak_path, "json", "--input", input_path,
+         "--output-dir", output_dir, "--format", "markdown"],
+        stdout=subprocess.DEVNULL, check=True,
+    )
+    elapsed = time.perf_counter() - started
+    with open(peak_path) as f:
+        # VmHWM is reported in kilobytes
+        return int(f.read()) / 1024, elapsed
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="needs Linux /proc")
+@pytest.mark.benchmark
+def test_streaming_peak_memory_is_flat(tmp_path):
+    """Peak memory converting 100k objectives stays close to the peak for 1k objectives."""
+    peaks = {}
+    for count in (1_000, 100_000):
+        input_path = write_okr_json(str(tmp_path / f"okr_{count}.json"), count)
+        peaks[count], elapsed = run_json_cli(input_path, str(tmp_path / f"out_{count}"))
+        print(f"\n{count:>7} objectives: input {os.path.getsize(input_path) / 1e6:.1f} MB, "
+              f"peak RSS {peaks[count]:.1f} MB, {elapsed:.1f}s")
+    assert peaks[100_000] < peaks[1_000] + 25
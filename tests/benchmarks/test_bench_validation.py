@@ -0,0 +1,38 @@
+"""
+Benchmark of the compiled schema validator against plain jsonschema.validate.
+"""
+import json
+import os
+import time
+
+import jsonschema
+import pytest
+from okr_generator import make_okr_data
+
+from hungovercoders_workflow_doc_gen.validation import SchemaValidator
+
+SCHEMA = os.path.join(os.path.dirname(__file__), '../../src/hungovercoders_workflow_doc_gen/schemas/okr_summary.json')
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+@pytest.mark.benchmark
+def test_compiled_validator_is_faster_than_jsonschema():
+    """100k objectives validate in seconds; the previous jsonschema.validate path is timed on 10k."""
+    with open(SCHEMA, encoding='utf-8') as f:
+        schema = json.load(f)
+    small, large = make_okr_data(10_000), make_okr_data(100_000)
+
+    baseline = timed(lambda: jsonschema.validate(instance=small, schema=schema))
+    validator = SchemaValidator(schema)
+    compiled = timed(lambda: validator.errors(small))
+    whole = timed(lambda: validator.errors(large))
+    streamed = timed(lambda: [list(validator.iter_objective_errors(obj, i)) for i, obj in enumerate(large["objectives"])])
+    print(f"\njsonschema.validate 10k: {baseline:.2f}s, {validator.backend} 10k: {compiled:.2f}s "
+          f"({baseline / compiled:.0f}x), 100k: {whole:.2f}s, 100k per objective: {streamed:.2f}s")
+    assert compiled * 5 < baseline
+    assert whole < 5 and streamed < 5
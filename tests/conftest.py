@@ -0,0 +1,26 @@
+"""
+Shared pytest configuration. Benchmarks are opt-in: run them with ``pytest --run-benchmarks``.
+Benchmarks that record timings compare them with ``tests/benchmarks/baselines.json``; see
+tests/benchmarks/conftest.py.
+"""
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption("--run-benchmarks", action="store_true", default=False,
+                     help="Run the (slow) performance benchmarks marked with @pytest.mark.benchmark")
+    parser.addoption("--benchmark-compare", action="store_true", default=False,
+                     help="Fail benchmarks that are slower than their stored baseline by more than the threshold")
+    parser.addoption("--benchmark-threshold", type=float, default=0.5,
+                     help="Allowed slowdown against the baseline as a fraction (default: 0.5, i.e. 50%%)")
+    parser.addoption("--benchmark-save", action="store_true", default=False,
+                     help="Store the timings of this run as the new baselines")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-benchmarks"):
+        return
+    skip = pytest.mark.skip(reason="benchmark: use --run-benchmarks to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
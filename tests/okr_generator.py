@@ -0,0 +1,96 @@
+"""
+Synthetic okr_summary-shaped data for tests and benchmarks.
+"""
+import json
+
+from hungovercoders_workflow_doc_gen.streaming import write_objectives_json
+
+STATES = ["New", "active", "review", "closed", "Doing", "Done"]
+HYPOTHESIS_STATES = ["New", "proposed", "active", "testing", "closed"]
+
+
+CHILD_TYPES = ["Issue", "Task", "Bug"]
+
+
+def make_children(parent_id, depth, children_per_item, link):
+    """Build the ``children`` of a hypothesis or child work item, ``depth`` levels deep."""
+    children = []
+    for c in range(1, children_per_item + 1):
+        cid = parent_id * 100 + c
+        child = {
+            "id": cid,
+            "title": f"Work item {cid}",
+            "state": STATES[cid % len(STATES)],
+            "work_item_type": CHILD_TYPES[(depth + c) % len(CHILD_TYPES)],
+            "link": f"{link}{cid}",
+        }
+        if depth > 1:
+            child["children"] = make_children(cid, depth - 1, children_per_item, link)
+        children.append(child)
+    return children
+
+
+def make_objective(index, hypotheses_per_objective=3, org="example", project="Project", depth=2,
+                   children_per_item=2, text_size=0):
+    """
+    Build one schema-valid objective with its hypotheses.
+
+    ``depth`` counts levels as the CLI's --depth does: 3 or more adds ``children_per_item`` children
+    below every hypothesis, nested ``depth - 2`` levels deep. ``text_size`` pads the rich-text
+    objective with at least that many characters of HTML paragraphs.
+    """
+    oid = index + 1
+    link = f"https://dev.azure.com/{org}/{project}/_workitems/edit/"
+    paragraph = "<p>Supporting detail for the objective.</p>"
+    padding = paragraph * -(-text_size // len(paragraph))
+    objective = {
+        "id": oid,
+        "title": f"Objective {oid}",
+        "link": f"{link}{oid}",
+        "state": STATES[index % len(STATES)],
+        "objective": f"<div>Deliver outcome <b>{oid}</b> for our customers.{padding}</div>",
+        "key_results": [f"Key result {oid}.{k}" for k in range(1, 4)],
+        "method_of_measure": "Quarterly dashboard review.",
+        "objective_outcome": "" if index % 2 else f"Outcome {oid} achieved.",
+        "hypotheses": [
+            {
+                "id": oid * 1000 + h,
+                "hypothesis": f"If we try idea {h} for objective {oid}, engagement will rise.",
+                "hypothesis_context": "Context for the hypothesis.",
+                "link": f"{link}{oid * 1000 + h}",
+                "title": f"Hypothesis {oid}.{h}",
+                "state": HYPOTHESIS_STATES[(index + h) % len(HYPOTHESIS_STATES)],
+                "method_of_measuring_hypothesis": "A/B test.",
+                "hypothesis_outcome": "",
+            }
+            for h in range(1, hypotheses_per_objective + 1)
+        ],
+    }
+    if depth > 2:
+        for hypothesis in objective["hypotheses"]:
+            hypothesis["children"] = make_children(hypothesis["id"], depth - 2, children_per_item, link)
+    return objective
+
+
+def iter_objectives(count, hypotheses_per_objective=3, **options):
+    """Yield ``count`` synthetic objectives; ``options`` are passed to make_objective."""
+    for index in range(count):
+        yield make_objective(index, hypotheses_per_objective, **options)
+
+
+def make_okr_data(count, hypotheses_per_objective=3, **options):
+    """Return a synthetic ``{"objectives": [...]}`` document."""
+    return {"objectives": list(iter_objectives(count, hypotheses_per_objective, **options))}
+
+
+def write_okr_json(path, count, hypotheses_per_objective=3, indent=True, **options):
+    """Write a synthetic document to ``path`` without holding it in memory."""
+    with open(path, "w", encoding="utf-8") as f:
+        if indent:
+            write_objectives_json(iter_objectives(count, hypotheses_per_objective, **options), f)
+        else:
+            f.write('{"objectives": [')
+            for index, obj in enumerate(iter_objectives(count, hypotheses_per_objective, **options)):
+                f.write(("," if index else "") + json.dumps(obj))
+            f.write("]}")
+    return path
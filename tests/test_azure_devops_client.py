@@ -0,0 +1,172 @@
+"""
+Unit tests for azure_devops_client.py, using recorded responses and a local stub server.
+"""
+import json
+import math
+import os
+import time
+from azure_devops_stub import AzureDevOpsStub, make_work_items
+from hungovercoders_workflow_doc_gen.azure_devops_client import NORMALIZED_FIELDS, AzureDevOpsClient
+from hungovercoders_workflow_doc_gen.cli_utils import utc_timestamp
+
+RECORDING = os.path.join(os.path.dirname(__file__), 'example_input/azure_devops_recording.json')
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.headers = {}
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self._payload
+
+
+class ReplaySession:
+    """Serves WIQL and workitemsbatch calls from the recording and logs every request."""
+    def __init__(self, recording):
+        self.recording = recording
+        self.items = {item["id"]: item for item in recording["workItems"]}
+        self.calls = []
+
+    def request(self, method, url, json=None, **kwargs):
+        self.calls.append((method, url, json))
+        if method != "POST":
+            return FakeResponse({"message": "not recorded"}, 404)
+        if "wit/wiql" in url:
+            if "FROM WorkItemLinks" in json["query"]:
+                return FakeResponse(self.recording["hierarchy"])
+            return FakeResponse(self.recording["wiql"])
+        if "wit/workitemsbatch" in url:
+            value = []
+            for i in json["ids"]:
+                item = dict(self.items[i])
+                if json.get("fields"):
+                    item["fields"] = {f: v for f, v in item["fields"].items() if f in json["fields"]}
+                if json.get("$expand") != "Relations":
+                    item.pop("relations", None)
+                value.append(item)
+            return FakeResponse({"count": len(value), "value": value})
+        return FakeResponse({"message": "not recorded"}, 404)
+
+
+def make_client():
+    with open(RECORDING, encoding='utf-8') as f:
+        recording = json.load(f)
+    client = AzureDevOpsClient("example", "Project", "pat")
+    client.session = client.transport.session = ReplaySession(recording)
+    return client
+
+
+def test_fetch_and_normalize_uses_batched_requests():
+    """One hierarchy WIQL call and one projected batch for objectives and children together."""
+    client = make_client()
+    data = client.fetch_and_normalize_okrs_with_relations()
+    assert len(client.session.calls) == 2
+    assert "FROM WorkItemLinks" in client.session.calls[0][2]["query"]
+    assert "$expand" not in client.session.calls[1][2]
+    assert "Custom.Hypothesis" in client.session.calls[1][2]["fields"]
+    assert [obj["id"] for obj in data["objectives"]] == [1, 2, 3]
+    assert [h["id"] for h in data["objectives"][0]["hypotheses"]] == [101, 102]
+    assert data["objectives"][0]["key_results"] == ["KR one", "KR two"]
+    assert data["objectives"][1]["hypotheses"][0]["link"] == "https://dev.azure.com/example/Project/_workitems/edit/201"
+
+
+def test_fetch_work_items_chunks_large_id_lists():
+    """IDs are requested in chunks of at most 200 and returned in request order."""
+    client = make_client()
+    ids = list(range(1000, 1450))
+    client.session.items.update({i: {"id": i, "fields": {"System.Id": i}} for i in ids})
+    items = client.fetch_work_items(list(reversed(ids)))
+    assert [len(call[2]["ids"]) for call in client.session.calls] == [200, 200, 50]
+    assert [item["id"] for item in items] == list(reversed(ids))
+
+
+def test_concurrent_fetch_against_stub_server():
+    """Concurrent batches stay within the in-flight limit and keep WIQL order."""
+    with AzureDevOpsStub(make_work_items(40, children_per_objective=1), latency=0.05) as stub:
+        client = AzureDevOpsClient("example", "Project", "pat", concurrency=4, batch_size=5,
+                                   api_root=stub.api_root)
+        started = time.perf_counter()
+        data = client.fetch_and_normalize_okrs_with_relations()
+        elapsed = time.perf_counter() - started
+    assert [obj["id"] for obj in data["objectives"]] == list(range(1, 41))
+    assert [obj["hypotheses"][0]["id"] for obj in data["objectives"]] == list(range(41, 81))
+    assert 1 < stub.max_in_flight <= 4
+    # 1 WIQL + 16 batches of objectives and children; serially this is ~17 * latency
+    assert len(stub.requests) == 17
+    assert elapsed < 17 * 0.05
+
+
+def test_throttled_batches_are_retried_not_dropped():
+    """429 responses with Retry-After are retried, so no objective goes missing."""
+    with AzureDevOpsStub(make_work_items(6), throttle_first=3, retry_after=0) as stub:
+        client = AzureDevOpsClient("example", "Project", "pat", batch_size=4, api_root=stub.api_root)
+        data = client.fetch_and_normalize_okrs_with_relations()
+    assert [obj["id"] for obj in data["objectives"]] == [1, 2, 3, 4, 5, 6]
+    assert all(len(obj["hypotheses"]) == 2 for obj in data["objectives"])
+    assert client.transport.stats.throttled_responses == 3
+    assert client.transport.stats.retries == 3
+
+
+def test_incremental_sync_merges_changes_moves_and_deletes():
+    """Only changed items are re-fetched and the merged document matches a full export."""
+    with AzureDevOpsStub(make_work_items(4)) as stub:
+        client = AzureDevOpsClient("example", "Project", "pat", api_root=stub.api_root)
+        previous = client.fetch_and_normalize_okrs_with_relations()
+        since = utc_timestamp()
+        time.sleep(0.01)
+
+        stub.bump_revision(5, **{"System.Title": "Edited"})  # child of 1, parent untouched
+        stub.move(8, 3)                                       # child of 2 moves to 3
+        stub.delete(10)                                       # child of 3 deleted
+        stub.work_items[101] = {"id": 101, "fields": {"System.Id": 101, "System.WorkItemType": "Objective",
+                                                      "System.Title": "New", "System.State": "New"}}
+        stub.bump_revision(101)                               # new objective without children
+
+        stub.requests.clear()
+        merged = client.fetch_and_normalize_okrs_incremental(previous, since)
+        request_count = len(stub.requests)
+        full = client.fetch_and_normalize_okrs_with_relations()
+
+    assert merged == full
+    assert [obj["id"] for obj in merged["objectives"]] == [1, 2, 3, 4, 101]
+    assert merged["objectives"][0]["hypotheses"][0]["title"] == "Edited"
+    assert [h["id"] for h in merged["objectives"][1]["hypotheses"]] == [7]
+    assert [h["id"] for h in merged["objectives"][2]["hypotheses"]] == [9, 8]
+    # 3 WIQL + recycle bin + objective batch (2, 3, 101) + child batch for 2/3 + edited child
+    assert request_count == 7
+
+
+def test_hierarchy_loader_supports_deeper_trees():
+    """With max_depth=3 grandchildren are attached to their hypothesis as children."""
+    items = make_work_items(2, children_per_objective=1)
+    items[10] = {"id": 10, "rev": 1, "fields": {"System.Id": 10, "System.WorkItemType": "Issue",
+                                                "System.Title": "Fix it", "System.State": "Doing"}}
+    items[3]["relations"] = [{"rel": "System.LinkTypes.Hierarchy-Forward", "url": "http://stub/_apis/wit/workItems/10"}]
+    with AzureDevOpsStub(items) as stub:
+        client = AzureDevOpsClient("example", "Project", "pat", api_root=stub.api_root)
+        shallow = client.fetch_and_normalize_okrs_with_relations()
+        deep = client.fetch_and_normalize_okrs_with_relations(max_depth=3)
+    assert "children" not in shallow["objectives"][0]["hypotheses"][0]
+    assert deep["objectives"][0]["hypotheses"][0]["children"] == [{
+        "id": 10, "title": "Fix it", "state": "Doing", "work_item_type": "Issue",
+        "link": "https://dev.azure.com/example/Project/_workitems/edit/10",
+    }]
+    assert deep["objectives"][1]["hypotheses"][0]["children"] == []
+
+
+def test_rejected_field_list_falls_back_to_all_fields():
+    """A process without one of the Custom.* fields still exports, fetching every field instead."""
+    items = make_work_items(30)
+    with AzureDevOpsStub(items) as stub:
+        expected = AzureDevOpsClient("example", "Project", "pat", api_root=stub.api_root).fetch_and_normalize_okrs_with_relations()
+    known = [f for f in NORMALIZED_FIELDS if f != "Custom.HypothesisContext"] + ["System.Parent"]
+    with AzureDevOpsStub(items, known_fields=known) as stub:
+        client = AzureDevOpsClient("example", "Project", "pat", api_root=stub.api_root, batch_size=20)
+        data = client.fetch_and_normalize_okrs_with_relations()
+    assert data == expected
+    batches = [path for method, path in stub.requests if "workitemsbatch" in path]
+    # One rejected projection, then every batch is fetched without it.
+    assert len(batches) == math.ceil(len(items) / 20) + 1
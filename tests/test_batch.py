@@ -0,0 +1,107 @@
+"""
+Unit tests for batch.py
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+from okr_generator import write_okr_json
+
+from hungovercoders_workflow_doc_gen.batch import MANIFEST_NAME, find_inputs, run_batch
+
+SCHEMA = os.path.join(os.path.dirname(__file__), '../src/hungovercoders_workflow_doc_gen/schemas/okr_summary.json')
+
+
+def make_inputs(root):
+    os.makedirs(root / "teams" / "a")
+    os.makedirs(root / "teams" / "b")
+    write_okr_json(str(root / "teams" / "a" / "okr.json"), 2)
+    write_okr_json(str(root / "teams" / "b" / "okr.json"), 3)
+    write_okr_json(str(root / "teams" / "platform.json"), 1)
+
+
+def test_output_names_are_unique_per_input(tmp_path):
+    make_inputs(tmp_path)
+    names = [name for _, name in find_inputs(str(tmp_path / "teams"))]
+    assert names == ["a__okr", "b__okr", "platform"]
+    assert [name for _, name in find_inputs(str(tmp_path / "teams" / "*" / "okr.json"))] == ["a__okr", "b__okr"]
+
+
+def test_output_names_keep_the_extension_when_stems_collide(tmp_path):
+    make_inputs(tmp_path)
+    shutil.copyfile(tmp_path / "teams" / "platform.json", tmp_path / "teams" / "platform.ndjson")
+    names = [name for _, name in find_inputs(str(tmp_path / "teams"))]
+    assert names == ["a__okr", "b__okr", "platform.json", "platform.ndjson"]
+
+
+def test_batch_ignores_its_own_outputs(tmp_path, capsys):
+    make_inputs(tmp_path)
+    out = str(tmp_path / "teams" / "out")
+    for _ in range(2):
+        assert run_batch(str(tmp_path / "teams"), out, ["raw-json", "ndjson"], SCHEMA, workers=2) == 0
+    assert "Converted 0 of 3 OKR files (3 unchanged, 0 failed)" in capsys.readouterr().out
+    assert [name for _, name in find_inputs(str(tmp_path / "teams"), exclude_dir=out)] == ["a__okr", "b__okr", "platform"]
+
+
+def test_batch_skips_unchanged_inputs(tmp_path, capsys):
+    make_inputs(tmp_path)
+    out = str(tmp_path / "out")
+    assert run_batch(str(tmp_path / "teams"), out, ["markdown", "raw-json"], SCHEMA, workers=2) == 0
+    assert "Converted 3 of 3 OKR files (0 unchanged, 0 failed)" in capsys.readouterr().out
+    assert sorted(os.listdir(out)) == [MANIFEST_NAME, "a__okr.json", "a__okr.md", "b__okr.json", "b__okr.md",
+                                       "platform.json", "platform.md"]
+
+    write_okr_json(str(tmp_path / "teams" / "platform.json"), 4)
+    run_batch(str(tmp_path / "teams"), out, ["markdown", "raw-json"], SCHEMA, workers=2)
+    assert "Converted 1 of 3 OKR files (2 unchanged, 0 failed)" in capsys.readouterr().out
+    with open(os.path.join(out, "platform.json"), encoding="utf-8") as f:
+        assert len(json.load(f)["objectives"]) == 4
+
+    run_batch(str(tmp_path / "teams"), out, ["markdown"], SCHEMA, workers=2)
+    assert "Converted 3 of 3 OKR files (0 unchanged, 0 failed)" in capsys.readouterr().out
+
+
+def test_batch_reports_invalid_inputs(tmp_path, capsys):
+    make_inputs(tmp_path)
+    with open(tmp_path / "teams" / "broken.json", "w", encoding="utf-8") as f:
+        json.dump({"objectives": [{"title": "No state"}]}, f)
+    out = str(tmp_path / "out")
+    assert run_batch(str(tmp_path / "teams"), out, ["markdown"], SCHEMA, workers=2) == 1
+    assert "Converted 3 of 4 OKR files (0 unchanged, 1 failed)" in capsys.readouterr().out
+    assert not os.path.exists(os.path.join(out, "broken.md"))
+
+
+def test_batch_reports_malformed_inputs(tmp_path, caplog):
+    make_inputs(tmp_path)
+    (tmp_path / "teams" / "items.json").write_text('{"items": []}', encoding="utf-8")
+    (tmp_path / "teams" / "truncated.json").write_text('{"objectives": [{"id": 1, "title"', encoding="utf-8")
+    assert run_batch(str(tmp_path / "teams"), str(tmp_path / "out"), ["markdown"], SCHEMA, workers=2) == 2
+    assert "items.json is not a valid OKR document: JSON document has no top-level 'objectives' array" in caplog.text
+    assert "truncated.json is not a valid OKR document" in caplog.text
+
+
+@pytest.mark.parametrize("document, message", [
+    ('{"items": []}', "no top-level 'objectives' array"),
+    ('{"objectives": [{"id": 1,\n "title"', "line 2 column 9 (char 34)"),
+])
+@pytest.mark.parametrize("formats", ["markdown", "markdown,raw-json"])
+def test_json_cli_reports_malformed_input(tmp_path, document, message, formats):
+    input_path = tmp_path / "okr.json"
+    input_path.write_text(document, encoding="utf-8")
+    result = subprocess.run([sys.executable, "-m", "hungovercoders_workflow_doc_gen", "json", "--input", str(input_path),
+                             "--output-dir", str(tmp_path / "out"), "--format", formats, "--no-cache"],
+                            capture_output=True, text=True)
+    assert result.returncode == 1
+    assert f"Failed to read {input_path}" in result.stderr and message in result.stderr
+    assert "Traceback" not in result.stderr
+
+
+def test_json_cli_rejects_input_that_matches_nothing(tmp_path):
+    result = subprocess.run([sys.executable, "-m", "hungovercoders_workflow_doc_gen", "json",
+                             "--input", str(tmp_path / "typo.json"), "--output-dir", str(tmp_path / "out")],
+                            capture_output=True, text=True)
+    assert result.returncode == 2
+    assert "typo.json is not a file" in result.stderr
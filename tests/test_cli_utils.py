@@ -0,0 +1,117 @@
+"""
+Unit tests for cli_utils.py
+"""
+import argparse
+import json
+import os
+import pytest
+from hungovercoders_workflow_doc_gen.cli_utils import (
+    load_sync_state, save_sync_state, parse_formats, write_reports, ReportError
+)
+from hungovercoders_workflow_doc_gen.formatter import Formatter
+from hungovercoders_workflow_doc_gen.render_cache import RenderCache
+from okr_generator import make_okr_data
+
+FORMATS = ["markdown", "doc", "pdf", "raw-json"]
+
+
+def test_sync_state_round_trip(tmp_path):
+    state_file = os.path.join(tmp_path, "state", "okr_summary.state.json")
+    assert load_sync_state(state_file, "org", "proj") is None
+    okr_data = {"objectives": [{"id": 1, "title": "T", "state": "New", "objective": "", "key_results": []}]}
+    save_sync_state(state_file, "org", "proj", "2025-06-21T08:00:00.000Z", okr_data)
+    state = load_sync_state(state_file, "org", "proj")
+    assert state["watermark"] == "2025-06-21T08:00:00.000Z"
+    assert state["okr_data"] == okr_data
+    assert load_sync_state(state_file, "org", "other-project") is None
+
+
+def test_parse_formats():
+    assert parse_formats("pdf, markdown,pdf", FORMATS) == ["pdf", "markdown"]
+    assert parse_formats("all", FORMATS) == FORMATS
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_formats("markdown,docx", FORMATS)
+
+
+class RecordingFormatter(Formatter):
+    """Counts HTML renders and records the HTML handed to the PDF writer."""
+    def __init__(self):
+        super().__init__()
+        self.doc_renders = 0
+        self.pdf_html = None
+
+    def format_doc(self, okr_data, index=None):
+        self.doc_renders += 1
+        return super().format_doc(okr_data, index)
+
+    def format_pdf(self, okr_data, output_path, html=None, index=None):
+        self.pdf_html = html
+        with open(output_path, "w") as f:
+            f.write("pdf")
+        return True
+
+
+def test_write_reports_renders_doc_html_once(tmp_path):
+    okr_data = make_okr_data(3)
+    formatter = RecordingFormatter()
+    paths = write_reports(formatter, okr_data, FORMATS, str(tmp_path))
+    assert list(paths) == FORMATS
+    assert all(os.path.exists(path) for path in paths.values())
+    assert formatter.doc_renders == 1
+    with open(paths["doc"], encoding="utf-8") as f:
+        assert f.read() == formatter.pdf_html
+    with open(paths["raw-json"], encoding="utf-8") as f:
+        assert json.load(f) == okr_data
+    with open(paths["markdown"], encoding="utf-8") as f:
+        assert f.read() == formatter.format_markdown(okr_data)
+
+
+class FailingPdfFormatter(Formatter):
+    """Fails every PDF render, as when WeasyPrint cannot load its libraries."""
+    def format_pdf(self, okr_data, output_path, html=None, index=None):
+        return False
+
+
+def test_write_reports_does_not_cache_failed_renders(tmp_path):
+    okr_data = make_okr_data(3)
+    output_dir = str(tmp_path / "out")
+    os.makedirs(output_dir)
+    stale_pdf = os.path.join(output_dir, "okr_summary.pdf")
+    with open(stale_pdf, "w") as f:
+        f.write("stale")
+    render_cache = RenderCache(str(tmp_path / "renders"))
+    with pytest.raises(ReportError):
+        write_reports(FailingPdfFormatter(), okr_data, ["markdown", "pdf"], output_dir, render_cache=render_cache)
+    assert os.path.exists(os.path.join(output_dir, "okr_summary.md"))
+    assert not os.path.exists(stale_pdf + ".tmp")
+
+    # The stale PDF was not stored under the new key, so it is not restored once deleted.
+    os.remove(stale_pdf)
+    with pytest.raises(ReportError):
+        write_reports(FailingPdfFormatter(), okr_data, ["pdf"], output_dir, render_cache=render_cache)
+    assert not os.path.exists(stale_pdf)
+
+
+class CountingMarkdownFormatter(Formatter):
+    def __init__(self):
+        super().__init__()
+        self.markdown_renders = 0
+
+    def format_markdown(self, okr_data, index=None):
+        self.markdown_renders += 1
+        return super().format_markdown(okr_data, index)
+
+
+def test_reports_with_the_current_time_are_not_cached(tmp_path, monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    okr_data = make_okr_data(3)
+    render_cache = RenderCache(str(tmp_path / "renders"))
+    formatter = CountingMarkdownFormatter()
+    for _ in range(2):
+        paths = write_reports(formatter, okr_data, ["markdown", "raw-json"], str(tmp_path / "out"),
+                              render_cache=render_cache)
+    # The Markdown header shows the time of each run; the raw JSON is still restored from the cache.
+    assert formatter.markdown_renders == 2
+    with open(paths["raw-json"], encoding="utf-8") as f:
+        assert json.load(f) == okr_data
+    assert render_cache.hits == 1
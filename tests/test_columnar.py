@@ -0,0 +1,125 @@
+"""
+Unit tests for columnar.py and NDJSON input and output.
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from okr_generator import make_okr_data, write_okr_json
+
+from hungovercoders_workflow_doc_gen.batch import find_inputs
+from hungovercoders_workflow_doc_gen.columnar import hypotheses_path, write_tables
+from hungovercoders_workflow_doc_gen.model import Objective
+from hungovercoders_workflow_doc_gen.streaming import is_ndjson, iter_input_objectives, write_objectives_ndjson
+
+
+def run_cli(*args):
+    subprocess.run([sys.executable, "-m", "hungovercoders_workflow_doc_gen", "json", *args, "--no-cache"],
+                   check=True, stdout=subprocess.DEVNULL)
+
+
+def test_ndjson_round_trip_and_detection():
+    objectives = make_okr_data(3)["objectives"]
+    f = io.StringIO()
+    assert write_objectives_ndjson([Objective.from_dict(obj) for obj in objectives], f) == 3
+    assert len(f.getvalue().splitlines()) == 3
+    f.seek(0)
+    assert is_ndjson(f) and f.tell() == 0
+    assert list(iter_input_objectives(f)) == objectives
+    for document in (json.dumps({"objectives": objectives}), json.dumps({"objectives": objectives}, indent=2)):
+        f = io.StringIO(document)
+        assert not is_ndjson(f)
+        assert list(iter_input_objectives(f)) == objectives
+
+
+class CountingStringIO(io.StringIO):
+    """Records how many characters have been read."""
+    read_chars = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.read_chars += len(data)
+        return data
+
+    def readline(self, size=-1):
+        data = super().readline(size)
+        self.read_chars += len(data)
+        return data
+
+
+def test_ndjson_detection_reads_only_a_prefix(tmp_path):
+    compact = CountingStringIO(json.dumps({"objectives": make_okr_data(500)["objectives"]}))
+    assert not is_ndjson(compact)
+    assert compact.read_chars <= 8192 < len(compact.getvalue())
+    # A one-line document without objectives is still a document, reported by the schema.
+    assert not is_ndjson(io.StringIO('{"items": []}'))
+    ndjson_path = tmp_path / "okr.jsonl"
+    ndjson_path.write_text('{"custom": 1}\n', encoding="utf-8")
+    with open(ndjson_path, encoding="utf-8") as f:
+        assert is_ndjson(f)
+
+
+def test_json_cli_reads_and_writes_ndjson(tmp_path):
+    input_path = write_okr_json(str(tmp_path / "okr.json"), 5)
+    run_cli("--input", input_path, "--output-dir", str(tmp_path / "a"), "--format", "ndjson,markdown")
+    ndjson_path = str(tmp_path / "a" / "okr_summary.ndjson")
+    # NDJSON input gives the same report as the JSON document it came from, streamed or not.
+    run_cli("--input", ndjson_path, "--output-dir", str(tmp_path / "b"), "--format", "markdown")
+    run_cli("--input", ndjson_path, "--output-dir", str(tmp_path / "c"), "--format", "markdown,raw-json")
+    reports = []
+    for directory in "abc":
+        with open(tmp_path / directory / "okr_summary.md", encoding="utf-8") as f:
+            reports.append([line for line in f if "Generated on" not in line])
+    assert reports[0] == reports[1] == reports[2]
+    os.rename(ndjson_path, tmp_path / "a" / "more.jsonl")
+    assert [name for _, name in find_inputs(str(tmp_path / "a"))] == ["more"]
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_columnar_tables(tmp_path, format):
+    pa = pytest.importorskip("pyarrow")
+    objectives = make_okr_data(25, hypotheses_per_objective=2)["objectives"]
+    objectives_path = str(tmp_path / f"okr.objectives.{format}")
+    counts = write_tables(iter(objectives), format, objectives_path, hypotheses_path(objectives_path), batch_size=10)
+    assert counts == (25, 50)
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        read = pq.read_table
+    else:
+        def read(path):
+            return pa.ipc.open_file(path).read_all()
+    objective_table = read(objectives_path)
+    hypothesis_table = read(str(tmp_path / f"okr.hypotheses.{format}"))
+    assert objective_table.column("id").to_pylist() == [str(obj["id"]) for obj in objectives]
+    assert objective_table.column("key_results").to_pylist()[0] == objectives[0]["key_results"]
+    assert set(objective_table.column("hypothesis_count").to_pylist()) == {2}
+    assert hypothesis_table.num_rows == 50
+    assert hypothesis_table.column("objective_id").to_pylist()[:2] == ["1", "1"]
+
+
+def test_json_cli_writes_columnar_tables(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    input_path = write_okr_json(str(tmp_path / "okr.json"), 12)
+    for formats in ("parquet", "parquet,markdown"):
+        output_dir = tmp_path / formats
+        run_cli("--input", input_path, "--output-dir", str(output_dir), "--format", formats, "--filter", "state=Done")
+        assert pq.read_table(output_dir / "okr_summary.objectives.parquet").column("state").to_pylist() == ["Done", "Done"]
+        assert pq.read_table(output_dir / "okr_summary.hypotheses.parquet").num_rows == 6
+
+
+def test_columnar_tables_accept_string_ids(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    objectives = make_okr_data(3)["objectives"]
+    objectives[0]["id"] = "OKR-1"
+    objectives[0]["hypotheses"][0]["id"] = "HYP-1"
+    objectives_path = str(tmp_path / "okr.objectives.parquet")
+    write_tables(objectives, "parquet", objectives_path, hypotheses_path(objectives_path), batch_size=1)
+    assert pq.read_table(objectives_path).column("id").to_pylist() == ["OKR-1", "2", "3"]
+    hypotheses = pq.read_table(hypotheses_path(objectives_path))
+    assert hypotheses.column("objective_id").to_pylist()[0] == "OKR-1"
+    assert hypotheses.column("id").to_pylist()[0] == "HYP-1"
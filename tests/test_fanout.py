@@ -0,0 +1,86 @@
+"""
+Unit tests for fanout.py
+"""
+import json
+import os
+
+import pytest
+from azure_devops_stub import AzureDevOpsStub, make_work_items
+
+from hungovercoders_workflow_doc_gen import fanout
+from hungovercoders_workflow_doc_gen.cli_utils import ReportError
+from hungovercoders_workflow_doc_gen.fanout import (
+    SUMMARY_NAME, FanoutConfig, OrganizationSettings, ProjectTarget, interleave_by_organization,
+    load_fanout_config, run_fanout,
+)
+
+SCHEMA = os.path.join(os.path.dirname(__file__), '../src/hungovercoders_workflow_doc_gen/schemas/okr_summary.json')
+
+
+def test_load_fanout_config(tmp_path):
+    path = tmp_path / "projects.json"
+    path.write_text(json.dumps({
+        "organizations": {"a": {"max_in_flight": 2, "pat_env": "A_PAT"}},
+        "projects": [{"organization": "a", "project": "Web"}, {"organization": "b", "project": "Data", "depth": 3}],
+    }))
+    config = load_fanout_config(str(path))
+    assert config.projects == [ProjectTarget("a", "Web"), ProjectTarget("b", "Data", depth=3)]
+    assert config.organizations["a"].max_in_flight == 2 and config.organizations["b"].max_in_flight == 8
+    path.write_text(json.dumps({"projects": [{"organization": "a", "project": "Web", "colour": "red"}]}))
+    with pytest.raises(ValueError):
+        load_fanout_config(str(path))
+
+
+def test_projects_are_interleaved_by_organization():
+    projects = [ProjectTarget("a", "1"), ProjectTarget("a", "2"), ProjectTarget("a", "3"), ProjectTarget("b", "1")]
+    assert [(t.organization, t.project) for t in interleave_by_organization(projects)] == [
+        ("a", "1"), ("b", "1"), ("a", "2"), ("a", "3")]
+
+
+def test_fanout_writes_project_reports_and_rollup(tmp_path):
+    with AzureDevOpsStub(make_work_items(3), latency=0.01) as stub_a, AzureDevOpsStub(make_work_items(2)) as stub_b:
+        config = FanoutConfig(
+            organizations={
+                "a": OrganizationSettings("a", api_root=stub_a.api_root, max_in_flight=2),
+                "b": OrganizationSettings("b", api_root=stub_b.api_root),
+                # Nothing listens here: the project fails without holding up the others.
+                "down": OrganizationSettings("down", api_root="http://127.0.0.1:9"),
+            },
+            projects=[ProjectTarget("a", "Web"), ProjectTarget("a", "Mobile"), ProjectTarget("b", "Data"),
+                      ProjectTarget("down", "Lost")],
+        )
+        failed = run_fanout(config, str(tmp_path), ["markdown", "raw-json"], SCHEMA, pat="pat", jobs=4,
+                            concurrency=4, max_retries=0)
+    assert failed == 1
+    assert stub_a.max_in_flight <= 2
+    assert os.path.exists(tmp_path / "a" / "Web" / "okr_summary.md")
+    with open(tmp_path / "b" / "Data" / "okr_summary.json", encoding="utf-8") as f:
+        assert len(json.load(f)["objectives"]) == 2
+    with open(tmp_path / "okr_rollup.json", encoding="utf-8") as f:
+        assert len(json.load(f)["objectives"]) == 8
+    with open(tmp_path / SUMMARY_NAME, encoding="utf-8") as f:
+        summary = json.load(f)
+    assert [(p["project"], p["status"], p["objectives"]) for p in summary["projects"]] == [
+        ("Web", "ok", 3), ("Mobile", "ok", 3), ("Data", "ok", 2), ("Lost", "failed", 0)]
+    assert summary["organizations"]["a"]["requests"] > 0
+    assert summary["rollup"]["markdown"].endswith("okr_rollup.md")
+    assert summary["rollup_error"] is None
+
+
+def test_failed_rollup_is_recorded_in_the_summary(tmp_path, monkeypatch):
+    write_reports = fanout.write_reports
+
+    def failing_rollup(*args, name="okr_summary", **kwargs):
+        if name == "okr_rollup":
+            raise ReportError("Failed to render the Markdown report")
+        return write_reports(*args, name=name, **kwargs)
+
+    monkeypatch.setattr(fanout, "write_reports", failing_rollup)
+    with AzureDevOpsStub(make_work_items(2)) as stub:
+        config = FanoutConfig(organizations={"a": OrganizationSettings("a", api_root=stub.api_root)},
+                              projects=[ProjectTarget("a", "Web")])
+        assert run_fanout(config, str(tmp_path), ["markdown"], SCHEMA, pat="pat", max_retries=0) == 1
+    with open(tmp_path / SUMMARY_NAME, encoding="utf-8") as f:
+        summary = json.load(f)
+    assert summary["projects"][0]["status"] == "ok"
+    assert summary["rollup"] == {} and summary["rollup_error"] == "Failed to render the Markdown report"
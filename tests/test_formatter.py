@@ -0,0 +1,58 @@
+"""
+Unit tests for formatter.py
+"""
+import json
+import os
+
+from hungovercoders_workflow_doc_gen.formatter import Formatter, compile_templates
+
+EXAMPLE_JSON = os.path.join(os.path.dirname(__file__), 'example_input/okr_summary.example.json')
+
+
+def load_example():
+    with open(EXAMPLE_JSON, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def without_timestamp(text):
+    return [line for line in text.splitlines() if "Generated on" not in line]
+
+
+def test_formatters_share_compiled_templates():
+    """Templates are compiled once per process, not once per Formatter."""
+    first, second = Formatter(), Formatter()
+    assert first.env is second.env
+    assert first.get_template('okr_markdown_template.j2') is second.get_template('okr_markdown_template.j2')
+
+
+def test_render_many_matches_individual_formats():
+    data = load_example()
+    formatter = Formatter()
+    rendered = formatter.render_many(["markdown", "doc"], data)
+    assert without_timestamp(rendered["markdown"]) == without_timestamp(formatter.format_markdown(data))
+    assert without_timestamp(rendered["doc"]) == without_timestamp(formatter.format_doc(data))
+
+
+def test_precompiled_templates_and_bytecode_cache(tmp_path):
+    """Ahead-of-time compiled templates render the same output; the bytecode cache is written to disk."""
+    data = load_example()
+    compiled_dir = str(tmp_path / "compiled")
+    compile_templates(compiled_dir)
+    precompiled = Formatter(compiled_templates_dir=compiled_dir)
+    assert precompiled.get_template('okr_doc_template.j2').filename.startswith(compiled_dir)
+    assert without_timestamp(precompiled.format_doc(data)) == without_timestamp(Formatter().format_doc(data))
+
+    bytecode_dir = str(tmp_path / "bytecode")
+    Formatter(bytecode_cache_dir=bytecode_dir).format_markdown(data)
+    assert os.listdir(bytecode_dir)
+
+
+def test_pdf_chunks_only_repeat_objectives():
+    """Only the first PDF shard carries the report header; every shard renders its own objectives."""
+    objectives = load_example()["objectives"]
+    formatter = Formatter()
+    first = formatter.render_pdf_chunk_html(objectives[:1], include_header=True)
+    rest = formatter.render_pdf_chunk_html(objectives[1:], include_header=False)
+    assert "Objectives and Key Results" in first and "Objectives and Key Results" not in rest
+    assert first.count('class="objective"') + rest.count('class="objective"') == len(objectives)
+    assert without_timestamp(formatter.render_pdf_chunk_html(objectives)) == without_timestamp(formatter.format_doc(objectives))
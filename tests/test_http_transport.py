@@ -0,0 +1,131 @@
+"""
+Unit tests for http_transport.py
+"""
+import threading
+
+import pytest
+import requests
+from hungovercoders_workflow_doc_gen.http_transport import RetryingTransport
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class ScriptedSession:
+    """Returns (or raises) the scripted outcomes in order."""
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_transport(outcomes, **kwargs):
+    clock = FakeClock()
+    transport = RetryingTransport(ScriptedSession(outcomes), sleep=clock.sleep, clock=clock.time, **kwargs)
+    return transport, clock
+
+
+def test_retry_after_header_is_honoured():
+    transport, clock = make_transport([FakeResponse(429, {"Retry-After": "7"}), FakeResponse(200)])
+    resp = transport.request("GET", "http://example")
+    assert resp.status_code == 200
+    assert clock.sleeps == [7.0]
+    assert transport.stats.retries == 1
+    assert transport.stats.throttled_responses == 1
+    assert transport.stats.retry_delay_seconds == 7.0
+
+
+def test_backoff_is_exponential_and_capped():
+    outcomes = [FakeResponse(503)] * 4 + [FakeResponse(200)]
+    transport, clock = make_transport(outcomes, backoff_base=1.0, backoff_max=3.0)
+    transport.request("GET", "http://example")
+    assert [s <= limit for s, limit in zip(clock.sleeps, [1.0, 2.0, 3.0, 3.0])] == [True] * 4
+
+
+def test_gives_up_after_max_retries():
+    transport, _ = make_transport([FakeResponse(500)] * 3, max_retries=2)
+    assert transport.request("GET", "http://example").status_code == 500
+    assert transport.session.calls == 3
+
+
+def test_connection_errors_are_retried_then_raised():
+    error = requests.ConnectionError("boom")
+    transport, _ = make_transport([error, FakeResponse(200)])
+    assert transport.request("GET", "http://example").status_code == 200
+    transport, _ = make_transport([error, error], max_retries=1)
+    with pytest.raises(requests.ConnectionError):
+        transport.request("GET", "http://example")
+
+
+def test_low_remaining_budget_paces_next_request():
+    transport, clock = make_transport([FakeResponse(200), FakeResponse(200)])
+    headers = {"X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "5",
+               "X-RateLimit-Reset": str(clock.now + 50)}
+    transport.session.outcomes[0].headers = headers
+    transport.request("GET", "http://example")
+    assert clock.sleeps == []
+    transport.request("GET", "http://example")
+    assert clock.sleeps == [10.0]
+    assert transport.stats.pacing_delay_seconds == 10.0
+
+
+def test_max_requests_per_second_spaces_out_requests():
+    transport, clock = make_transport([FakeResponse(200)] * 3, max_requests_per_second=4)
+    for _ in range(3):
+        transport.request("GET", "http://example")
+    assert clock.sleeps == [0.25, 0.25]
+    assert transport.stats.pacing_delay_seconds == 0.5
+
+
+class TimedSession(ScriptedSession):
+    """Also records the clock time of every request."""
+    def __init__(self, outcomes, clock):
+        super().__init__(outcomes)
+        self.clock = clock
+        self.times = []
+
+    def request(self, method, url, **kwargs):
+        self.times.append(self.clock.now)
+        return super().request(method, url, **kwargs)
+
+
+def test_retry_after_holds_back_other_threads():
+    clock = FakeClock()
+    session = TimedSession([FakeResponse(429, {"Retry-After": "7"}), FakeResponse(200), FakeResponse(200)], clock)
+    other = []
+
+    def sleep(seconds):
+        if not other:
+            # While the throttled thread waits, a second thread sends its own request.
+            other.append(threading.Thread(target=transport.request, args=("GET", "http://example/other")))
+            other[0].start()
+            other[0].join()
+        clock.sleep(seconds)
+
+    transport = RetryingTransport(session, sleep=sleep, clock=clock.time)
+    assert transport.request("GET", "http://example").status_code == 200
+    start = session.times[0]
+    assert session.times == [start, start + 7.0, start + 14.0]
+    assert transport.stats.pacing_delay_seconds == 7.0
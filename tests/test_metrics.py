@@ -0,0 +1,89 @@
+"""
+Unit tests for metrics.py and the instrumentation of the pipeline.
+"""
+import json
+import pstats
+import sys
+import time
+
+import pytest
+from azure_devops_stub import AzureDevOpsStub, make_work_items
+
+from hungovercoders_workflow_doc_gen.azure_devops_client import AzureDevOpsClient
+from hungovercoders_workflow_doc_gen.metrics import Metrics, get_metrics, profile_run
+from hungovercoders_workflow_doc_gen.work_item_cache import WorkItemCache
+
+
+def test_self_time_excludes_nested_stages():
+    metrics = Metrics()
+    with metrics.stage("render"):
+        time.sleep(0.02)
+        with metrics.stage("fetch"):
+            time.sleep(0.05)
+        metrics.add_nested_time("validate", 0.01, calls=3)
+    stages = metrics.report()["stages"]
+    assert stages["render"]["seconds"] >= 0.07
+    assert 0.01 <= stages["render"]["self_seconds"] < 0.05
+    assert stages["fetch"]["self_seconds"] == stages["fetch"]["seconds"]
+    assert stages["validate"] == {"calls": 3, "seconds": 0.01, "self_seconds": 0.01}
+
+
+def test_snapshots_merge_across_processes():
+    worker = Metrics()
+    with worker.stage("render.markdown"):
+        pass
+    worker.record_cache("renders", hits=1, misses=3)
+    worker.observe_request("POST wit/wiql", 200, 0.03, 10, 100)
+    parent = Metrics()
+    parent.observe_request("POST wit/wiql", 429, 2.0, 10, 0)
+    parent.merge(worker.snapshot())
+    parent.merge(worker.snapshot())
+    report = parent.report()
+    assert report["stages"]["render.markdown"]["calls"] == 2
+    assert report["caches"]["renders"] == {"hits": 2, "misses": 6, "hit_rate": 0.25}
+    wiql = report["http"]["endpoints"]["POST wit/wiql"]
+    assert (wiql["requests"], wiql["errors"], wiql["response_bytes"]) == (3, 1, 200)
+    assert wiql["statuses"] == {"429": 1, "200": 2}
+    assert wiql["latency_histogram_ms"]["<=50"] == 2 and wiql["latency_histogram_ms"]["<=2500"] == 1
+
+
+def test_export_records_http_and_cache_metrics(tmp_path):
+    metrics = get_metrics()
+    with AzureDevOpsStub(make_work_items(6)) as stub:
+        for _ in range(2):
+            client = AzureDevOpsClient("example", "Project", "pat", batch_size=5, api_root=stub.api_root,
+                                       cache=WorkItemCache(str(tmp_path)))
+            metrics.reset()
+            client.fetch_and_normalize_okrs_with_relations()
+    report = metrics.report()
+    endpoints = report["http"]["endpoints"]
+    assert set(endpoints) == {"POST wit/wiql", "POST wit/workitemsbatch"}
+    assert endpoints["POST wit/workitemsbatch"]["response_bytes"] > 0
+    assert report["http"]["request_bytes"] > 0
+    assert sum(report["http"]["latency_histogram_ms"].values()) == report["http"]["requests"]
+    # Second run: every work item is served from the cache after revalidation.
+    assert report["caches"]["work_items"]["hit_rate"] == 1.0
+    assert {"azure_devops.wiql", "azure_devops.fetch", "azure_devops.revalidate", "azure_devops.normalize"} <= set(report["stages"])
+
+
+def test_profile_run_writes_reports_even_on_failure(tmp_path):
+    report_path, stats_path = tmp_path / "profile" / "metrics.json", tmp_path / "run.pstats"
+    with pytest.raises(SystemExit):
+        with profile_run(str(report_path), str(stats_path)) as metrics:
+            with metrics.stage("validate"):
+                raise SystemExit(1)
+    with open(report_path, encoding="utf-8") as f:
+        report = json.load(f)
+    assert report["stages"]["validate"]["calls"] == 1
+    assert {"command", "wall_seconds", "http", "caches", "counters"} <= set(report)
+    assert pstats.Stats(str(stats_path)).total_calls > 0
+
+
+def test_profile_report_does_not_contain_the_pat(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["workflow-doc-gen", "--org", "org", "--pat", "secret-token", "--pat=other-secret",
+                                      "--profile", str(tmp_path / "metrics.json")])
+    with profile_run(str(tmp_path / "metrics.json")):
+        pass
+    text = (tmp_path / "metrics.json").read_text(encoding="utf-8")
+    assert "secret-token" not in text and "other-secret" not in text
+    assert json.loads(text)["command"][:5] == ["workflow-doc-gen", "--org", "org", "--pat", "***"]
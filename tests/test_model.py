@@ -0,0 +1,53 @@
+"""
+Unit tests for model.py.
+"""
+import datetime
+import json
+import os
+
+from okr_generator import make_okr_data
+
+from hungovercoders_workflow_doc_gen.formatter import Formatter
+from hungovercoders_workflow_doc_gen.model import ChildWorkItem, Objective, to_json
+from hungovercoders_workflow_doc_gen.render_cache import content_digest
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "example_input/okr_summary.example.json")
+GENERATED_AT = datetime.datetime(2025, 6, 21, 8, 30, tzinfo=datetime.timezone.utc)
+
+
+def as_models(data):
+    return {"objectives": [Objective.from_dict(obj) for obj in data["objectives"]]}
+
+
+def test_round_trip_is_lossless():
+    with open(EXAMPLE, encoding="utf-8") as f:
+        example = json.load(f)
+    generated = make_okr_data(5)
+    generated["objectives"][0]["hypotheses"][0]["children"] = [
+        {"id": 7, "title": "Issue", "state": "New", "work_item_type": "Issue",
+         "link": "https://example.test/items/7", "children": [{"id": 8, "title": "Task", "link": "elsewhere"}]},
+    ]
+    generated["objectives"][1]["custom_field"] = {"kept": True}
+    del generated["objectives"][2]["objective_outcome"]
+    for data in (example, generated):
+        for obj in data["objectives"]:
+            assert Objective.from_dict(obj).to_dict() == obj
+        assert json.loads(json.dumps(as_models(data), default=to_json)) == data
+        assert content_digest(as_models(data)) == content_digest(data)
+
+
+def test_links_share_an_interned_prefix():
+    first, second = (Objective.from_dict(obj) for obj in json.loads(json.dumps(make_okr_data(2)))["objectives"])
+    assert first.link_prefix is second.link_prefix
+    assert first.hypotheses[0].link_prefix is second.hypotheses[2].link_prefix
+    assert first.link == "https://dev.azure.com/example/Project/_workitems/edit/1"
+    assert first.link_override is None
+    assert ChildWorkItem.from_dict({"id": 3, "link": "https://other/4"}).link == "https://other/4"
+
+
+def test_models_render_like_dicts():
+    data = make_okr_data(4)
+    formatter = Formatter(generated_at=GENERATED_AT)
+    models = as_models(data)
+    assert formatter.format_markdown(models) == formatter.format_markdown(data)
+    assert formatter.format_doc(models) == formatter.format_doc(data)
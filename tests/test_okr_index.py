@@ -0,0 +1,64 @@
+"""
+Unit tests for okr_index.py and the --filter option.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from okr_generator import make_okr_data, write_okr_json
+
+from hungovercoders_workflow_doc_gen.formatter import Formatter
+from hungovercoders_workflow_doc_gen.model import Objective
+from hungovercoders_workflow_doc_gen.okr_index import OkrIndex, iter_filtered_objectives
+
+
+def test_index_counts_and_hierarchy():
+    objectives = make_okr_data(12, depth=3, children_per_item=2)["objectives"]
+    index = OkrIndex(objectives)
+    assert index.objective_count == 12 and index.hypothesis_count == 36
+    assert index.objective_state_counts == {"New": 2, "active": 2, "review": 2, "closed": 2, "Doing": 2, "Done": 2}
+    assert sum(index.hypothesis_state_counts.values()) == 36
+    assert index.hypothesis_counts[1] == 3
+    hypothesis = objectives[0]["hypotheses"][0]
+    assert index.by_id[hypothesis["id"]] is hypothesis
+    assert index.parent(hypothesis["id"]) is objectives[0]
+    assert index.children(hypothesis["id"]) == hypothesis["children"]
+    assert index.parent_of[hypothesis["children"][0]["id"]] == hypothesis["id"]
+
+
+def test_filter_keeps_document_order_for_models_and_dicts():
+    objectives = make_okr_data(12)["objectives"]
+    expected = [obj["id"] for obj in objectives if obj["state"] in ("Done", "New")]
+    for items in (objectives, [Objective.from_dict(obj) for obj in objectives]):
+        index = OkrIndex(items)
+        assert [obj.id if isinstance(obj, Objective) else obj["id"]
+                for obj in index.objectives_with_state("Done", "New")] == expected
+    assert [obj["id"] for obj in iter_filtered_objectives(iter(objectives), ["Done", "New"])] == expected
+    assert OkrIndex(objectives).objectives_with_state("Unknown") == []
+
+
+def test_streamed_summary_matches_loaded_summary(tmp_path):
+    okr_data = make_okr_data(7)
+    formatter = Formatter()
+    formatter.stream_markdown(iter(okr_data["objectives"]), str(tmp_path / "streamed.md"))
+    with open(tmp_path / "streamed.md", encoding="utf-8") as f:
+        streamed = f.read()
+    loaded = formatter.format_markdown(okr_data)
+    summary = loaded[loaded.index("## Summary"):]
+    assert "| **Total** | 7 | 21 |" in summary
+    assert streamed.endswith(summary)
+
+
+def test_cli_filter_by_state(tmp_path):
+    input_path = write_okr_json(str(tmp_path / "okr.json"), 12)
+    for formats in ("raw-json", "raw-json,markdown"):
+        output_dir = tmp_path / formats
+        subprocess.run([sys.executable, "-m", "hungovercoders_workflow_doc_gen", "json", "--input", input_path,
+                        "--output-dir", str(output_dir), "--format", formats, "--filter", "state=Done, active",
+                        "--no-cache"], check=True, stdout=subprocess.DEVNULL)
+        with open(os.path.join(output_dir, "okr_summary.json"), encoding="utf-8") as f:
+            assert [obj["state"] for obj in json.load(f)["objectives"]] == ["active", "Done", "active", "Done"]
+    result = subprocess.run([sys.executable, "-m", "hungovercoders_workflow_doc_gen", "json", "--input", input_path,
+                             "--filter", "owner=me"], capture_output=True, text=True)
+    assert result.returncode == 2 and "expected state=" in result.stderr
@@ -0,0 +1,69 @@
+"""
+Unit tests for render_cache.py and deterministic rendering.
+"""
+import datetime
+import os
+
+import pytest
+from okr_generator import make_okr_data
+
+from hungovercoders_workflow_doc_gen.cli_utils import write_reports
+from hungovercoders_workflow_doc_gen.formatter import Formatter
+from hungovercoders_workflow_doc_gen.render_cache import RenderCache
+
+GENERATED_AT = datetime.datetime(2025, 6, 21, 8, 30, tzinfo=datetime.timezone.utc)
+
+
+def test_generated_at_makes_rendering_deterministic(monkeypatch):
+    data = make_okr_data(2)
+    assert "_Generated on: 2025-06-21 08:30:00_" in Formatter(generated_at=GENERATED_AT).format_markdown(data)
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", str(int(GENERATED_AT.timestamp())))
+    assert Formatter().format_doc(data) == Formatter(generated_at=GENERATED_AT).format_doc(data)
+
+
+def test_unchanged_reports_are_restored_from_the_cache(tmp_path):
+    cache = RenderCache(str(tmp_path / "renders"))
+    formatter = Formatter(generated_at=GENERATED_AT)
+    data = make_okr_data(3)
+    out = str(tmp_path / "out")
+
+    paths = write_reports(formatter, data, ["markdown", "doc"], out, render_cache=cache)
+    assert (cache.hits, cache.misses) == (0, 2)
+    before = {format: os.stat(path).st_mtime_ns for format, path in paths.items()}
+    with open(paths["markdown"], encoding="utf-8") as f:
+        markdown = f.read()
+
+    write_reports(formatter, data, ["markdown", "doc"], out, render_cache=cache)
+    assert (cache.hits, cache.misses) == (2, 2)
+    assert {format: os.stat(path).st_mtime_ns for format, path in paths.items()} == before
+
+    os.remove(paths["markdown"])
+    write_reports(formatter, data, ["markdown"], out, render_cache=cache)
+    with open(paths["markdown"], encoding="utf-8") as f:
+        assert f.read() == markdown
+
+    data["objectives"][1]["title"] = "Changed"
+    write_reports(formatter, data, ["markdown"], out, render_cache=cache)
+    assert cache.misses == 3
+    with open(paths["markdown"], encoding="utf-8") as f:
+        assert "Changed" in f.read()
+
+
+def test_sharded_pdf_only_rerenders_changed_shards(tmp_path):
+    pypdf = pytest.importorskip("pypdf")
+    try:
+        import weasyprint  # noqa: F401
+    except OSError as e:
+        pytest.skip(f"WeasyPrint unavailable: {e}")
+    cache = RenderCache(str(tmp_path / "renders"))
+    formatter = Formatter(generated_at=GENERATED_AT)
+    data = make_okr_data(10)
+    output_path = str(tmp_path / "okr.pdf")
+    formatter.format_pdf_parallel(data, output_path, workers=2, chunk_size=4, render_cache=cache)
+    pages = len(pypdf.PdfReader(output_path).pages)
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    data["objectives"][5]["title"] = "Changed"
+    formatter.format_pdf_parallel(data, output_path, workers=2, chunk_size=4, render_cache=cache)
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert len(pypdf.PdfReader(output_path).pages) == pages
@@ -0,0 +1,99 @@
+"""
+Unit tests for server.py
+"""
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+from okr_generator import write_okr_json
+
+from hungovercoders_workflow_doc_gen.formatter import Formatter
+from hungovercoders_workflow_doc_gen.server import JsonFileSource, ReportService, make_handler
+
+SCHEMA = os.path.join(os.path.dirname(__file__), '../src/hungovercoders_workflow_doc_gen/schemas/okr_summary.json')
+
+
+@pytest.fixture
+def served(tmp_path):
+    input_path = write_okr_json(str(tmp_path / "okr.json"), 3)
+    service = ReportService(JsonFileSource(input_path), schema_path=SCHEMA, prerender=["markdown"])
+    service.refresh()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield service, input_path, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url, headers=None):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers or {})) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def rewrite(input_path, objectives):
+    write_okr_json(input_path, objectives)
+    stat = os.stat(input_path)
+    os.utime(input_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_reports_are_served_with_etags(served):
+    _, _, url = served
+    status, headers, body = get(url + "/okr_summary.md")
+    assert status == 200 and b"# Objectives and Key Results" in body
+    assert headers["Content-Type"].startswith("text/markdown") and headers["Cache-Control"] == "no-cache"
+    status, _, body = get(url + "/okr_summary.md", {"If-None-Match": headers["ETag"]})
+    assert (status, body) == (304, b"")
+    status, _, body = get(url + "/okr_summary.json")
+    assert status == 200 and len(json.loads(body)["objectives"]) == 3
+    assert get(url + "/nothing")[0] == 404
+
+
+def test_changed_input_gets_a_new_etag(served):
+    service, input_path, url = served
+    etag = get(url + "/okr_summary.md")[1]["ETag"]
+    assert not service.refresh()  # unchanged file: nothing reloaded
+    assert get(url + "/okr_summary.md")[1]["ETag"] == etag
+    rewrite(input_path, 4)
+    assert service.refresh()
+    status, headers, _ = get(url + "/okr_summary.md", {"If-None-Match": etag})
+    assert status == 200 and headers["ETag"] != etag
+
+
+def test_failed_refresh_keeps_serving_previous_data(served):
+    service, input_path, url = served
+    version = service.snapshot.version
+    with open(input_path, "w", encoding="utf-8") as f:
+        json.dump({"objectives": [{"id": "not a number"}]}, f)
+    os.utime(input_path, ns=(0, 1))
+    assert not service.refresh()
+    status, _, body = get(url + "/healthz")
+    health = json.loads(body)
+    assert status == 200 and health["status"] == "degraded" and health["version"] == version
+    assert health["last_error"]
+    assert get(url + "/okr_summary.md")[0] == 200
+    metrics = json.loads(get(url + "/metrics")[2])
+    assert metrics["caches"]["served"]["hits"] >= 1
+
+
+def test_pdf_is_rendered_from_its_own_snapshot(served, monkeypatch):
+    def fake_pdf(self, okr_data, output_path, html=None, index=None):
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        return True
+
+    monkeypatch.setattr(Formatter, "format_pdf", fake_pdf)
+    service, input_path, _ = served
+    old = service.snapshot
+    rewrite(input_path, 5)
+    assert service.refresh()
+    # A PDF render of the old snapshot that started before the refresh finishes after it.
+    html = service._render(old, "pdf").body.decode("utf-8")
+    assert html.count('class="objective"') == 3
@@ -0,0 +1,48 @@
+"""
+Startup regression test: heavy backends must not be imported by the ``workflow-doc-gen`` dispatch
+unless the command needs them, and imports must stay within a time budget.
+"""
+import os
+import subprocess
+import sys
+
+EXAMPLE_JSON = os.path.join(os.path.dirname(__file__), 'example_input/okr_summary.example.json')
+
+# Generous enough for slow CI machines; importing WeasyPrint alone takes longer than this.
+IMPORT_BUDGET_SECONDS = 0.5
+
+DISPATCH = "import sys; from hungovercoders_workflow_doc_gen.__main__ import main; sys.argv = sys.argv[1:]; main()"
+
+
+def import_times(*argv):
+    """Run __main__.main under -X importtime; return {top-level module: cumulative seconds} for the dispatch."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", DISPATCH, "workflow-doc-gen", *argv],
+                          capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    startup = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output=True, text=True)
+    startup_modules = {line.rsplit("|", 1)[1].strip() for line in startup.stderr.splitlines() if "|" in line}
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith(" ") and not name.startswith("  "):
+            module = name.strip()
+            if module not in startup_modules:
+                times[module] = times.get(module, 0.0) + int(cumulative) / 1e6
+    all_modules = {line.rsplit("|", 1)[1].strip() for line in proc.stderr.splitlines() if "|" in line}
+    return times, all_modules
+
+
+def test_json_markdown_startup_skips_heavy_backends(tmp_path):
+    times, modules = import_times("json", "--input", EXAMPLE_JSON, "--output-dir", str(tmp_path), "--format", "markdown")
+    assert os.path.exists(tmp_path / "okr_summary.md")
+    for heavy in ("weasyprint", "requests", "jsonschema"):
+        assert heavy not in modules, f"{heavy} imported for json --format markdown"
+    assert sum(times.values()) < IMPORT_BUDGET_SECONDS, sorted(times.items(), key=lambda kv: -kv[1])[:5]
+
+
+def test_azure_devops_help_skips_heavy_backends():
+    _, modules = import_times("azure_devops", "--help")
+    for heavy in ("weasyprint", "requests", "jsonschema", "jinja2"):
+        assert heavy not in modules, f"{heavy} imported for azure_devops --help"
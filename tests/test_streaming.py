@@ -0,0 +1,54 @@
+"""
+Unit tests for streaming.py
+"""
+import io
+import json
+import os
+
+import pytest
+
+from hungovercoders_workflow_doc_gen.formatter import Formatter
+from hungovercoders_workflow_doc_gen.streaming import iter_objectives, write_objectives_json
+
+EXAMPLE_JSON = os.path.join(os.path.dirname(__file__), 'example_input/okr_summary.example.json')
+
+
+def load_example():
+    with open(EXAMPLE_JSON, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_iter_objectives_matches_json_load(chunk_size):
+    """Objectives stream out identically whatever the read chunk size and surrounding keys."""
+    data = load_example()
+    document = json.dumps({"meta": {"note": "]}", "n": 12345}, **data, "after": [1]}, indent=2)
+    assert list(iter_objectives(io.StringIO(document), chunk_size=chunk_size)) == data["objectives"]
+    assert list(iter_objectives(io.StringIO("[1, 22, 333]"), chunk_size=chunk_size)) == [1, 22, 333]
+
+
+def test_iter_objectives_requires_objectives_key():
+    with pytest.raises(ValueError):
+        list(iter_objectives(io.StringIO('{"other": []}')))
+
+
+def test_write_objectives_json_matches_json_dump():
+    data = load_example()
+    out = io.StringIO()
+    assert write_objectives_json(iter(data["objectives"]), out) == len(data["objectives"])
+    assert out.getvalue() == json.dumps(data, indent=2)
+
+
+def test_streamed_markdown_matches_rendered_markdown(tmp_path):
+    """Rendering from a generator to a file produces the same document as format_markdown."""
+    data = load_example()
+    output_path = str(tmp_path / "okr.md")
+    formatter = Formatter()
+    formatter.stream_markdown((obj for obj in data["objectives"]), output_path)
+    with open(output_path, encoding='utf-8') as f:
+        streamed = f.read()
+
+    def without_timestamp(text):
+        return [line for line in text.splitlines() if "Generated on" not in line]
+
+    assert without_timestamp(streamed) == without_timestamp(formatter.format_markdown(data))
@@ -0,0 +1,88 @@
+"""
+Unit tests for text_cleaning.py
+"""
+import copy
+import datetime
+
+from jinja2 import Environment
+from okr_generator import make_okr_data
+
+from hungovercoders_workflow_doc_gen.cli_utils import write_reports
+from hungovercoders_workflow_doc_gen.formatter import Formatter
+from hungovercoders_workflow_doc_gen.metrics import get_metrics
+from hungovercoders_workflow_doc_gen.model import Objective
+from hungovercoders_workflow_doc_gen import text_cleaning
+from hungovercoders_workflow_doc_gen.text_cleaning import (
+    clean_objectives, clear_cache, html_to_text, split_key_results, text_field
+)
+
+SAMPLES = [
+    "<p>Grow <b>revenue</b> &amp; retention</p>\n<ul><li>fast</li></ul>",
+    "plain   text\nover lines",
+    "<!-- note --> kept &lt;tag&gt;",
+    "unclosed <b>tag",
+    "line&#10;break &#9;tab",
+    "<!-- unclosed comment <b>x</b>",
+    "",
+]
+
+
+def test_html_to_text_matches_striptags_filter():
+    template = Environment().from_string("{{ value | striptags | replace('\\n', ' ') }}")
+    for value in SAMPLES:
+        assert html_to_text(value) == template.render(value=value)
+    assert html_to_text(None) == ""
+    assert html_to_text("a&#10;b") == "a b"
+
+
+def test_cache_is_bounded_by_characters(monkeypatch):
+    monkeypatch.setattr(text_cleaning, "CACHE_MAX_CHARS", 1000)
+    clear_cache()
+    for i in range(500):
+        assert html_to_text(f"<p>value {i}</p>") == f"value {i}"
+    assert 0 < text_cleaning._cache_chars <= 1000
+    clear_cache()
+
+
+def test_split_key_results():
+    assert split_key_results(" one \n\n two ") == ["one", "two"]
+    assert split_key_results(["a", "b"]) == ["a", "b"]
+    assert split_key_results(None) == []
+
+
+def test_clean_objectives_stores_text_on_models_and_counts_cache_hits():
+    clear_cache()
+    get_metrics().reset()
+    data = make_okr_data(6)
+    data["objectives"][0]["objective"] = SAMPLES[0]
+    objectives = [Objective.from_dict(obj) for obj in data["objectives"]]
+    assert clean_objectives(objectives) == 6
+    assert objectives[0].text["objective"] == "Grow revenue & retention fast"
+    assert text_field(objectives[0], "objective") == objectives[0].text["objective"]
+    assert isinstance(text_field(objectives[0], "key_results"), list)
+    assert objectives[0].to_dict() == data["objectives"][0]
+    caches = get_metrics().report()["caches"]
+    assert caches["text"]["hits"] > 0 and caches["text"]["misses"] > 0
+
+
+def test_markdown_is_unchanged_by_cleaning():
+    data = make_okr_data(8)
+    data["objectives"][1]["key_results"] = SAMPLES[:3]
+    formatter = Formatter(generated_at=datetime.datetime(2025, 6, 21, 8, 0))
+    expected = formatter.format_markdown(copy.deepcopy(data))
+    objectives = [Objective.from_dict(obj) for obj in data["objectives"]]
+    clean_objectives(objectives)
+    assert formatter.format_markdown({"objectives": objectives}) == expected
+
+
+def test_write_reports_only_cleans_models_ahead_of_rendering(tmp_path):
+    data = make_okr_data(4)
+    formatter = Formatter(generated_at=datetime.datetime(2025, 6, 21, 8, 0))
+    get_metrics().reset()
+    paths = write_reports(formatter, copy.deepcopy(data), ["markdown", "raw-json"], str(tmp_path / "dicts"))
+    assert "clean" not in get_metrics().stages
+    objectives = [Objective.from_dict(obj) for obj in data["objectives"]]
+    model_paths = write_reports(formatter, {"objectives": objectives}, ["markdown", "raw-json"], str(tmp_path / "models"))
+    assert get_metrics().stages["clean"][0] == 1
+    with open(paths["markdown"], encoding="utf-8") as f, open(model_paths["markdown"], encoding="utf-8") as g:
+        assert f.read() == g.read()
@@ -0,0 +1,54 @@
+"""
+Unit tests for validation.py
+"""
+import copy
+import os
+
+import jsonschema
+from okr_generator import make_okr_data
+
+from hungovercoders_workflow_doc_gen.validation import SchemaValidator, get_validator
+
+SCHEMA = os.path.join(os.path.dirname(__file__), '../src/hungovercoders_workflow_doc_gen/schemas/okr_summary.json')
+
+
+def test_validator_is_compiled_once_per_schema_file():
+    assert get_validator(SCHEMA) is get_validator(SCHEMA)
+    assert get_validator(SCHEMA).backend in ("compiled", "fastjsonschema")
+
+
+def test_every_error_is_reported_with_its_json_path():
+    data = make_okr_data(3)
+    data["objectives"][0]["state"] = "Sideways"
+    del data["objectives"][2]["title"]
+    data["objectives"][2]["hypotheses"][1]["id"] = 1.5
+    issues = get_validator(SCHEMA).errors(data)
+    assert sorted(issue.json_path for issue in issues) == [
+        "$.objectives[0].state", "$.objectives[2]", "$.objectives[2].hypotheses[1].id",
+    ]
+
+
+def test_objective_errors_are_relative_to_the_document():
+    obj = make_okr_data(1)["objectives"][0]
+    obj["key_results"] = "not a list"
+    issues = list(get_validator(SCHEMA).iter_objective_errors(obj, 41))
+    assert [issue.json_path for issue in issues] == ["$.objectives[41].key_results"]
+
+
+def test_compiled_fast_path_agrees_with_jsonschema():
+    validator = get_validator(SCHEMA)
+    compiled = SchemaValidator(validator.schema, use_fastjsonschema=False)
+    reference = jsonschema.Draft7Validator(validator.schema)
+    valid = make_okr_data(2)
+    mutations = [
+        lambda d: None,
+        lambda d: d["objectives"][0].update(id=True),
+        lambda d: d["objectives"][0].update(id=3.0),
+        lambda d: d["objectives"][1]["hypotheses"][0].update(title=None),
+        lambda d: d["objectives"][1]["hypotheses"][0].update(children=[{"title": "Issue", "state": "Doing", "children": [{}]}]),
+        lambda d: d.update(objectives={}),
+    ]
+    for mutate in mutations:
+        data = copy.deepcopy(valid)
+        mutate(data)
+        assert compiled._is_valid(data) == reference.is_valid(data)
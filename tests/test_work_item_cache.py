@@ -0,0 +1,37 @@
+"""
+Unit tests for work_item_cache.py
+"""
+from azure_devops_stub import AzureDevOpsStub, make_work_items
+from hungovercoders_workflow_doc_gen.azure_devops_client import AzureDevOpsClient
+from hungovercoders_workflow_doc_gen.work_item_cache import WorkItemCache
+
+
+def test_cache_round_trip_and_lru_eviction(tmp_path):
+    cache = WorkItemCache(str(tmp_path), max_entries=2)
+    cache.put_many("org", "proj", "fields", [{"id": 1, "rev": 3, "fields": {"System.ChangedDate": "2025-01-01"}}])
+    cache.put_many("org", "proj", "fields", [{"id": 2, "rev": 1, "fields": {}}])
+    assert cache.get_many("org", "proj", "fields", [1])[1].rev == 3  # 1 is now most recently used
+    cache.put_many("org", "proj", "fields", [{"id": 3, "rev": 1, "fields": {}}])
+    assert sorted(cache.get_many("org", "proj", "fields", [1, 2, 3])) == [1, 3]
+    assert cache.get_many("other", "proj", "fields", [1]) == {}
+
+
+def test_warm_run_only_fetches_changed_items(tmp_path):
+    """A warm run costs WIQL + revision checks + a fetch of the items that changed."""
+    with AzureDevOpsStub(make_work_items(5)) as stub:
+        def export():
+            client = AzureDevOpsClient("example", "Project", "pat", api_root=stub.api_root,
+                                       cache=WorkItemCache(str(tmp_path)))
+            stub.requests.clear()
+            return client.fetch_and_normalize_okrs_with_relations()
+
+        cold = export()
+        assert len(stub.requests) == 2
+        assert export() == cold
+        # hierarchy WIQL + one revision check for all cached items
+        assert len(stub.requests) == 2
+
+        stub.bump_revision(6, **{"System.Title": "Renamed"})
+        warm = export()
+        assert len(stub.requests) == 3
+        assert warm["objectives"][0]["hypotheses"][0]["title"] == "Renamed"